@@ -0,0 +1,47 @@
+"""
+Bandwidth budget endpoints: inspect and change the download speed caps
+"""
+
+from flask import Blueprint, jsonify, request
+
+from youtube_audio_extractor.bandwidth import LANES, get_governor, parse_rate
+
+from .logging_utils import main_logger
+
+bandwidth_bp = Blueprint('bandwidth', __name__)
+
+
+@bandwidth_bp.route('/api/bandwidth', methods=['GET'])
+def get_bandwidth():
+    """Current caps, per-lane allocation and the share of every running download"""
+    return jsonify(get_governor().status())
+
+
+@bandwidth_bp.route('/api/bandwidth', methods=['POST'])
+def configure_bandwidth():
+    """Change the global and per-download caps; running downloads are re-balanced at once"""
+    try:
+        data = request.get_json() or {}
+        governor = get_governor()
+
+        # Omitted fields keep their current value; null or 0 removes a cap
+        try:
+            global_limit = parse_rate(data['global_limit']) if 'global_limit' in data else governor.global_limit
+            per_job_limit = parse_rate(data['per_job_limit']) if 'per_job_limit' in data else governor.per_job_limit
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        lane_weights = data.get('lane_weights') or {}
+        for lane, weight in lane_weights.items():
+            if lane not in LANES:
+                return jsonify({'error': f"lane must be one of: {', '.join(LANES)}"}), 400
+            if not isinstance(weight, (int, float)) or weight <= 0:
+                return jsonify({'error': 'lane weights must be positive numbers'}), 400
+
+        governor.configure(global_limit=global_limit, per_job_limit=per_job_limit, lane_weights=lane_weights)
+        main_logger.info(f"Bandwidth: {governor.describe()}, lane weights {governor.lane_weights}")
+        return jsonify(governor.status())
+
+    except (AttributeError, TypeError) as e:
+        # A body or lane_weights that is not a JSON object
+        return jsonify({'error': str(e)}), 500
@@ -0,0 +1,124 @@
+"""
+Batch download endpoint for lists of YouTube videos
+"""
+
+import threading
+
+from flask import Blueprint, jsonify, request
+
+from youtube_audio_extractor.batch import DEFAULT_BATCH_WORKERS, read_url_list
+from youtube_audio_extractor.encoding import output_formats
+from youtube_audio_extractor.silence import numpy_available
+from youtube_audio_extractor.splitting import parse_max_size
+
+from .downloads import create_cleanup_thread
+from .logging_utils import get_download_logger, log_download_error, main_logger
+from .shared import (
+    create_progress_hook,
+    download_progress,
+    generate_download_id,
+    initialize_download,
+    send_end_signal,
+)
+
+batch_bp = Blueprint('batch', __name__)
+
+# Upper bound on concurrent items a single batch request may ask for
+MAX_BATCH_WORKERS = 8
+
+
+@batch_bp.route('/api/batch', methods=['POST'])
+def download_batch():
+    """Download audio from a list of YouTube videos"""
+    try:
+        data = request.get_json()
+        urls = data.get('urls')
+        output_dir = data.get('output_dir', 'downloads')
+        workers = data.get('workers', DEFAULT_BATCH_WORKERS)
+        adaptive = data.get('adaptive', False)
+
+        if isinstance(urls, str):
+            urls = urls.splitlines()
+        if not urls:
+            return jsonify({'error': 'urls is required'}), 400
+        urls = read_url_list(urls)
+
+        try:
+            workers = max(1, min(int(workers), MAX_BATCH_WORKERS))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'workers must be a number'}), 400
+
+        bitrate = data.get('bitrate', '192')  # a single bitrate or a list of bitrates
+        codec = data.get('codec', 'mp3')  # a single codec or a list of codecs
+        try:
+            output_formats(bitrate, codec)
+            max_size_mb = parse_max_size(data.get('max_size_mb'))  # MB or a preset such as "email"
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        split_at_silence = data.get('split_at_silence', False)  # implies split_large_files
+        if split_at_silence and not numpy_available():
+            return jsonify({'error': 'split_at_silence needs NumPy installed on the server'}), 400
+
+        options = {
+            'bitrate': bitrate,
+            'codec': codec,
+            'split_large_files': data.get('split_large_files', False) or split_at_silence,
+            'split_by_chapters': data.get('split_by_chapters', False) or data.get('virtual_chapters', False),
+            'max_size_mb': max_size_mb,
+            'split_at_silence': split_at_silence,
+            'virtual_chapters': data.get('virtual_chapters', False),
+        }
+
+        download_id = generate_download_id()
+        main_logger.info("=== NEW BATCH DOWNLOAD ===")
+        main_logger.info(f"Download ID: {download_id}")
+        main_logger.info(f"URLs: {len(urls)}, Workers: {workers}, Adaptive: {adaptive}")
+
+        initialize_download(download_id, f'{len(urls)} videos', output_dir, 'batch')
+        download_progress[download_id]['urls'] = urls
+
+        def batch_task():
+            get_download_logger(download_id)
+            try:
+                from youtube_audio_extractor.batch import run_batch
+
+                download_progress[download_id]['status'] = 'downloading'
+                download_progress[download_id]['current_step'] = 'Starting batch download...'
+
+                manifest = run_batch(urls, output_dir, workers=workers, adaptive=adaptive,
+                                     progress_hook=create_progress_hook(download_id), **options)
+
+                download_progress[download_id]['manifest'] = manifest
+                # Failed items don't fail the batch; only a batch with nothing downloaded does
+                if manifest['successful'] > 0:
+                    download_progress[download_id]['status'] = 'completed'
+                    download_progress[download_id]['current_step'] = (
+                        f"Batch completed: {manifest['successful']} succeeded, {manifest['failed']} failed")
+                else:
+                    download_progress[download_id]['status'] = 'failed'
+                    download_progress[download_id]['current_step'] = 'Batch failed - no video could be downloaded'
+                send_end_signal(download_id)
+
+            except Exception as e:
+                download_progress[download_id]['status'] = 'failed'
+                download_progress[download_id]['current_step'] = f'Error: {e!s}'
+                log_download_error(download_id, e, "Batch download task failed")
+                send_end_signal(download_id)
+            finally:
+                create_cleanup_thread(download_id)
+
+        thread = threading.Thread(target=batch_task)
+        thread.daemon = True
+        thread.start()
+
+        return jsonify({
+            'message': 'Batch download started successfully',
+            'download_id': download_id,
+            'total': len(urls),
+            'workers': workers,
+            'output_dir': output_dir
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
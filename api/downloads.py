@@ -6,6 +6,11 @@ import threading
 import time
 from flask import Blueprint, request, jsonify
 from youtube_audio_extractor.core import validate_youtube_url
+from youtube_audio_extractor.ranges import parse_timestamp, parse_chapter_selection
+from youtube_audio_extractor.scheduling import DEFAULT_SCHEDULE, SCHEDULING_POLICIES
+from youtube_audio_extractor.bandwidth import parse_rate
+from youtube_audio_extractor.splitting import parse_max_size
+from youtube_audio_extractor.silence import numpy_available
 from .shared import (
     download_progress, download_queues, create_progress_hook,
     generate_download_id, initialize_download, send_end_signal
@@ -14,6 +19,9 @@ from .logging_utils import main_logger, get_download_logger, cleanup_download_lo
 
 downloads_bp = Blueprint('downloads', __name__)
 
+# Upper bound on videos a single playlist request may process at once
+MAX_PLAYLIST_WORKERS = 8
+
 
 def create_cleanup_thread(download_id: str) -> None:
     """Create a cleanup thread to remove download data after a delay."""
@@ -39,9 +47,14 @@ def download_video():
         data = request.get_json()
         url = data.get('url')
         output_dir = data.get('output_dir', 'downloads')
-        bitrate = data.get('bitrate', '192')
+        bitrate = data.get('bitrate', '192')  # a single bitrate or a list of bitrates
+        codec = data.get('codec', 'mp3')  # a single codec or a list of codecs
         split_large_files = data.get('split_large_files', False)
-        split_by_chapters = data.get('split_by_chapters', False)
+        virtual_chapters = data.get('virtual_chapters', False)  # implies split_by_chapters
+        split_by_chapters = data.get('split_by_chapters', False) or virtual_chapters
+        split_at_silence = data.get('split_at_silence', False)  # implies split_large_files
+        split_large_files = split_large_files or split_at_silence
+        parallel_encode = data.get('parallel_encode')
 
         if not url:
             return jsonify({'error': 'URL is required'}), 400
@@ -49,6 +62,22 @@ def download_video():
         if not validate_youtube_url(url):
             return jsonify({'error': 'Invalid YouTube URL'}), 400
 
+        # Optional part selection: 'start'/'end' timestamps or 'chapters' such as "3,5-7"
+        try:
+            start_time = parse_timestamp(data['start']) if data.get('start') is not None else None
+            end_time = parse_timestamp(data['end']) if data.get('end') is not None else None
+            chapter_numbers = parse_chapter_selection(data['chapters']) if data.get('chapters') else None
+            rate_limit = parse_rate(data.get('rate_limit'))  # e.g. "2M"; bytes/s for this download
+            max_size_mb = parse_max_size(data.get('max_size_mb'))  # MB or a preset such as "email"
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        if chapter_numbers and (start_time is not None or end_time is not None or split_by_chapters):
+            return jsonify({'error': 'chapters cannot be combined with start/end or split_by_chapters'}), 400
+
+        if split_at_silence and not numpy_available():
+            return jsonify({'error': 'split_at_silence needs NumPy installed on the server'}), 400
+
         # Generate unique download ID and initialize
         download_id = generate_download_id()
         main_logger.info("=== NEW SINGLE VIDEO DOWNLOAD ===")
@@ -56,8 +85,13 @@ def download_video():
         main_logger.info(f"URL: {url}")
         main_logger.info(f"Output dir: {output_dir}")
         main_logger.info(f"Bitrate: {bitrate}")
-        main_logger.info(f"Split large files: {split_large_files}")
+        main_logger.info(f"Codec: {codec}")
+        main_logger.info(f"Split large files: {split_large_files} (max {max_size_mb:g}MB)")
         main_logger.info(f"Split by chapters: {split_by_chapters}")
+        if start_time is not None or end_time is not None or chapter_numbers:
+            main_logger.info(f"Selection: start={start_time}, end={end_time}, chapters={chapter_numbers}")
+        if rate_limit:
+            main_logger.info(f"Rate limit: {rate_limit} bytes/s")
 
         initialize_download(download_id, url, output_dir, 'single')
 
@@ -88,7 +122,16 @@ def download_video():
                         split_large_files=split_large_files,
                         split_by_chapters=split_by_chapters,
                         progress_hook=custom_progress_hook,
-                        download_id=download_id
+                        download_id=download_id,
+                        parallel_encode=parallel_encode,
+                        codec=codec,
+                        start_time=start_time,
+                        end_time=end_time,
+                        chapter_numbers=chapter_numbers,
+                        rate_limit=rate_limit,
+                        max_size_mb=max_size_mb,
+                        split_at_silence=split_at_silence,
+                        virtual_chapters=virtual_chapters
                     )
                 except Exception as e:
                     log_download_error(download_id, e, "Error during download_audio_with_progress")
@@ -133,11 +176,18 @@ def download_playlist_endpoint():
         data = request.get_json()
         url = data.get('url')
         output_dir = data.get('output_dir', 'downloads')
-        bitrate = data.get('bitrate', '192')
+        bitrate = data.get('bitrate', '192')  # a single bitrate or a list of bitrates
+        codec = data.get('codec', 'mp3')  # a single codec or a list of codecs
         split_large_files = data.get('split_large_files', False)
-        split_by_chapters = data.get('split_by_chapters', False)
+        virtual_chapters = data.get('virtual_chapters', False)  # implies split_by_chapters
+        split_by_chapters = data.get('split_by_chapters', False) or virtual_chapters
+        split_at_silence = data.get('split_at_silence', False)  # implies split_large_files
+        split_large_files = split_large_files or split_at_silence
         start_index = data.get('start_index', 1)
         end_index = data.get('end_index')
+        resume = data.get('resume', False)
+        schedule = data.get('schedule', DEFAULT_SCHEDULE)
+        adaptive = data.get('adaptive', False)
 
         if not url:
             return jsonify({'error': 'URL is required'}), 400
@@ -145,12 +195,30 @@ def download_playlist_endpoint():
         if not validate_youtube_url(url):
             return jsonify({'error': 'Invalid YouTube URL'}), 400
 
+        if schedule not in SCHEDULING_POLICIES:
+            return jsonify({'error': f"schedule must be one of: {', '.join(SCHEDULING_POLICIES)}"}), 400
+
+        if split_at_silence and not numpy_available():
+            return jsonify({'error': 'split_at_silence needs NumPy installed on the server'}), 400
+
+        try:
+            workers = max(1, min(int(data.get('workers', 1)), MAX_PLAYLIST_WORKERS))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'workers must be a number'}), 400
+
+        try:
+            rate_limit = parse_rate(data.get('rate_limit'))  # e.g. "2M"; bytes/s for each video
+            max_size_mb = parse_max_size(data.get('max_size_mb'))  # MB or a preset such as "email"
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
         # Generate unique download ID and initialize
         download_id = generate_download_id()
         main_logger.info("=== NEW PLAYLIST DOWNLOAD ===")
         main_logger.info(f"Download ID: {download_id}")
         main_logger.info(f"URL: {url}")
-        main_logger.info(f"Start index: {start_index}, End index: {end_index}")
+        main_logger.info(f"Start index: {start_index}, End index: {end_index}, Resume: {resume}")
+        main_logger.info(f"Workers: {workers}, Schedule: {schedule}, Adaptive: {adaptive}, Rate limit: {rate_limit}")
 
         initialize_download(download_id, url, output_dir, 'playlist')
 
@@ -181,7 +249,16 @@ def download_playlist_endpoint():
                         start_index=start_index,
                         end_index=end_index,
                         progress_hook=create_progress_hook(download_id),
-                        download_id=download_id
+                        download_id=download_id,
+                        codec=codec,
+                        resume=resume,
+                        workers=workers,
+                        schedule=schedule,
+                        adaptive=adaptive,
+                        rate_limit=rate_limit,
+                        max_size_mb=max_size_mb,
+                        split_at_silence=split_at_silence,
+                        virtual_chapters=virtual_chapters
                     )
                 except Exception as e:
                     log_download_error(download_id, e, "Error during playlist download")
@@ -0,0 +1,97 @@
+"""
+File endpoints: virtual chapters served as byte ranges of the downloaded file
+"""
+
+import re
+from pathlib import Path
+
+from flask import Blueprint, Response, jsonify, request
+
+from youtube_audio_extractor.storage import get_storage_manager
+from youtube_audio_extractor.virtual_chapters import (
+    find_chapter,
+    iter_chapter_bytes,
+    read_chapter_index,
+)
+
+from .logging_utils import main_logger
+
+files_bp = Blueprint('files', __name__)
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def resolve_download_file(file_id):
+    """The file at file_id (a path relative to downloads/), or None if it is missing or outside downloads/"""
+    downloads_dir = Path('downloads').resolve()
+    target_path = (downloads_dir / file_id).resolve()
+    if downloads_dir not in target_path.parents or not target_path.is_file():
+        return None
+    return target_path
+
+
+def parse_range(header, length):
+    """(first, last) byte of a single-range Range header within length bytes; None for the whole
+    chapter, or raises ValueError if the range cannot be satisfied"""
+    match = RANGE_PATTERN.match(header.strip()) if header else None
+    if not match or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        # "bytes=-N": the last N bytes
+        first, last = max(0, length - int(last)), length - 1
+    else:
+        first, last = int(first), min(int(last), length - 1) if last else length - 1
+    if first > last or first >= length:
+        raise ValueError(f"Range {header} is outside the chapter")
+    return first, last
+
+
+@files_bp.route('/api/files/<path:file_id>/chapters')
+def list_file_chapters(file_id):
+    """Chapter index of a downloaded file that was kept whole with virtual chapters"""
+    audio_file = resolve_download_file(file_id)
+    if audio_file is None:
+        return jsonify({'error': 'File not found'}), 404
+
+    index = read_chapter_index(audio_file)
+    if index is None:
+        return jsonify({'error': 'No chapter index for this file'}), 404
+
+    return jsonify({
+        'file': file_id,
+        'duration': index['duration'],
+        'chapters': [dict(chapter, url=f"/api/files/{file_id}/chapters/{chapter['index']}")
+                     for chapter in index['chapters']]
+    })
+
+
+@files_bp.route('/api/files/<path:file_id>/chapters/<int:number>')
+def get_file_chapter(file_id, number):
+    """One chapter as a slice of the original file, cut at MP3 frame boundaries (supports Range requests)"""
+    audio_file = resolve_download_file(file_id)
+    if audio_file is None:
+        return jsonify({'error': 'File not found'}), 404
+
+    index = read_chapter_index(audio_file)
+    chapter = find_chapter(index, number) if index else None
+    if chapter is None:
+        return jsonify({'error': f'Chapter {number} not found'}), 404
+
+    length = chapter['length']
+    try:
+        byte_range = parse_range(request.headers.get('Range'), length)
+    except ValueError as e:
+        main_logger.debug(f"{e} ({file_id}, chapter {number})")
+        return Response(status=416, headers={'Content-Range': f'bytes */{length}'})
+
+    # Files played through the API are evicted last under the storage quota
+    get_storage_manager().touch(audio_file)
+    first, last = byte_range or (0, length - 1)
+    response = Response(iter_chapter_bytes(audio_file, chapter, first, last),
+                        status=206 if byte_range else 200, mimetype='audio/mpeg', direct_passthrough=True)
+    response.headers['Accept-Ranges'] = 'bytes'
+    response.headers['Content-Length'] = str(last - first + 1)
+    if byte_range:
+        response.headers['Content-Range'] = f'bytes {first}-{last}/{length}'
+    return response
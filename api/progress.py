@@ -6,6 +6,9 @@ import json
 import time
 from flask import Blueprint, Response
 from queue import Empty
+from youtube_audio_extractor.bandwidth import get_governor
+from youtube_audio_extractor.priority import get_scheduler
+from youtube_audio_extractor.transcode_cache import get_transcode_cache
 from .shared import download_progress, download_queues
 from .logging_utils import main_logger
 
@@ -83,5 +86,8 @@ def get_downloads_status():
     """Get status of all active downloads"""
     from flask import jsonify
     return jsonify({
-        'downloads': download_progress
+        'downloads': download_progress,
+        'bandwidth': get_governor().status(),
+        'lanes': get_scheduler().status(),
+        'transcode_cache': get_transcode_cache().status()
     })
@@ -4,6 +4,7 @@ Shared utilities and global state for the YouTube Audio Extractor API
 
 import time
 import queue
+import logging
 import uuid
 from typing import Dict, Any, Callable
 from .logging_utils import main_logger, get_download_logger
@@ -44,6 +45,15 @@ def progress_hook(d: Dict[str, Any], download_id: str) -> None:
                 'message': 'Download completed, processing audio...'
             })
             logger.info("Download finished, processing audio...")
+        else:
+            # Pipeline status updates (info, warning, error, ...) carry their own simple fields
+            progress_data.update({
+                key: value for key, value in d.items()
+                if key != 'status' and isinstance(value, (str, int, float, bool, type(None)))
+            })
+            if 'message' in d:
+                level = {'error': logging.ERROR, 'warning': logging.WARNING}.get(d['status'], logging.INFO)
+                logger.log(level, d['message'])
 
         try:
             download_queues[download_id].put(progress_data)
@@ -77,11 +87,11 @@ def initialize_download(download_id: str, url: str, output_dir: str, download_ty
         'url': url,
         'output_dir': output_dir,
         'start_time': time.time(),
-        'current_step': f'Initializing {"playlist " if download_type == "playlist" else ""}download...'
+        'current_step': f'Initializing {"" if download_type == "single" else download_type + " "}download...'
     }
 
-    if download_type == 'playlist':
-        download_progress[download_id]['type'] = 'playlist'
+    if download_type != 'single':
+        download_progress[download_id]['type'] = download_type
 
     logger.info(f"Download initialized - Type: {download_type}, Output: {output_dir}")
     main_logger.info(f"New download started: {download_id[:8]} - {url}")
@@ -0,0 +1,52 @@
+"""
+Storage quota endpoints: inspect and change the downloads quota and pinned items
+"""
+
+import sqlite3
+
+from flask import Blueprint, jsonify, request
+
+from youtube_audio_extractor.storage import get_storage_manager, parse_size
+
+from .logging_utils import main_logger
+
+storage_bp = Blueprint('storage', __name__)
+
+
+@storage_bp.route('/api/storage', methods=['GET'])
+def get_storage():
+    """Quota, space used and reserved by running jobs, and every library item with its last access"""
+    return jsonify(get_storage_manager().status())
+
+
+@storage_bp.route('/api/storage', methods=['POST'])
+def configure_storage():
+    """Change the quota and pin or unpin items; pinned items are never evicted. With "rescan": true
+    the downloads folder is measured again"""
+    try:
+        data = request.get_json() or {}
+        storage = get_storage_manager()
+
+        # An omitted quota keeps its current value; null or 0 removes it
+        try:
+            quota = parse_size(data['quota']) if 'quota' in data else storage.quota
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        pin = data.get('pin') or []
+        unpin = data.get('unpin') or []
+        if not isinstance(pin, list) or not isinstance(unpin, list) \
+                or not all(isinstance(name, str) for name in pin + unpin):
+            return jsonify({'error': 'pin and unpin must be lists of item names'}), 400
+
+        storage.configure(quota=quota, pin=pin, unpin=unpin)
+        if data.get('rescan'):
+            # Files added or deleted by hand are only noticed by a rescan
+            storage.rescan()
+        status = storage.status()
+        main_logger.info(f"Storage: {storage.describe()}, pinned {status['pinned']}")
+        return jsonify(status)
+
+    except (AttributeError, OSError, sqlite3.Error) as e:
+        # A body that is not a JSON object, or a state file or catalog that cannot be written
+        return jsonify({'error': str(e)}), 500
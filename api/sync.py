@@ -0,0 +1,116 @@
+"""
+Sync endpoint for downloading the new videos of channels and playlists
+"""
+
+import threading
+
+from flask import Blueprint, jsonify, request
+
+from youtube_audio_extractor.core import validate_youtube_url
+from youtube_audio_extractor.silence import numpy_available
+from youtube_audio_extractor.splitting import parse_max_size
+from youtube_audio_extractor.sync import DEFAULT_STOP_AFTER
+
+from .downloads import create_cleanup_thread
+from .logging_utils import get_download_logger, log_download_error, main_logger
+from .shared import (
+    create_progress_hook,
+    download_progress,
+    generate_download_id,
+    initialize_download,
+    send_end_signal,
+)
+
+sync_bp = Blueprint('sync', __name__)
+
+
+@sync_bp.route('/api/sync', methods=['POST'])
+def sync_collection_endpoint():
+    """Download the videos added to a channel or playlist since the last sync"""
+    try:
+        data = request.get_json()
+        url = data.get('url')
+        output_dir = data.get('output_dir', 'downloads')
+        full_scan = data.get('full_scan', False)
+
+        if not url:
+            return jsonify({'error': 'URL is required'}), 400
+
+        if not validate_youtube_url(url):
+            return jsonify({'error': 'Invalid YouTube URL'}), 400
+
+        try:
+            stop_after = max(1, int(data.get('stop_after', DEFAULT_STOP_AFTER)))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'stop_after must be a number'}), 400
+
+        try:
+            max_size_mb = parse_max_size(data.get('max_size_mb'))  # MB or a preset such as "email"
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        split_at_silence = data.get('split_at_silence', False)  # implies split_large_files
+        if split_at_silence and not numpy_available():
+            return jsonify({'error': 'split_at_silence needs NumPy installed on the server'}), 400
+
+        options = {
+            'bitrate': data.get('bitrate', '192'),
+            'codec': data.get('codec', 'mp3'),
+            'split_large_files': data.get('split_large_files', False) or split_at_silence,
+            'split_by_chapters': data.get('split_by_chapters', False) or data.get('virtual_chapters', False),
+            'max_size_mb': max_size_mb,
+            'split_at_silence': split_at_silence,
+            'virtual_chapters': data.get('virtual_chapters', False),
+        }
+
+        download_id = generate_download_id()
+        main_logger.info("=== NEW SYNC ===")
+        main_logger.info(f"Download ID: {download_id}")
+        main_logger.info(f"URL: {url}")
+        main_logger.info(f"Stop after: {stop_after}, Full scan: {full_scan}")
+
+        initialize_download(download_id, url, output_dir, 'sync')
+
+        def sync_task():
+            get_download_logger(download_id)
+            try:
+                from youtube_audio_extractor.sync import sync_collection
+
+                download_progress[download_id]['status'] = 'downloading'
+                download_progress[download_id]['current_step'] = 'Checking for new videos...'
+
+                summary = sync_collection(url, output_dir, stop_after=stop_after, full_scan=full_scan,
+                                          progress_hook=create_progress_hook(download_id), **options)
+
+                # A sync that found nothing new has still succeeded
+                if summary and (summary['successful_downloads'] or not summary['failed_downloads']):
+                    download_progress[download_id]['status'] = 'completed'
+                    download_progress[download_id]['current_step'] = (
+                        f"Sync completed: {summary['successful_downloads']} new videos downloaded")
+                    download_progress[download_id]['sync'] = summary
+                else:
+                    download_progress[download_id]['status'] = 'failed'
+                    download_progress[download_id]['current_step'] = 'Sync failed'
+                send_end_signal(download_id)
+
+            except Exception as e:
+                download_progress[download_id]['status'] = 'failed'
+                download_progress[download_id]['current_step'] = f'Error: {e!s}'
+                log_download_error(download_id, e, "Sync task failed")
+                send_end_signal(download_id)
+            finally:
+                create_cleanup_thread(download_id)
+
+        thread = threading.Thread(target=sync_task)
+        thread.daemon = True
+        thread.start()
+
+        return jsonify({
+            'message': 'Sync started successfully',
+            'download_id': download_id,
+            'url': url,
+            'output_dir': output_dir
+        })
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
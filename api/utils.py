@@ -10,6 +10,8 @@ from flask import Blueprint, jsonify, request, Response
 from youtube_audio_extractor.core import validate_youtube_url
 from youtube_audio_extractor.chapters import get_video_chapters, has_chapters
 from youtube_audio_extractor.formats import list_formats
+from youtube_audio_extractor.splitting import DEFAULT_MAX_SIZE_MB, SIZE_PRESETS
+from youtube_audio_extractor.catalog import get_catalog
 from .shared import download_progress
 from .logging_utils import main_logger
 
@@ -53,14 +55,14 @@ def get_download_location(download_id):
         # Get the downloads directory path
         downloads_dir = os.path.abspath('downloads')
 
-        # Find the most recent MP3 file in the downloads directory
-        mp3_files = list(Path(downloads_dir).glob("*.mp3"))
-        if not mp3_files:
+        # The download's newest MP3 file from the catalog (no directory scan), else the library's newest
+        catalog = get_catalog()
+        mp3_files = [f for f in catalog.files(download_id) if f.suffix.lower() == '.mp3' and f.is_file()]
+        latest_file = mp3_files[0] if mp3_files else catalog.latest('.mp3')
+        if latest_file is None or not latest_file.is_file():
             main_logger.error(f"No MP3 files found for download: {download_id[:8]}")
             return jsonify({'error': 'No MP3 files found'}), 404
-
-        # Get the most recent MP3 file
-        latest_file = max(mp3_files, key=lambda f: f.stat().st_mtime)
+        latest_file = latest_file.resolve()
         main_logger.info(f"Found download file: {latest_file.name} ({latest_file.stat().st_size} bytes)")
 
         response = jsonify({
@@ -125,30 +127,18 @@ def get_formats(url):
 def list_downloads():
     """List all downloaded files and folders"""
     try:
-        downloads_dir = Path('downloads')
-        if not downloads_dir.exists():
-            return jsonify({'downloads': []})
-
+        catalog = get_catalog()
         downloads = []
 
-        for item in downloads_dir.iterdir():
-            if item.is_file() and item.suffix.lower() == '.mp3':
-                # MP3 file
-                downloads.append({
-                    'name': item.name,
-                    'type': 'file',
-                    'size': item.stat().st_size,
-                    'modified': item.stat().st_mtime
-                })
-            elif item.is_dir():
-                # Folder - count MP3 files inside
-                mp3_count = len(list(item.glob('*.mp3')))
-                downloads.append({
-                    'name': item.name,
-                    'type': 'folder',
-                    'mp3_count': mp3_count,
-                    'modified': item.stat().st_mtime
-                })
+        # Files as they appear in the flat layout, wherever the library layout keeps them (see catalog.py)
+        for item in catalog.browse('.mp3'):
+            if item['type'] == 'file':
+                path = catalog.root / item['path']
+                if not path.is_file():
+                    catalog.forget(path)  # deleted outside the app
+                    continue
+                item['size'] = path.stat().st_size
+            downloads.append(item)
 
         # Sort by modification time (newest first)
         downloads.sort(key=lambda x: x['modified'], reverse=True)
@@ -176,6 +166,16 @@ def get_bitrates():
     })
 
 
+@utils_bp.route('/api/split-sizes')
+def get_split_sizes():
+    """Get the size limit presets for splitting large files"""
+    return jsonify({
+        'default': DEFAULT_MAX_SIZE_MB,
+        'presets': [{'value': name, 'size_mb': size, 'label': f'{size} MB ({name})'}
+                    for name, size in SIZE_PRESETS.items()]
+    })
+
+
 @utils_bp.route('/api/open-folder', methods=['POST'])
 def open_folder():
     """Open file browser at specified location"""
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for playlist enumeration.
+
+Compares keeping the raw yt-dlp entry dicts of a large channel listing
+(what get_playlist_info used to return) with the compact column-oriented
+PlaylistEntries container. The entries are synthetic but shaped like the
+flat entries yt-dlp yields for a channel's uploads tab.
+
+Usage: python benchmark_playlist_memory.py [number_of_entries]
+"""
+
+import sys
+import tracemalloc
+
+from youtube_audio_extractor.entries import PlaylistEntries
+
+
+def fake_flat_entry(i):
+    """A flat channel entry with the fields yt-dlp fills in for each upload."""
+    video_id = f"{i:011d}"
+    return {
+        '_type': 'url',
+        'ie_key': 'Youtube',
+        'id': video_id,
+        'url': f'https://www.youtube.com/watch?v={video_id}',
+        'title': f'Upload number {i} - a reasonably long video title for a channel',
+        'description': 'First lines of the description as shown in the uploads grid. ' * 2,
+        'duration': 600.0 + i % 3600,
+        'channel_id': 'UCxxxxxxxxxxxxxxxxxxxxxx',
+        'channel': 'Some Channel',
+        'channel_url': 'https://www.youtube.com/channel/UCxxxxxxxxxxxxxxxxxxxxxx',
+        'uploader': 'Some Channel',
+        'uploader_id': '@somechannel',
+        'uploader_url': 'https://www.youtube.com/@somechannel',
+        'thumbnails': [
+            {'url': f'https://i.ytimg.com/vi/{video_id}/{name}.jpg', 'height': height, 'width': width}
+            for name, width, height in (('default', 120, 90), ('mqdefault', 320, 180),
+                                        ('hqdefault', 480, 360), ('sddefault', 640, 480))
+        ],
+        'timestamp': 1700000000 + i * 3600,
+        'release_timestamp': None,
+        'availability': None,
+        'view_count': 1000 + i,
+        'live_status': None,
+        'channel_is_verified': None,
+        '__x_forwarded_for_ip': None,
+    }
+
+
+def measure(build):
+    """Return (result, retained bytes, peak bytes) of building a listing."""
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, peak
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    print(f"📊 Enumerating {count} playlist entries")
+    print("=" * 50)
+
+    raw, raw_current, raw_peak = measure(lambda: [fake_flat_entry(i) for i in range(count)])
+    del raw
+    compact, compact_current, compact_peak = measure(
+        lambda: PlaylistEntries.from_infos(fake_flat_entry(i) for i in range(count)))
+
+    mb = 1024 * 1024
+    print(f"Raw entry dicts:   {raw_current / mb:8.2f} MB retained, {raw_peak / mb:8.2f} MB peak")
+    print(f"PlaylistEntries:   {compact_current / mb:8.2f} MB retained, {compact_peak / mb:8.2f} MB peak")
+    print(f"Reduction:         {raw_current / compact_current:8.1f}x retained")
+    print(f"Check: {len(compact)} entries, last = {compact[-1]}")
+
+
+if __name__ == "__main__":
+    main()
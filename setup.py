@@ -37,6 +37,10 @@ setup(
     ],
     python_requires=">=3.7",
     install_requires=requirements,
+    extras_require={
+        # --split-at-silence
+        "silence": ["numpy>=1.17"],
+    },
     entry_points={
         "console_scripts": [
             "youtube-audio-extractor=youtube_audio_extractor.cli:cli",
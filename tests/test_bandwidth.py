@@ -0,0 +1,72 @@
+"""
+Tests for the bandwidth governor: weighted shares applied through yt-dlp's rate limiter.
+"""
+
+import pytest
+
+from youtube_audio_extractor.bandwidth import BandwidthGovernor, parse_rate
+
+
+class FakeYoutubeDL:
+    """Stands in for a pooled YoutubeDL: the HTTP downloader reads params['ratelimit'] per chunk."""
+
+    def __init__(self, **params):
+        self.params = params
+
+
+def test_parse_rate():
+    assert parse_rate('2M') == 2 * 1024 * 1024
+    assert parse_rate('500K') == 500 * 1024
+    assert parse_rate(1000) == 1000
+    assert parse_rate(None) is None
+    assert parse_rate('0') is None
+    with pytest.raises(ValueError):
+        parse_rate('fast')
+
+
+def test_shares_follow_lane_weights_and_caps():
+    governor = BandwidthGovernor(global_limit=1000)
+    with governor.job('bulk') as bulk, governor.job('interactive') as interactive:
+        assert (bulk.share, interactive.share) == (200, 800)
+        with governor.job('interactive', limit=100) as capped:
+            # The capped download leaves the rest of its share to the others
+            assert capped.share == 100
+            assert (bulk.share, interactive.share) == (180, 720)
+    assert governor.status()['jobs'] == []
+
+
+def test_share_is_the_running_downloads_ratelimit():
+    governor = BandwidthGovernor(global_limit=1000)
+    first = FakeYoutubeDL()
+    second = FakeYoutubeDL(concurrent_fragment_downloads=4)
+
+    with governor.job('bulk') as job, job.attach(first):
+        assert first.params['ratelimit'] == 1000
+        with governor.job('bulk') as other, other.attach(second):
+            # Re-balanced on the running download; fragments split the share between connections
+            assert first.params['ratelimit'] == 500
+            assert second.params['ratelimit'] == 125
+        assert first.params['ratelimit'] == 1000
+
+        governor.configure(global_limit=None)
+        assert first.params['ratelimit'] is None
+
+    # A released instance is no longer touched by later re-balances
+    governor.configure(global_limit=1000)
+    with governor.job('bulk'):
+        assert first.params['ratelimit'] is None
+
+
+def test_ydl_options_meter_downloads():
+    governor = BandwidthGovernor(per_job_limit=300)
+    with governor.job('bulk') as job:
+        options = job.ydl_options()
+        assert options['ratelimit'] == 300
+
+        hook = options['progress_hooks'][0]
+        # The first report may include bytes resumed from a .part file
+        hook({'status': 'downloading', 'filename': 'a.webm', 'downloaded_bytes': 5000, 'speed': 250})
+        hook({'status': 'downloading', 'filename': 'a.webm', 'downloaded_bytes': 5600, 'speed': 280})
+        hook({'status': 'finished', 'filename': 'a.webm'})
+        assert job.status()['downloaded_bytes'] == 600
+        assert job.status()['speed'] == 280
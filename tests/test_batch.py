@@ -0,0 +1,104 @@
+"""
+Tests for batch downloads: URL lists, the aggregate progress stream, and
+manifests that record every item, whether it succeeded or failed.
+"""
+
+import json
+
+import pytest
+from flask import Flask
+
+from api.batch import batch_bp
+from youtube_audio_extractor import batch
+from youtube_audio_extractor.batch import BatchProgress, read_url_list, run_batch
+
+
+def test_read_url_list():
+    lines = ['https://youtu.be/a\n', '\n', '# later\n', '  https://youtu.be/b  \n', 'https://youtu.be/a\n']
+
+    assert read_url_list(lines) == ['https://youtu.be/a', 'https://youtu.be/b']
+
+
+def test_progress_folds_items_into_one_stream():
+    events = []
+    progress = BatchProgress(2, events.append)
+    first, second = progress.item_hook(0, 'a'), progress.item_hook(1, 'b')
+
+    first({'status': 'downloading', 'downloaded_bytes': 50, 'total_bytes': 100})
+    first({'status': 'downloading', 'downloaded_bytes': 51, 'total_bytes': 100})
+    second({'status': 'completed', 'message': 'Done'})
+    progress.finish_item(0, True)
+    progress.finish_item(1, False, 'Video unavailable')
+
+    assert [event['status'] for event in events] == [
+        'batch_progress', 'item_completed', 'batch_item_finished', 'batch_item_finished']
+    # Downloading counts as 90% of an item; a repeated percentage is not reported again
+    assert events[0]['percent'] == 22
+    assert events[1]['message'] == '[2/2] Done'
+    assert (events[3]['successful_downloads'], events[3]['failed_downloads']) == (1, 1)
+    assert 'Failed: Video unavailable' in events[3]['message']
+
+
+@pytest.fixture
+def downloads(monkeypatch):
+    """Fake downloads: 'ok' URLs succeed, 'bad' ones report an error, 'crash' ones raise."""
+    calls = []
+
+    def download_audio_with_progress(url, output_dir, progress_hook=None, **options):
+        calls.append((url, options))
+        if 'crash' in url:
+            raise TypeError("'int' object is not iterable")
+        if 'bad' in url:
+            progress_hook({'status': 'error', 'message': 'Video unavailable'})
+            return False
+        progress_hook({'status': 'completed', 'message': 'Done', 'files': [f'{url[-2:]}.mp3'],
+                       'output_dir': output_dir})
+        return True
+
+    monkeypatch.setattr(batch, 'download_audio_with_progress', download_audio_with_progress)
+    return calls
+
+
+def test_failing_items_do_not_stop_the_batch(tmp_path, downloads):
+    urls = ['https://youtu.be/ok1', 'https://youtu.be/bad', 'https://youtu.be/crash', 'https://youtu.be/ok2']
+    manifest_path = tmp_path / 'batch.json'
+    events = []
+
+    manifest = run_batch(urls, workers=2, manifest_path=manifest_path, progress_hook=events.append, codec='opus')
+
+    assert (manifest['successful'], manifest['failed']) == (2, 2)
+    assert [item['status'] for item in manifest['items']] == ['completed', 'failed', 'failed', 'completed']
+    assert manifest['items'][0]['files'] == ['k1.mp3']
+    assert manifest['items'][1]['error'] == 'Video unavailable'
+    assert manifest['items'][2]['error'] == "'int' object is not iterable"
+    assert all('elapsed_seconds' in item for item in manifest['items'])
+    # Items run in the bulk lane with the batch's options
+    assert sorted(url for url, _ in downloads) == sorted(urls)
+    assert all(options['lane'] == 'bulk' and options['codec'] == 'opus' for _, options in downloads)
+
+    # The manifest on disk is the final one
+    saved = json.loads(manifest_path.read_text())
+    assert [item['status'] for item in saved['items']] == [item['status'] for item in manifest['items']]
+    assert (saved['successful'], saved['failed']) == (2, 2)
+    assert events[-1]['status'] == 'batch_completed'
+
+
+def test_invalid_options_fail_every_item_instead_of_escaping(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+    manifest = run_batch(['https://www.youtube.com/watch?v=dQw4w9WgXcQ'], manifest_path=tmp_path / 'batch.json',
+                         progress_hook=lambda d: None, codec=5)
+
+    assert (manifest['successful'], manifest['failed']) == (0, 1)
+    assert manifest['items'][0]['status'] == 'failed'
+    assert manifest['items'][0]['error'] == 'Invalid codec: 5'
+
+
+def test_batch_endpoint_rejects_invalid_formats():
+    app = Flask(__name__)
+    app.register_blueprint(batch_bp)
+
+    response = app.test_client().post('/api/batch', json={'urls': ['https://youtu.be/a'], 'codec': 5})
+
+    assert response.status_code == 400
+    assert response.json['error'] == 'Invalid codec: 5'
@@ -0,0 +1,105 @@
+"""
+Tests for the library catalog: moving a library between layouts, and catalogs
+created before the inode columns existed.
+"""
+
+import json
+import sqlite3
+
+import pytest
+
+from youtube_audio_extractor.catalog import CATALOG_FILENAME, Catalog
+from youtube_audio_extractor.library_store import BlobStore
+
+VIDEO_ID = 'dQw4w9WgXcQ'
+
+
+@pytest.fixture
+def root(tmp_path):
+    """A flat library: one single video with its chapter files, and a playlist folder."""
+    root = tmp_path / 'downloads'
+    (root / 'chapters').mkdir(parents=True)
+    (root / 'My Playlist').mkdir()
+    (root / 'Song.mp3').write_bytes(b'a' * 100)
+    (root / 'Song.info.json').write_text(json.dumps({'id': VIDEO_ID}))
+    (root / 'chapters' / 'Song_chapter01_Intro.mp3').write_bytes(b'c' * 10)
+    (root / 'My Playlist' / '01_Track.mp3').write_bytes(b'p' * 50)
+    return root
+
+
+def make_catalog(root):
+    return Catalog(root, store=BlobStore(root / '.store'))
+
+
+def paths(root):
+    return sorted(path.relative_to(root).as_posix() for path in root.rglob('*')
+                  if path.is_file() and not path.name.startswith('.'))
+
+
+def outline(listing):
+    return sorted((item['name'], item['type'], item.get('mp3_count')) for item in listing)
+
+
+def test_migrate_shards_single_videos_and_back(root):
+    catalog = make_catalog(root)
+    before = paths(root)
+    listing = catalog.browse()
+
+    summary = catalog.migrate('id', dry_run=True)
+    assert summary == {'layout': 'id', 'moved': 3, 'skipped': 0, 'dry_run': True}
+    assert paths(root) == before
+    assert catalog.layout == 'flat'
+
+    catalog.migrate('id')
+    home = f'by-id/dQ/{VIDEO_ID}'
+    assert paths(root) == ['My Playlist/01_Track.mp3', f'{home}/Song.info.json', f'{home}/Song.mp3',
+                           f'{home}/chapters/Song_chapter01_Intro.mp3']
+    assert catalog.layout == 'id'
+    assert catalog.home_for(VIDEO_ID) == root / home
+    # Browsing still shows the flat layout, and the emptied chapters folder is gone
+    assert outline(catalog.browse()) == outline(listing)
+    assert not (root / 'chapters').exists()
+
+    assert catalog.migrate('flat')['moved'] == 3
+    assert paths(root) == before
+    assert not (root / 'by-id').exists()
+
+
+def test_migrate_skips_files_whose_target_exists(root):
+    catalog = make_catalog(root)
+    target = root / 'by-id' / 'dQ' / VIDEO_ID / 'Song.mp3'
+    target.parent.mkdir(parents=True)
+    target.write_bytes(b'other')
+
+    summary = catalog.migrate('id')
+
+    assert (summary['moved'], summary['skipped']) == (2, 1)
+    assert (root / 'Song.mp3').read_bytes() == b'a' * 100
+
+
+def test_unknown_layout_is_rejected(root):
+    with pytest.raises(ValueError):
+        make_catalog(root).migrate('by-artist')
+
+
+def test_catalog_from_before_the_inode_columns_is_upgraded(root):
+    db = sqlite3.connect(root / CATALOG_FILENAME)
+    db.executescript("""
+        CREATE TABLE files (path TEXT PRIMARY KEY, browse TEXT NOT NULL, home TEXT, video_id TEXT,
+                            download_id TEXT, size INTEGER, modified REAL);
+        CREATE TABLE settings (key TEXT PRIMARY KEY, value TEXT);
+        INSERT INTO settings VALUES ('indexed', '0');
+        INSERT INTO files VALUES ('Song.mp3', 'Song.mp3', '', NULL, NULL, 1, 0);
+        INSERT INTO files VALUES ('Gone.mp3', 'Gone.mp3', '', NULL, NULL, 1, 0);
+    """)
+    db.commit()
+    db.close()
+
+    catalog = make_catalog(root)
+    (path, size, _, inode, links), = catalog.entries()
+
+    # Stale rows are dropped and the remaining ones are re-read from disk
+    song = root / 'Song.mp3'
+    assert (path, size, links) == (song, 100, 1)
+    assert inode == (song.stat().st_dev, song.stat().st_ino)
+    assert catalog.usage() == 100
@@ -0,0 +1,52 @@
+"""
+Tests for playlist checkpoints: resuming an interrupted job by video ID.
+"""
+
+from youtube_audio_extractor.checkpoints import PlaylistCheckpoint, entry_id
+from youtube_audio_extractor.entries import PlaylistEntry
+
+URL = 'https://www.youtube.com/playlist?list=PL1'
+
+
+def run_entry(checkpoint, video_id, index, success, files=()):
+    video_dir = checkpoint.video_dir(video_id, checkpoint.playlist_dir / f'{index:02d}_{video_id}')
+    video_dir.mkdir(exist_ok=True)
+    checkpoint.start(video_id, index, video_id, f'https://youtu.be/{video_id}', video_dir)
+    for name in files:
+        (video_dir / name).write_bytes(b'audio')
+    checkpoint.finish(video_id, success, None if success else 'HTTP Error 429')
+    return video_dir
+
+
+def test_resume_skips_completed_and_retries_the_rest(tmp_path):
+    checkpoint = PlaylistCheckpoint(tmp_path, URL, 'Playlist')
+    run_entry(checkpoint, 'aaa', 1, True, files=['a.mp3', 'a.mp3.part'])
+    failed_dir = run_entry(checkpoint, 'bbb', 2, False)
+    # Interrupted while the third video was downloading
+    checkpoint.start('ccc', 3, 'ccc', 'https://youtu.be/ccc', tmp_path / '03_ccc')
+
+    resumed = PlaylistCheckpoint(tmp_path, URL, 'Playlist', resume=True)
+
+    assert resumed.is_completed('aaa')
+    assert not resumed.is_completed('bbb') and not resumed.is_completed('ccc')
+    assert resumed.counts() == {'completed': 1, 'failed': 1, 'running': 1}
+    assert resumed.entries['aaa']['outputs'] == ['01_aaa/a.mp3']
+    assert resumed.entries['bbb']['error'] == 'HTTP Error 429'
+    # A retried video keeps its directory (and .part files) even if its position changed
+    assert resumed.video_dir('bbb', tmp_path / '05_bbb') == failed_dir
+
+    run_entry(resumed, 'bbb', 5, True)
+    assert resumed.entries['bbb']['attempts'] == 2
+    assert 'error' not in resumed.entries['bbb']
+
+
+def test_checkpoint_of_another_playlist_or_without_resume_starts_over(tmp_path):
+    run_entry(PlaylistCheckpoint(tmp_path, URL, 'Playlist'), 'aaa', 1, True)
+
+    assert not PlaylistCheckpoint(tmp_path, URL, 'Playlist').is_completed('aaa')
+    assert not PlaylistCheckpoint(tmp_path, URL + '2', 'Other', resume=True).is_completed('aaa')
+
+
+def test_entry_id_falls_back_to_the_url():
+    assert entry_id(PlaylistEntry(1, 'abc', 'https://youtu.be/abc')) == 'abc'
+    assert entry_id(PlaylistEntry(1, None, 'https://example.com/video')) == 'https://example.com/video'
@@ -0,0 +1,88 @@
+"""
+Tests for the adaptive (AIMD) download concurrency controller.
+"""
+
+import threading
+import time
+
+from youtube_audio_extractor.concurrency import (
+    AdaptiveConcurrency,
+    is_throttle_error,
+    run_jobs,
+)
+
+
+def speed(controller, name, bytes_per_second):
+    controller.observe({'status': 'downloading', 'filename': name, 'speed': bytes_per_second})
+
+
+def test_throttle_errors_are_recognised():
+    assert is_throttle_error('ERROR: HTTP Error 429: Too Many Requests')
+    assert is_throttle_error('Server is rate-limiting requests')
+    assert not is_throttle_error('Video unavailable')
+    assert not is_throttle_error(None)
+
+
+def test_throughput_gains_raise_downloads_then_fragments():
+    reports = []
+    controller = AdaptiveConcurrency(initial=1, max_limit=2, max_fragments=2, interval=0,
+                                     report=lambda message, metrics: reports.append(message))
+    controller.acquire()
+    speed(controller, 'a', 100)
+    assert controller.limit == 2
+
+    controller.acquire()
+    speed(controller, 'b', 100)
+    assert (controller.limit, controller.fragments) == (2, 2)
+    assert controller.ydl_options()['concurrent_fragment_downloads'] == 2
+
+    # Nothing left to raise
+    speed(controller, 'b', 150)
+    assert controller.increases == 2
+    assert [message.split(' (')[0] for message in reports] == ['Raising concurrency to 2 downloads x 1 fragments',
+                                                                'Raising concurrency to 2 downloads x 2 fragments']
+
+
+def test_throughput_loss_gives_the_download_back():
+    controller = AdaptiveConcurrency(initial=1, max_limit=4, interval=0)
+    controller.acquire()
+    speed(controller, 'a', 1000)
+    controller.acquire()
+    # Two downloads move less than one did
+    speed(controller, 'a', 400)
+
+    assert controller.limit == 1
+    assert [decision['action'] for decision in controller.decisions] == ['increase', 'decrease']
+
+
+def test_throttling_halves_downloads_and_fragments():
+    controller = AdaptiveConcurrency(initial=4, max_limit=8)
+    controller.fragments = 4
+
+    controller.record_result(False, 'HTTP Error 429: Too Many Requests')
+
+    assert (controller.limit, controller.fragments) == (2, 2)
+    assert controller.throttle_events == 1
+    controller.record_result(False, 'HTTP Error 429')
+    controller.record_result(False, 'HTTP Error 429')
+    assert (controller.limit, controller.fragments) == (1, 1)
+
+
+def test_run_jobs_keeps_order_within_the_limit():
+    controller = AdaptiveConcurrency(initial=2, max_limit=2, interval=3600)
+    running = []
+    peak = []
+    lock = threading.Lock()
+
+    def job(number):
+        with lock:
+            running.append(number)
+            peak.append(len(running))
+        time.sleep(0.01)
+        with lock:
+            running.remove(number)
+        return number * 10
+
+    assert run_jobs(job, range(6), controller=controller) == [0, 10, 20, 30, 40, 50]
+    assert max(peak) <= 2
+    assert controller.active == 0
@@ -0,0 +1,83 @@
+"""
+Tests for the column-oriented playlist entries.
+"""
+
+from youtube_audio_extractor.entries import (
+    PlaylistEntries,
+    PlaylistEntry,
+    open_collection,
+)
+
+
+def fields(entry):
+    return entry.index, entry.id, entry.url, entry.title, entry.duration
+
+
+ENTRIES = [
+    PlaylistEntry(1, 'aaa', 'https://youtu.be/aaa', 'First', 212),
+    PlaylistEntry(2, 'bbb', 'https://youtu.be/bbb', None, None),
+    PlaylistEntry(3, 'ccc', 'https://youtu.be/ccc', 'Third', 61.5),
+]
+
+
+def collect(entries):
+    collected = PlaylistEntries()
+    for entry in entries:
+        collected.append(entry)
+    return collected
+
+
+def test_entries_round_trip():
+    collected = collect(ENTRIES)
+
+    assert len(collected) == 3
+    assert [fields(entry) for entry in collected] == [fields(entry) for entry in ENTRIES]
+    assert fields(collected[-1]) == fields(ENTRIES[-1])
+    # An unknown duration stays unknown rather than becoming the column's placeholder
+    assert collected[1].duration is None
+
+
+def test_slices_are_entries_too():
+    part = collect(ENTRIES)[1:]
+
+    assert isinstance(part, PlaylistEntries)
+    assert [fields(entry) for entry in part] == [fields(entry) for entry in ENTRIES[1:]]
+    assert [entry.index for entry in collect(ENTRIES)[::-2]] == [3, 1]
+    assert len(collect(ENTRIES)[5:]) == 0
+
+
+def test_entries_from_a_listing():
+    listing = iter([
+        {'id': 'aaa', 'url': 'https://youtu.be/aaa', 'title': 'First', 'duration': 212, 'view_count': 10},
+        None,  # unavailable video
+        {'id': 'bbb', 'webpage_url': 'https://www.youtube.com/watch?v=bbb'},
+        {'id': 'ccc', 'url': 'https://youtu.be/ccc'},
+    ])
+
+    collected = PlaylistEntries.from_infos(listing, limit=2)
+
+    assert [fields(entry) for entry in collected] == [
+        (1, 'aaa', 'https://youtu.be/aaa', 'First', 212),
+        (2, 'bbb', 'https://www.youtube.com/watch?v=bbb', None, None),
+    ]
+    # The rest of the listing is not read
+    assert next(listing)['id'] == 'ccc'
+
+
+class FakeYoutubeDL:
+    def __init__(self, pages):
+        self.pages = pages
+
+    def extract_info(self, url, download=True, process=True, ie_key=None):
+        assert not download and not process
+        return self.pages[url]
+
+
+def test_channel_url_redirects_to_its_uploads():
+    uploads = {'_type': 'playlist', 'entries': iter([])}
+    ydl = FakeYoutubeDL({
+        'https://www.youtube.com/@channel': {'_type': 'url', 'url': 'https://www.youtube.com/@channel/videos'},
+        'https://www.youtube.com/@channel/videos': uploads,
+    })
+
+    assert open_collection(ydl, 'https://www.youtube.com/@channel') is uploads
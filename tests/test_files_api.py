@@ -0,0 +1,100 @@
+"""
+Tests for serving virtual chapters as byte ranges, with HTTP Range requests.
+"""
+
+import pytest
+from flask import Flask
+
+from api import files
+from api.files import parse_range
+from youtube_audio_extractor.virtual_chapters import write_chapter_index
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz: 417-byte frames of 1152 samples
+FRAME_LENGTH = 417
+FRAME_SECONDS = 1152 / 44100
+
+
+def frame(marker):
+    return bytes([0xFF, 0xFB, 0x90, 0x00]) + bytes([marker]) * (FRAME_LENGTH - 4)
+
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None), ('', None), ('bytes=-', None), ('items=0-5', None),
+    ('bytes=0-99', (0, 99)), ('bytes=100-', (100, 999)), ('bytes=-10', (990, 999)),
+    ('bytes=-5000', (0, 999)), ('bytes=900-5000', (900, 999)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize('header', ['bytes=1000-', 'bytes=50-10'])
+def test_unsatisfiable_ranges(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1000)
+
+
+class Storage:
+    """Stands in for the storage quota, which records files played through the API."""
+
+    def touch(self, path):
+        pass
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    """A test client serving downloads/album.mp3: six frames, chapter 2 starting at the fourth."""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(files, 'get_storage_manager', Storage)
+    audio_file = tmp_path / 'downloads' / 'album.mp3'
+    audio_file.parent.mkdir()
+    audio_file.write_bytes(b''.join(frame(marker) for marker in range(1, 7)))
+    write_chapter_index(audio_file, [
+        {'index': 1, 'start_time': 0, 'title': 'One'},
+        {'index': 2, 'start_time': 2.8 * FRAME_SECONDS, 'title': 'Two'},
+    ])
+
+    app = Flask(__name__)
+    app.register_blueprint(files.files_bp)
+    return app.test_client()
+
+
+def test_chapter_index_is_listed(client):
+    response = client.get('/api/files/album.mp3/chapters')
+
+    assert response.status_code == 200
+    assert [chapter['url'] for chapter in response.json['chapters']] == [
+        '/api/files/album.mp3/chapters/1', '/api/files/album.mp3/chapters/2']
+
+
+def test_whole_chapter(client):
+    response = client.get('/api/files/album.mp3/chapters/2')
+
+    assert response.status_code == 200
+    assert response.headers['Accept-Ranges'] == 'bytes'
+    assert response.data == frame(4) + frame(5) + frame(6)
+
+
+def test_range_of_a_chapter(client):
+    response = client.get('/api/files/album.mp3/chapters/2', headers={'Range': 'bytes=410-419'})
+
+    assert response.status_code == 206
+    assert response.headers['Content-Range'] == f'bytes 410-419/{3 * FRAME_LENGTH}'
+    assert response.headers['Content-Length'] == '10'
+    assert response.data == (frame(4) + frame(5))[410:420]
+
+    response = client.get('/api/files/album.mp3/chapters/1', headers={'Range': 'bytes=-3'})
+    assert response.status_code == 206
+    assert response.data == frame(3)[-3:]
+
+
+def test_range_outside_the_chapter(client):
+    response = client.get('/api/files/album.mp3/chapters/1', headers={'Range': f'bytes={3 * FRAME_LENGTH}-'})
+
+    assert response.status_code == 416
+    assert response.headers['Content-Range'] == f'bytes */{3 * FRAME_LENGTH}'
+
+
+def test_missing_chapters_and_files(client):
+    assert client.get('/api/files/album.mp3/chapters/3').status_code == 404
+    assert client.get('/api/files/other.mp3/chapters').status_code == 404
+    assert client.get('/api/files/../album.mp3/chapters').status_code == 404
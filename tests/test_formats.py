@@ -0,0 +1,80 @@
+"""
+Tests for choosing the smallest source audio format that still meets the
+requested output quality.
+"""
+
+import pytest
+
+from youtube_audio_extractor.encoding import output_formats
+from youtube_audio_extractor.formats import plan_source_format
+
+
+def fmt(format_id, acodec, abr=None, ext='webm', **fields):
+    return dict(format_id=format_id, acodec=acodec, abr=abr, ext=ext, vcodec='none', **fields)
+
+
+# The audio formats YouTube usually offers, with their MP3-equivalent quality
+YOUTUBE_FORMATS = [
+    fmt('139', 'mp4a.40.5', 48, ext='m4a'),  # 62 kbps
+    fmt('140', 'mp4a.40.2', 129, ext='m4a'),  # 168 kbps
+    fmt('249', 'opus', 50),  # 75 kbps
+    fmt('250', 'opus', 70),  # 105 kbps
+    fmt('251', 'opus', 130),  # 195 kbps
+]
+
+
+@pytest.mark.parametrize('bitrate, codec, expected', [
+    ('96', 'mp3', '250'),
+    ('128', 'mp3', '140'),
+    ('192', 'mp3', '251'),
+    ('96', 'opus', '140'),  # 144 kbps MP3-equivalent
+    ('64', 'opus', '250'),
+    (['96', '128'], ['mp3', 'opus'], '251'),  # the most demanding output decides
+])
+def test_smallest_sufficient_source(bitrate, codec, expected):
+    format_id, reason = plan_source_format(YOUTUBE_FORMATS, output_formats(bitrate, codec), duration=300)
+
+    assert format_id == expected
+    assert 'smallest source meeting' in reason
+
+
+def test_best_source_when_none_is_sufficient():
+    format_id, reason = plan_source_format(YOUTUBE_FORMATS, output_formats('320', 'mp3'), duration=300)
+
+    assert format_id == '251'
+    assert 'no source meets 320 kbps' in reason
+
+
+@pytest.mark.parametrize('formats, expected', [
+    # Without abr the total bitrate is used
+    ([fmt('140', 'mp4a.40.2', tbr=130, ext='m4a'), fmt('251', 'opus', tbr=140)], '140'),
+    # Codecs without a known efficiency count as MP3
+    ([fmt('1', 'ac-3', 125), fmt('2', 'opus', 130)], '2'),
+    ([fmt('1', 'ac-3', 128), fmt('2', 'opus', 130)], '1'),
+    # An exact file size wins over one estimated from the bitrate
+    ([fmt('140', 'mp4a.40.2', 129, ext='m4a', filesize=6_000_000), fmt('251', 'opus', 130, filesize=4_000_000)],
+     '251'),
+    # Dubbed tracks and dynamic-range-compressed variants are skipped
+    ([fmt('251-0', 'opus', 130, language_preference=-1), fmt('251-1', 'opus', 130, language_preference=10),
+      fmt('140', 'mp4a.40.2', 129, ext='m4a', language_preference=-1)], '251-1'),
+    ([fmt('251-drc', 'opus', 130, has_drc=True), fmt('251', 'opus', 130)], '251'),
+    ([fmt('251-drc', 'opus', 130, has_drc=True)], '251-drc'),
+])
+def test_fallbacks(formats, expected):
+    assert plan_source_format(formats, output_formats('128', 'mp3'), duration=300)[0] == expected
+
+
+def test_no_bitrate_information_keeps_the_default():
+    formats = [fmt('140', 'mp4a.40.2', ext='m4a'), fmt('251', 'opus')]
+
+    format_id, reason = plan_source_format(formats, output_formats('192', 'mp3'))
+
+    assert format_id is None
+    assert 'keeping default selection' in reason
+
+
+def test_reason_compares_against_the_default_selection():
+    _, reason = plan_source_format(YOUTUBE_FORMATS, output_formats('96', 'mp3'), duration=300)
+
+    assert reason.startswith('250 (opus, 70 kbps, ~2.5 MB)')
+    assert reason.endswith('default selection 140 would be ~4.6 MB')
@@ -0,0 +1,94 @@
+"""
+Tests for the deduplicated library: duplicate files become links to one
+copy in the blob store, and blobs nothing links to are pruned.
+"""
+
+import os
+
+import pytest
+
+from youtube_audio_extractor.encoding import output_formats
+from youtube_audio_extractor.library_store import BlobStore, dedupe_library
+
+MP3 = output_formats('192', 'mp3')[0]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return BlobStore(tmp_path / 'downloads' / '.store')
+
+
+@pytest.fixture
+def library(tmp_path):
+    """The same song in two playlists and as a single, plus another song of the same size."""
+    root = tmp_path / 'downloads'
+    for folder in ('Playlist A', 'Playlist B'):
+        (root / folder).mkdir(parents=True)
+    (root / 'Playlist A' / 'Song.mp3').write_bytes(b's' * 1000)
+    (root / 'Playlist B' / '01_Song.mp3').write_bytes(b's' * 1000)
+    (root / 'Song.mp3').write_bytes(b's' * 1000)
+    (root / 'Other.mp3').write_bytes(b'o' * 1000)
+    (root / 'Short.mp3').write_bytes(b's' * 10)
+    (root / 'notes.txt').write_bytes(b's' * 1000)
+    return root
+
+
+def inode(path):
+    stat = path.stat()
+    return stat.st_dev, stat.st_ino
+
+
+def test_duplicates_are_linked_to_one_copy(library, store):
+    summary = dedupe_library(library, workers=2, store=store)
+
+    # Short.mp3 has a size of its own, so it is never hashed
+    assert summary == {'scanned': 5, 'hashed': 4, 'duplicates': 2, 'reclaimed': 2000, 'dry_run': False}
+    songs = [library / 'Playlist A' / 'Song.mp3', library / 'Playlist B' / '01_Song.mp3', library / 'Song.mp3']
+    assert len({inode(path) for path in songs}) == 1
+    assert songs[0].stat().st_nlink == 4  # three library files and the blob
+    assert all(path.read_bytes() == b's' * 1000 for path in songs)
+    assert (library / 'Other.mp3').stat().st_nlink == 1
+
+
+def test_dry_run_only_counts(library, store):
+    summary = dedupe_library(library, store=store, dry_run=True)
+
+    assert (summary['duplicates'], summary['reclaimed']) == (2, 2000)
+    assert (library / 'Song.mp3').stat().st_nlink == 1
+    assert not store.directory.exists()
+
+
+def test_files_that_are_already_linked_count_once(library, store):
+    os.unlink(library / 'Song.mp3')
+    os.link(library / 'Playlist A' / 'Song.mp3', library / 'Song.mp3')
+
+    summary = dedupe_library(library, store=store)
+
+    assert (summary['scanned'], summary['duplicates'], summary['reclaimed']) == (5, 1, 1000)
+    assert inode(library / 'Song.mp3') == inode(library / 'Playlist B' / '01_Song.mp3')
+
+    # Running again finds nothing left to reclaim
+    assert dedupe_library(library, store=store)['reclaimed'] == 0
+
+
+def test_stored_video_is_linked_into_a_new_place(library, store):
+    store.remember('dQw4w9WgXcQ', MP3, library / 'Song.mp3')
+
+    assert store.has('dQw4w9WgXcQ', MP3)
+    assert not store.has('other', MP3)
+    linked = store.recall('dQw4w9WgXcQ', MP3, library / 'Playlist C')
+    assert linked == library / 'Playlist C' / 'Song.mp3'
+    assert inode(linked) == inode(library / 'Song.mp3')
+    assert store.recall('other', MP3, library / 'Playlist C') is None
+
+
+def test_prune_removes_blobs_nothing_links_to(library, store):
+    dedupe_library(library, store=store)
+    for path in (library / 'Playlist A' / 'Song.mp3', library / 'Playlist B' / '01_Song.mp3'):
+        path.unlink()
+
+    assert store.prune() == (0, 0)  # Song.mp3 still links to it
+
+    (library / 'Song.mp3').unlink()
+    assert store.prune() == (1, 1000)
+    assert not list((store.directory / 'objects').glob('*/*'))
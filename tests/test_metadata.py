@@ -0,0 +1,47 @@
+"""
+Tests for metadata prefetching: one video failing to resolve never ends the others.
+"""
+
+import threading
+
+from youtube_audio_extractor.metadata import MetadataCache, MetadataPrefetcher
+
+
+def test_failures_are_reported_per_video(monkeypatch):
+    prefetcher = MetadataPrefetcher(workers=2, min_interval=0, cache=MetadataCache())
+
+    def fetch(url):
+        if url == 'broken':
+            raise KeyError('formats')
+        return {'id': url}
+
+    monkeypatch.setattr(prefetcher, 'fetch', fetch)
+    with prefetcher:
+        results = {url: (info, error) for _, url, info, error in prefetcher.resolve(['a', 'broken', 'b'])}
+
+        assert results['a'] == ({'id': 'a'}, None)
+        assert results['b'] == ({'id': 'b'}, None)
+        assert results['broken'][0] is None and isinstance(results['broken'][1], KeyError)
+
+        lookahead = prefetcher.lookahead(['broken', 'a'])
+        assert lookahead.get('broken') is None
+        assert lookahead.get('a') == {'id': 'a'}
+
+
+def test_close_drops_requests_that_have_not_started(monkeypatch):
+    prefetcher = MetadataPrefetcher(workers=1, min_interval=0, cache=MetadataCache())
+    started, release = threading.Event(), threading.Event()
+
+    def fetch(url):
+        started.set()
+        return release.wait(5)
+
+    monkeypatch.setattr(prefetcher, 'fetch', fetch)
+    running = prefetcher.submit('first')
+    started.wait(5)
+    waiting = prefetcher.submit('second')
+    prefetcher.close()
+    release.set()
+
+    assert waiting.cancelled()
+    assert running.result() is True
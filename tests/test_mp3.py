@@ -0,0 +1,81 @@
+"""
+Tests for MP3 frame parsing and the frame-exact helpers of parallel encoding.
+"""
+
+import io
+from types import SimpleNamespace
+
+from youtube_audio_extractor import encoding
+from youtube_audio_extractor.encoding import encode_parallel, plan_segments, trim_frames
+from youtube_audio_extractor.mp3 import id3v2_size, iter_frames, parse_frame_header
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, no CRC: 417 bytes, one more when padded
+FRAME_LENGTH = 417
+
+
+def frame(marker, padding=False):
+    """One frame whose payload is filled with the ``marker`` byte."""
+    header = bytes([0xFF, 0xFB, 0x92 if padding else 0x90, 0x00])
+    return header + bytes([marker]) * (FRAME_LENGTH + padding - len(header))
+
+
+def id3_tag(size):
+    """An ID3v2.4 tag with ``size`` bytes of (empty) frames."""
+    syncsafe = bytes([(size >> shift) & 0x7F for shift in (21, 14, 7, 0)])
+    return b'ID3\x04\x00\x00' + syncsafe + bytes(size)
+
+
+def test_frame_header_is_parsed():
+    assert parse_frame_header(frame(1)[:4]) == (FRAME_LENGTH, 1152, 44100)
+    assert parse_frame_header(frame(1, padding=True)[:4]) == (FRAME_LENGTH + 1, 1152, 44100)
+
+
+def test_invalid_headers_are_rejected():
+    assert parse_frame_header(b'\x00\x00\x00\x00') is None
+    assert parse_frame_header(b'\xff\xfb') is None
+    assert parse_frame_header(b'\xff\xfb\xf0\x00') is None  # bad bitrate index
+    assert parse_frame_header(b'\xff\xfb\x9c\x00') is None  # reserved sample rate
+    assert parse_frame_header(b'\xff\xfd\x90\x00') is None  # layer II
+
+
+def test_id3v2_size():
+    assert id3v2_size(id3_tag(300)) == 310
+    assert id3v2_size(frame(1)) == 0
+
+
+def test_frames_are_found_after_a_tag_and_garbage():
+    data = id3_tag(20) + frame(1) + b'junk' + frame(2, padding=True)
+    frames = list(iter_frames(io.BytesIO(data)))
+
+    assert [(offset, length) for offset, length, _, _ in frames] == [
+        (30, FRAME_LENGTH), (30 + FRAME_LENGTH + 4, FRAME_LENGTH + 1)]
+
+
+def test_plan_segments_covers_every_frame_once():
+    plan = plan_segments(10, 3)
+
+    assert plan == [(0, 4), (4, 4), (8, 2)]
+    assert plan_segments(2, 4) == [(0, 1), (1, 1)]
+
+
+def test_trim_frames_keeps_whole_frames(tmp_path):
+    source = tmp_path / 'segment.mp3'
+    source.write_bytes(id3_tag(10) + b''.join(frame(marker) for marker in range(1, 7)))
+    trimmed = tmp_path / 'trimmed.mp3'
+
+    trim_frames(source, trimmed, 2, 3)
+
+    assert trimmed.read_bytes() == frame(3) + frame(4) + frame(5)
+
+
+def test_segment_that_cannot_be_read_fails_the_encode(tmp_path, monkeypatch):
+    # FFmpeg reports success but leaves no segment file behind for trim_frames to read
+    monkeypatch.setattr(encoding.subprocess, 'run', lambda cmd, **kwargs: SimpleNamespace(returncode=0, stderr=''))
+    messages = []
+
+    encoded = encode_parallel(tmp_path / 'song.webm', tmp_path / 'song.mp3', '192', 60, 44100, 2,
+                              progress_hook=messages.append)
+
+    assert encoded is False
+    assert messages[-1]['status'] == 'error'
+    assert not (tmp_path / 'song.mp3').exists()
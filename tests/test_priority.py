@@ -0,0 +1,98 @@
+"""
+Tests for the priority slot pools: interactive jobs go first, but bulk jobs never starve.
+"""
+
+import threading
+import time
+
+from youtube_audio_extractor.priority import SlotPool
+
+
+class Job(threading.Thread):
+    """Holds a slot of ``pool`` in ``lane`` until released."""
+
+    def __init__(self, pool, lane, name, granted):
+        super().__init__(daemon=True)
+        self.pool = pool
+        self.lane = lane
+        self.name = name
+        self.granted = granted
+        self.release = threading.Event()
+
+    def run(self):
+        with self.pool.slot(self.lane):
+            self.granted.append(self.name)
+            self.release.wait(5)
+
+
+def start(pool, lane, name, granted):
+    job = Job(pool, lane, name, granted)
+    job.start()
+    return job
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def queued(pool, lane):
+    return pool.status()['lanes'][lane]['queued']
+
+
+def test_reserved_slot_is_kept_for_interactive_jobs():
+    pool = SlotPool('worker', capacity=2, reserved=1)
+    granted = []
+    bulk = [start(pool, 'bulk', f'bulk{number}', granted) for number in range(2)]
+    wait_until(lambda: len(granted) == 1 and queued(pool, 'bulk') == 1)
+
+    interactive = start(pool, 'interactive', 'interactive', granted)
+    wait_until(lambda: len(granted) == 2)
+    assert granted[1] == 'interactive'
+
+    for job in bulk + [interactive]:
+        job.release.set()
+        job.join()
+    assert sorted(granted) == ['bulk0', 'bulk1', 'interactive']
+
+
+def test_freed_slot_goes_to_the_interactive_lane_first():
+    pool = SlotPool('ffmpeg', capacity=1, reserved=0)
+    granted = []
+    holder = start(pool, 'bulk', 'holder', granted)
+    wait_until(lambda: granted == ['holder'])
+    bulk = start(pool, 'bulk', 'bulk', granted)
+    wait_until(lambda: queued(pool, 'bulk') == 1)
+    interactive = start(pool, 'interactive', 'interactive', granted)
+    wait_until(lambda: queued(pool, 'interactive') == 1)
+
+    holder.release.set()
+    wait_until(lambda: len(granted) == 2)
+    interactive.release.set()
+    wait_until(lambda: len(granted) == 3)
+    bulk.release.set()
+
+    assert granted == ['holder', 'interactive', 'bulk']
+
+
+def test_starving_bulk_job_is_served_before_interactive_jobs():
+    pool = SlotPool('worker', capacity=1, reserved=0, starvation_timeout=0.2)
+    granted = []
+    holder = start(pool, 'interactive', 'holder', granted)
+    wait_until(lambda: granted == ['holder'])
+    bulk = start(pool, 'bulk', 'bulk', granted)
+    wait_until(lambda: queued(pool, 'bulk') == 1)
+    time.sleep(0.25)
+    interactive = start(pool, 'interactive', 'interactive', granted)
+    wait_until(lambda: queued(pool, 'interactive') == 1)
+
+    holder.release.set()
+    wait_until(lambda: len(granted) == 2)
+    bulk.release.set()
+    wait_until(lambda: len(granted) == 3)
+    interactive.release.set()
+
+    assert granted == ['holder', 'bulk', 'interactive']
+    assert pool.status()['lanes']['bulk']['starvation_promotions'] == 1
@@ -0,0 +1,91 @@
+"""
+Tests for time-range and chapter selection, and the storage reserved for a range.
+"""
+
+import math
+
+import pytest
+
+from youtube_audio_extractor import core
+from youtube_audio_extractor.ranges import (
+    parse_chapter_selection,
+    parse_timestamp,
+    select_sections,
+)
+
+
+@pytest.mark.parametrize('value, seconds', [
+    ('90', 90), ('1:30', 90), ('01:02:03.5', 3723.5), (' 0:05 ', 5), (42, 42), (2.5, 2.5),
+])
+def test_parse_timestamp(value, seconds):
+    assert parse_timestamp(value) == seconds
+
+
+@pytest.mark.parametrize('value', ['', 'abc', '1:2:3:4', '-5', '1:-5', -1])
+def test_parse_timestamp_rejects_invalid_times(value):
+    with pytest.raises(ValueError):
+        parse_timestamp(value)
+
+
+def test_parse_chapter_selection():
+    assert parse_chapter_selection('3,5-7') == [3, 5, 6, 7]
+    assert parse_chapter_selection(' 2 , 1-2 ') == [1, 2]
+    assert parse_chapter_selection([4, '1']) == [1, 4]
+
+
+@pytest.mark.parametrize('value', ['0', '3-1', 'a', '1,,2', '2-'])
+def test_parse_chapter_selection_rejects_invalid_selections(value):
+    with pytest.raises(ValueError):
+        parse_chapter_selection(value)
+
+
+def test_open_ended_range_of_unknown_duration():
+    sections = select_sections({'duration': None}, start_time=60)
+
+    assert sections == [{'start_time': 60, 'end_time': math.inf, 'title': '1m00s-end', 'index': 1}]
+
+
+def test_range_must_fit_the_video():
+    with pytest.raises(ValueError):
+        select_sections({'duration': 100}, start_time=100)
+    with pytest.raises(ValueError):
+        select_sections({'duration': 100}, start_time=50, end_time=40)
+
+
+def test_chapter_sections():
+    info = {'duration': 300, 'chapters': [
+        {'start_time': 0, 'end_time': 100, 'title': 'Intro'},
+        {'start_time': 100, 'end_time': None, 'title': 'Main: part/1'},
+    ]}
+    sections = select_sections(info, chapter_numbers=[2])
+
+    assert sections == [{'start_time': 100, 'end_time': 300, 'title': 'chapter02_Main_ part_1', 'index': 2}]
+    with pytest.raises(ValueError):
+        select_sections(info, chapter_numbers=[3])
+
+
+@pytest.fixture
+def reserved(monkeypatch):
+    """Sizes reserve_storage asks the storage quota for."""
+    sizes = []
+
+    class Manager:
+        def reserve(self, size, name=None, wait=0):
+            sizes.append(size)
+
+    monkeypatch.setattr(core, 'get_storage_manager', Manager)
+    return sizes
+
+
+def test_open_ended_range_of_unknown_duration_is_not_reserved(reserved):
+    core.reserve_storage({'duration': None}, [], [{'start_time': 60, 'end_time': math.inf}])
+
+    assert reserved == [0]
+
+
+def test_reserved_range_is_clamped_to_the_video(reserved):
+    core.reserve_storage({'duration': 100}, [], [{'start_time': 60, 'end_time': math.inf}])
+    core.reserve_storage({'duration': 100}, [], [{'start_time': 60, 'end_time': 500}])
+    core.reserve_storage({'duration': 100}, [], [{'start_time': 60, 'end_time': 100}])
+
+    assert reserved[0] == reserved[1] == reserved[2] > 0
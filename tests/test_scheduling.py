@@ -0,0 +1,56 @@
+"""
+Tests for ordering playlist jobs: longest processing time first, with
+unknown durations counted as average length.
+"""
+
+import pytest
+
+from youtube_audio_extractor.entries import PlaylistEntry
+from youtube_audio_extractor.scheduling import order_jobs, simulate_makespan
+
+
+def jobs(*durations):
+    return [(index, PlaylistEntry(index, f'v{index}', f'https://youtu.be/v{index}', duration=duration))
+            for index, duration in enumerate(durations, start=1)]
+
+
+def order(scheduled):
+    return [index for index, _ in scheduled]
+
+
+def test_fifo_keeps_playlist_order():
+    assert order(order_jobs(jobs(60, 600, 300), 'fifo')) == [1, 2, 3]
+
+
+def test_lpt_starts_the_longest_jobs_first():
+    assert order(order_jobs(jobs(60, 600, 300, 600), 'lpt')) == [2, 4, 3, 1]
+
+
+def test_unknown_durations_count_as_average_length():
+    # Known average is 300 s; equally long jobs keep their playlist order
+    assert order(order_jobs(jobs(None, 100, 500, 0, 300), 'lpt')) == [3, 1, 4, 5, 2]
+    assert order(order_jobs(jobs(None, None), 'lpt')) == [1, 2]
+
+
+def test_custom_duration_and_unknown_policy():
+    assert order_jobs([('a', 1), ('b', 3)], 'lpt', duration=lambda job: job[1]) == [('b', 3), ('a', 1)]
+    with pytest.raises(ValueError):
+        order_jobs(jobs(60), 'sjf')
+
+
+@pytest.mark.parametrize('durations, workers, makespan', [
+    ([60, 60, 60, 600], 2, 660),  # the long job last keeps one worker busy at the end
+    ([600, 60, 60, 60], 2, 600),
+    ([10, 20, 30], 1, 60),
+    ([10, 20], 0, 30),  # at least one worker
+    ([], 3, 0),
+])
+def test_simulate_makespan(durations, workers, makespan):
+    assert simulate_makespan(durations, workers) == makespan
+
+
+def test_lpt_finishes_sooner_when_a_long_video_comes_last():
+    durations = [300, 300, 300, 300, 900]
+    lpt = [entry.duration for _, entry in order_jobs(jobs(*durations), 'lpt')]
+
+    assert (simulate_makespan(durations, 2), simulate_makespan(lpt, 2)) == (1500, 1200)
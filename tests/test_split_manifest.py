@@ -0,0 +1,134 @@
+"""
+Tests for incremental re-splitting: outputs whose time range is unchanged are
+kept (and renamed if their name changed), stale ones are removed.
+"""
+
+import os
+from types import SimpleNamespace
+
+import pytest
+
+from youtube_audio_extractor import chapters, staging
+from youtube_audio_extractor.chapters import split_audio_by_chapters
+from youtube_audio_extractor.split_manifest import (
+    SplitManifest,
+    manifest_path,
+    segment_key,
+)
+from youtube_audio_extractor.staging import StagingArea
+
+
+@pytest.fixture
+def source(tmp_path):
+    source = tmp_path / 'song.mp3'
+    source.write_bytes(b'audio' * 100)
+    return source
+
+
+def write_split(output_dir, source, segments, settings=None):
+    """Record a split of source into files named after their keys."""
+    manifest = SplitManifest(output_dir, source, 'chunks', settings or {'max_size_mb': 16})
+    for key in segments:
+        path = output_dir / f'{key}.mp3'
+        path.write_bytes(key.encode())
+        manifest.record(key, path)
+    manifest.save()
+
+
+def test_unchanged_outputs_are_taken_over(tmp_path, source):
+    write_split(tmp_path, source, ['0+60000', '60000+60000'])
+
+    manifest = SplitManifest(tmp_path, source, 'chunks', {'max_size_mb': 16})
+    assert manifest.up_to_date()
+    path, segment = manifest.take('0+60000')
+    assert (path, segment['key']) == (tmp_path / '0+60000.mp3', '0+60000')
+    assert manifest.take('0+60000') is None  # taken once
+    assert manifest.take('0+30000') is None  # never written
+
+
+def test_changed_outputs_and_settings_are_not_taken_over(tmp_path, source):
+    write_split(tmp_path, source, ['0+60000', '60000+60000'])
+    (tmp_path / '0+60000.mp3').write_bytes(b'edited')
+
+    manifest = SplitManifest(tmp_path, source, 'chunks', {'max_size_mb': 16})
+    assert not manifest.up_to_date()
+    assert manifest.take('0+60000') is None
+    assert manifest.take('60000+60000') is not None
+
+    assert SplitManifest(tmp_path, source, 'chunks', {'max_size_mb': 8}).take('60000+60000') is None
+    source.write_bytes(b'other audio')
+    assert SplitManifest(tmp_path, source, 'chunks', {'max_size_mb': 16}).take('60000+60000') is None
+
+
+def test_save_removes_outputs_that_were_not_taken_over(tmp_path, source):
+    write_split(tmp_path, source, ['0+60000', '60000+60000'])
+
+    manifest = SplitManifest(tmp_path, source, 'chunks', {'max_size_mb': 16})
+    path, segment = manifest.take('0+60000')
+    manifest.record('0+60000', path, segment)
+    manifest.save()
+
+    assert sorted(path.name for path in tmp_path.glob('*.mp3')) == ['0+60000.mp3', 'song.mp3']
+    assert manifest_path(tmp_path, source).exists()
+    assert list(SplitManifest(tmp_path, source, 'chunks', {'max_size_mb': 16}).previous) == ['0+60000']
+
+
+def chapter(index, start_time, duration, title):
+    return {'index': index, 'start_time': start_time, 'duration': duration, 'clean_title': title}
+
+
+@pytest.fixture
+def cuts(tmp_path, monkeypatch):
+    """Fake FFmpeg cuts (the file holds its time range); returns the ranges cut, in order."""
+    monkeypatch.setattr(staging, '_staging_area', StagingArea(tmp_path / '.staging'))
+    made = []
+
+    def run(cmd, **kwargs):
+        start_time, duration, output_file = cmd[cmd.index('-ss') + 1], cmd[cmd.index('-t') + 1], cmd[-1]
+        made.append((float(start_time), float(duration)))
+        with open(output_file, 'w') as f:
+            f.write(segment_key(float(start_time), float(duration)))
+        return SimpleNamespace(returncode=0, stderr='')
+
+    monkeypatch.setattr(chapters.subprocess, 'run', run)
+    return made
+
+
+def chapter_files(tmp_path):
+    return {path.name: path.read_text() for path in (tmp_path / 'chapters').iterdir() if path.suffix == '.mp3'}
+
+
+def test_resplit_only_cuts_changed_chapters_and_renames_retitled_ones(tmp_path, source, cuts):
+    assert split_audio_by_chapters(source, tmp_path, [chapter(1, 0, 60, 'Intro'), chapter(2, 60, 60, 'Verse'),
+                                                     chapter(3, 120, 30, 'Outro')])
+    cuts.clear()
+
+    # Titles of 1 and 2 swapped, 3 shortened
+    assert split_audio_by_chapters(source, tmp_path, [chapter(1, 0, 60, 'Verse'), chapter(2, 60, 60, 'Intro'),
+                                                     chapter(3, 120, 20, 'Outro')])
+
+    assert cuts == [(120, 20)]
+    assert chapter_files(tmp_path) == {
+        'song_chapter01_Verse.mp3': '0+60000',
+        'song_chapter02_Intro.mp3': '60000+60000',
+        'song_chapter03_Outro.mp3': '120000+20000',
+    }
+    assert not list((tmp_path / 'chapters').glob('.*.renaming'))
+
+
+def test_failed_rename_puts_chapters_back(tmp_path, source, cuts, monkeypatch):
+    split_audio_by_chapters(source, tmp_path, [chapter(1, 0, 60, 'Intro'), chapter(2, 60, 60, 'Verse')])
+    before = chapter_files(tmp_path)
+    replace = os.replace
+
+    def failing_replace(source, target):
+        if str(source).endswith('.renaming') and str(target).endswith('_Intro.mp3'):
+            raise OSError('disk full')
+        replace(source, target)
+
+    monkeypatch.setattr(chapters.os, 'replace', failing_replace)
+
+    assert not split_audio_by_chapters(source, tmp_path, [chapter(1, 0, 60, 'Verse'), chapter(2, 60, 60, 'Intro')])
+    assert not list((tmp_path / 'chapters').glob('.*.renaming'))
+    # Whatever was not renamed is back under its earlier name
+    assert set(chapter_files(tmp_path).values()) == set(before.values())
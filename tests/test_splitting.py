@@ -0,0 +1,120 @@
+"""
+Tests for size-based split planning, cuts moved into pauses, and fitting
+chunks to their real size.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from youtube_audio_extractor import silence, splitting
+from youtube_audio_extractor.splitting import (
+    SIZE_PRESETS,
+    SIZE_SAFETY_MARGIN,
+    budget_seconds,
+    fit_chunks,
+    parse_max_size,
+    plan_chunks,
+    plan_cuts,
+    predicted_size_mb,
+)
+
+# Fake audio for fit_chunks: one byte per millisecond
+BYTES_PER_SECOND = 1000
+
+
+@pytest.mark.parametrize('duration, bitrate, max_size_mb', [
+    (3600, 192, 16), (3600, 320, 25), (60, 128, 16), (10000, 64, 8),
+])
+def test_planned_chunks_fit_the_limit_with_the_safety_margin(duration, bitrate, max_size_mb):
+    num_chunks, chunk_duration = plan_chunks(duration, bitrate, max_size_mb)
+
+    assert num_chunks * chunk_duration == pytest.approx(duration)
+    assert predicted_size_mb(chunk_duration, bitrate) <= max_size_mb * SIZE_SAFETY_MARGIN + 1e-9
+    # One chunk fewer would not fit
+    if num_chunks > 1:
+        assert duration / (num_chunks - 1) > budget_seconds(bitrate, max_size_mb) * SIZE_SAFETY_MARGIN
+
+
+def test_short_audio_is_one_chunk():
+    assert plan_chunks(60, 192, 16) == (1, 60)
+
+
+def test_cuts_are_evenly_spaced_by_default():
+    assert plan_cuts('song.webm', 150, 128, 1) == pytest.approx([50, 100])
+
+
+def test_cuts_move_into_the_nearest_pauses(monkeypatch):
+    np = pytest.importorskip('numpy')
+    times = (np.arange(int(150 / silence.WINDOW_SECONDS)) + 0.5) * silence.WINDOW_SECONDS
+    levels = np.full(len(times), -10.0)
+    for start, end in ((55, 56), (95, 96), (140, 141)):
+        levels[(times >= start) & (times < end)] = -60.0
+
+    def stream_levels(input_file):
+        # Two blocks, so a search range spans a block boundary
+        yield times[:1500], levels[:1500]
+        yield times[1500:], levels[1500:]
+
+    monkeypatch.setattr(silence, 'stream_levels', stream_levels)
+
+    # 150 s at 128 kbps in 1 MB chunks: planned cuts at 50 s and 100 s
+    assert plan_cuts('song.webm', 150, 128, 1, at_silence=True) == pytest.approx([55.5, 95.5])
+
+
+def test_parse_max_size():
+    assert parse_max_size('email') == SIZE_PRESETS['email']
+    assert parse_max_size(' Small ') == SIZE_PRESETS['small']
+    assert parse_max_size('12.5') == 12.5
+    assert parse_max_size(None) == splitting.DEFAULT_MAX_SIZE_MB
+    for value in ('0', '-3', 'huge'):
+        with pytest.raises(ValueError):
+            parse_max_size(value)
+
+
+@pytest.fixture
+def fake_ffmpeg(monkeypatch):
+    """Cut and join fake audio files byte-wise instead of running FFmpeg."""
+    def cut_audio(input_file, output_file, start_time, length=None):
+        data = input_file.read_bytes()
+        end = None if length is None else int((start_time + length) * BYTES_PER_SECOND)
+        output_file.write_bytes(data[int(start_time * BYTES_PER_SECOND):end])
+        return SimpleNamespace(returncode=0, stderr='')
+
+    def join_audio(input_files, output_file):
+        output_file.write_bytes(b''.join(path.read_bytes() for path in input_files))
+        return SimpleNamespace(returncode=0, stderr='')
+
+    monkeypatch.setattr(splitting, 'probe_duration', lambda path: path.stat().st_size / BYTES_PER_SECOND)
+    monkeypatch.setattr(splitting, 'cut_audio', cut_audio)
+    monkeypatch.setattr(splitting, 'join_audio', join_audio)
+
+
+def test_oversized_chunks_move_their_tail_on(tmp_path, fake_ffmpeg):
+    audio = bytes(range(256)) * 8
+    chunks = [tmp_path / 'song_part01.mp3', tmp_path / 'song_part02.mp3']
+    chunks[0].write_bytes(audio[:1500])
+    chunks[1].write_bytes(audio[1500:2000])
+    max_size_mb = 1000 / (1024 * 1024)
+
+    fitted = fit_chunks(chunks, max_size_mb)
+
+    assert [path.name for path in fitted] == ['song_part01.mp3', 'song_part02.mp3', 'song_part03.mp3']
+    assert all(path.stat().st_size <= 1000 for path in fitted)
+    assert b''.join(path.read_bytes() for path in fitted) == audio[:2000]
+    assert sorted(path.name for path in tmp_path.iterdir()) == [path.name for path in fitted]
+
+
+def test_chunks_within_the_limit_are_left_alone(tmp_path, fake_ffmpeg):
+    chunk = tmp_path / 'song_part01.mp3'
+    chunk.write_bytes(b'x' * 100)
+
+    assert fit_chunks([chunk], 1) == [chunk]
+
+
+def test_unreadable_chunk_cannot_be_fitted(tmp_path, fake_ffmpeg, monkeypatch):
+    monkeypatch.setattr(splitting, 'probe_duration', lambda path: None)
+    chunk = tmp_path / 'song_part01.mp3'
+    chunk.write_bytes(b'x' * 2000)
+
+    assert fit_chunks([chunk], 1000 / (1024 * 1024)) is None
@@ -0,0 +1,106 @@
+"""
+Tests for the staging area: publishing finished files and sweeping up after
+interrupted runs.
+"""
+
+import errno
+import importlib
+import os
+
+import pytest
+from click.testing import CliRunner
+
+from youtube_audio_extractor import staging
+from youtube_audio_extractor.staging import OWNER_FILENAME, StagingArea, publish
+
+cli = importlib.import_module('youtube_audio_extractor.cli')
+
+
+@pytest.fixture
+def area(tmp_path, monkeypatch):
+    """A fresh process-wide staging area in tmp_path; processes 1000 and up have exited."""
+    area = StagingArea(tmp_path / '.staging')
+    monkeypatch.setattr(staging, '_staging_area', area)
+    monkeypatch.setattr(staging, 'process_alive', lambda pid: pid < 1000)
+    return area
+
+
+def test_publish_replaces_the_destination(tmp_path, area):
+    staged = area.path_for(tmp_path / 'library' / 'song.mp3')
+    staged.write_bytes(b'new')
+    destination = tmp_path / 'library' / 'song.mp3'
+
+    assert publish(staged, destination) == destination
+    assert destination.read_bytes() == b'new'
+    assert not staged.exists()
+
+    staged = area.path_for(destination)
+    staged.write_bytes(b'newer')
+    publish(staged, destination)
+    assert destination.read_bytes() == b'newer'
+
+
+def test_publish_across_file_systems(tmp_path, monkeypatch):
+    staged = tmp_path / 'tmpfs' / 'song.mp3'
+    staged.parent.mkdir()
+    staged.write_bytes(b'audio')
+    destination = tmp_path / 'library' / 'song.mp3'
+    replace = os.replace
+
+    def cross_device_replace(source, target):
+        if source == staged:
+            raise OSError(errno.EXDEV, 'Invalid cross-device link')
+        replace(source, target)
+
+    monkeypatch.setattr(os, 'replace', cross_device_replace)
+
+    publish(staged, destination)
+
+    assert destination.read_bytes() == b'audio'
+    assert not staged.exists()
+    assert [path.name for path in destination.parent.iterdir()] == ['song.mp3']
+
+
+def test_jobs_stage_into_their_own_directory(area):
+    shared = area.current()
+    with area.begin('first') as first:
+        assert area.current() == first.directory
+        assert (first.directory / OWNER_FILENAME).exists()
+        with area.begin('second') as second:
+            assert area.current() == second.directory
+            assert area.path_for('song.mp3').parent.parent == second.directory
+        assert area.current() == first.directory
+    assert area.current() == shared
+    assert not first.directory.exists() and not second.directory.exists()
+
+
+def test_sweep_removes_only_directories_of_exited_processes(area, monkeypatch):
+    ours = area.current()
+    for name in ('1-1', '2000-1', '2001-3', 'notes'):
+        (area.directory / name).mkdir()
+
+    assert area.sweep() == 2
+    assert sorted(path.name for path in area.directory.iterdir()) == sorted(['1-1', 'notes', ours.name])
+
+    # A directory with our process ID made before we started belongs to an earlier process
+    monkeypatch.setattr(staging, 'PROCESS_STARTED', ours.stat().st_ctime + 10)
+    assert area.sweep() == 1
+    assert not ours.exists()
+
+
+def test_sweep_without_a_staging_area(tmp_path):
+    assert StagingArea(tmp_path / 'missing').sweep() == 0
+
+
+def test_only_commands_that_write_downloads_sweep(tmp_path, area):
+    orphan = tmp_path / 'scratch' / '2000-1'
+    orphan.mkdir(parents=True)
+    runner = CliRunner()
+
+    runner.invoke(cli.cli, ['--staging-dir', str(tmp_path / 'scratch'), 'info'])
+    runner.invoke(cli.cli, ['--staging-dir', str(tmp_path / 'scratch'), 'download', '--help'])
+    assert orphan.exists()
+
+    result = runner.invoke(cli.cli, ['--staging-dir', str(tmp_path / 'scratch'), 'download'])
+    assert 'Provide either a URL or --from-file' in result.output
+    assert not orphan.exists()
@@ -0,0 +1,145 @@
+"""
+Tests for the storage quota: least-recently-used eviction with hardlinked data
+and the transcode cache.
+"""
+
+import os
+import time
+
+import pytest
+
+from youtube_audio_extractor.catalog import Catalog
+from youtube_audio_extractor.encoding import output_formats
+from youtube_audio_extractor.library_store import BlobStore
+from youtube_audio_extractor.storage import InsufficientStorage, StorageManager
+from youtube_audio_extractor.transcode_cache import TranscodeCache, cache_key
+
+
+@pytest.fixture
+def root(tmp_path):
+    root = tmp_path / 'downloads'
+    root.mkdir()
+    return root
+
+
+def make_manager(root):
+    store = BlobStore(root / '.store')
+    cache = TranscodeCache(root / '.transcode_cache')
+    return StorageManager(root, catalog=Catalog(root, store=store), store=store, cache=cache)
+
+
+def write(path, size, age):
+    """Write ``size`` bytes to path, last modified ``age`` seconds ago."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b'x' * size)
+    when = time.time() - age
+    os.utime(path, (when, when))
+    return path
+
+
+def test_least_recently_used_item_is_evicted_first(root):
+    write(root / 'old.mp3', 1000, age=300)
+    write(root / 'old.cue', 10, age=300)
+    write(root / 'new.mp3', 1000, age=200)
+    manager = make_manager(root)
+    manager.catalog.record([root / 'old.mp3', root / 'old.cue', root / 'new.mp3'], home=root)
+    manager.configure(quota=2500)
+
+    manager.reserve(1000).release()
+
+    assert not (root / 'old.mp3').exists()
+    assert not (root / 'old.cue').exists()
+    assert (root / 'new.mp3').exists()
+    assert manager.catalog.usage() == 1000
+
+
+def test_hardlinked_data_is_counted_once_and_only_freed_with_its_last_link(root):
+    write(root / 'Playlist' / 'song.mp3', 1000, age=300)
+    os.link(root / 'Playlist' / 'song.mp3', root / 'song.mp3')
+    write(root / 'other.mp3', 500, age=200)
+    manager = make_manager(root)
+    manager.catalog.record([root / 'Playlist' / 'song.mp3', root / 'other.mp3'])
+    manager.catalog.record([root / 'song.mp3'], home=root)
+
+    assert manager.catalog.usage() == 1500
+    items, _ = manager._items()
+    # Evicting either link alone would free nothing
+    assert items['Playlist']['reclaimable'] == 0
+    assert items['song']['reclaimable'] == 0
+
+    manager.configure(quota=1500)
+    with pytest.raises(InsufficientStorage):
+        manager.reserve(600)
+    assert (root / 'Playlist' / 'song.mp3').exists()
+    assert (root / 'other.mp3').exists()
+
+
+def test_library_store_link_does_not_keep_evicted_data(root):
+    write(root / 'old.mp3', 1000, age=300)
+    manager = make_manager(root)
+    manager.store.add(root / 'old.mp3')
+    manager.catalog.record([root / 'old.mp3'], home=root)
+    manager.configure(quota=1000)
+
+    manager.reserve(800).release()
+
+    assert not (root / 'old.mp3').exists()
+    assert not list((root / '.store' / 'objects').glob('*/*'))
+
+
+def test_cached_output_is_evicted_with_its_cache_entry(root):
+    output_format = output_formats('192', 'mp3')[0]
+    output = write(root / 'cached.mp3', 1000, age=300)
+    manager = make_manager(root)
+    manager.cache.store('source-digest', output_format, output)
+    manager.catalog.record([output], home=root)
+    assert os.stat(output).st_nlink == 2  # linked into the cache
+    assert manager.status()['used'] == 1000
+
+    manager.configure(quota=1200)
+    manager.reserve(800).release()
+
+    assert not output.exists()
+    assert manager.cache.objects() == []
+    assert manager.status()['used'] == 0
+
+
+def test_cache_only_objects_are_evicted_least_recently_used_first(root):
+    output_format = output_formats('192', 'mp3')[0]
+    manager = make_manager(root)
+    for name, age in (('older', 300), ('newer', 200)):
+        source = write(root / 'scratch' / f'{name}.mp3', 1000, age=age)
+        manager.cache.store(name, output_format, source)
+        source.unlink()
+    manager.cache._load()[cache_key('older', output_format)]['last_used'] = time.time() - 300
+    kept = cache_key('newer', output_format)
+    assert manager.status()['transcode_cache'] == 2000
+
+    manager.configure(quota=2500)
+    manager.reserve(1000).release()
+
+    assert [obj['key'] for obj in manager.cache.objects()] == [kept]
+
+
+def test_items_written_during_a_running_job_are_not_evicted(root):
+    manager = make_manager(root)
+    manager.configure(quota=2000)
+    running = manager.reserve(1000)
+    output = write(root / 'running.mp3', 1000, age=0)
+    manager.catalog.record([output], home=root)
+
+    with pytest.raises(InsufficientStorage):
+        manager.reserve(1000)
+    assert output.exists()
+    running.release()
+
+
+def test_rescan_picks_up_files_changed_by_hand(root):
+    manager = make_manager(root)
+    write(root / 'a.mp3', 100, age=0)
+    assert manager.catalog.usage() == 100
+
+    write(root / 'b.mp3', 50, age=0)
+    (root / 'a.mp3').unlink()
+    assert manager.rescan() == (1, 1)
+    assert manager.catalog.usage() == 50
@@ -0,0 +1,74 @@
+"""
+Tests for incremental sync: new videos are found without reading the whole
+listing, and the known videos are remembered between runs.
+"""
+
+from youtube_audio_extractor.checkpoints import PlaylistCheckpoint
+from youtube_audio_extractor.manifests import write_json_atomic
+from youtube_audio_extractor.sync import (
+    SYNC_STATE_FILENAME,
+    find_new_entries,
+    load_sync_state,
+)
+
+URL = 'https://www.youtube.com/@channel/videos'
+
+
+class Listing:
+    """A lazily paged listing of flat entries; counts how many were read."""
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.read = 0
+
+    def __iter__(self):
+        for video_id in self.ids:
+            self.read += 1
+            yield None if video_id is None else {'id': video_id, 'url': f'https://youtu.be/{video_id}'}
+
+
+def test_listing_stops_after_enough_known_videos():
+    listing = Listing(['new1', 'new2', 'old1', 'old2', 'old3', 'old4', 'older'])
+
+    new_entries = find_new_entries(listing, {'old1', 'old2', 'old3', 'old4'}, stop_after=3)
+
+    assert [entry.id for entry in new_entries] == ['new1', 'new2']
+    assert [entry.index for entry in new_entries] == [1, 2]
+    assert listing.read == 5
+
+
+def test_a_new_video_resets_the_known_run():
+    listing = Listing(['old1', 'old2', 'new1', 'old3', 'old4', 'new2'])
+
+    new_entries = find_new_entries(listing, {'old1', 'old2', 'old3', 'old4'}, stop_after=3)
+
+    assert [entry.id for entry in new_entries] == ['new1', 'new2']
+    assert listing.read == 6
+
+
+def test_full_scan_reads_the_whole_listing():
+    listing = Listing(['old1', 'old2', 'old3', None, 'new1'])
+
+    new_entries = find_new_entries(listing, {'old1', 'old2', 'old3'}, stop_after=1, full_scan=True)
+
+    assert [entry.id for entry in new_entries] == ['new1']
+    assert listing.read == 5
+
+
+def test_state_is_seeded_from_a_playlist_checkpoint(tmp_path):
+    checkpoint = PlaylistCheckpoint(tmp_path, URL, 'Channel')
+    for index, (video_id, success) in enumerate([('aaa', True), ('bbb', False), ('ccc', True)], start=1):
+        checkpoint.start(video_id, index, video_id, f'https://youtu.be/{video_id}', tmp_path / f'{index:02d}')
+        checkpoint.finish(video_id, success)
+
+    state = load_sync_state(tmp_path, URL)
+
+    assert state == {'url': URL, 'known_ids': ['aaa', 'ccc'], 'next_number': 4}
+
+
+def test_saved_state_is_used_for_the_same_collection_only(tmp_path):
+    saved = {'url': URL, 'known_ids': ['aaa'], 'next_number': 2}
+    write_json_atomic(tmp_path / SYNC_STATE_FILENAME, saved)
+
+    assert load_sync_state(tmp_path, URL) == saved
+    assert load_sync_state(tmp_path, URL + '2') == {'url': URL + '2', 'known_ids': [], 'next_number': 1}
@@ -0,0 +1,33 @@
+"""
+Tests for the transcode cache: keys per encode mode, and no hashing while it is disabled.
+"""
+
+from youtube_audio_extractor import transcode_cache
+from youtube_audio_extractor.encoding import output_formats
+from youtube_audio_extractor.transcode_cache import TranscodeCache, cache_key
+
+MP3 = output_formats('192', 'mp3')[0]
+
+
+def test_encode_mode_is_part_of_the_key():
+    assert cache_key('digest', MP3) != cache_key('digest', MP3, 'parallel')
+
+
+def test_output_is_only_fetched_for_the_mode_it_was_encoded_in(tmp_path):
+    cache = TranscodeCache(tmp_path / 'cache')
+    encoded = tmp_path / 'encoded.mp3'
+    encoded.write_bytes(b'audio')
+    cache.store('digest', MP3, encoded, 'parallel')
+
+    assert not cache.fetch('digest', MP3, tmp_path / 'single.mp3')
+    assert cache.fetch('digest', MP3, tmp_path / 'parallel.mp3', 'parallel')
+    assert (tmp_path / 'parallel.mp3').read_bytes() == b'audio'
+
+
+def test_disabled_cache_does_not_hash_sources(tmp_path, monkeypatch):
+    def fail(path):
+        raise AssertionError('source hashed')
+
+    monkeypatch.setattr(transcode_cache, 'file_digest', fail)
+    cache = TranscodeCache(tmp_path / 'cache', enabled=False)
+    assert cache.source_digest(tmp_path / 'source.webm') is None
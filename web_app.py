@@ -4,14 +4,31 @@ Flask web application for YouTube Audio Extractor
 Provides a REST API for the web UI
 """
 
+import os
 from pathlib import Path
 from flask import Flask, send_from_directory, send_file
 from flask_cors import CORS
 
 # Import all blueprint modules
 from api.downloads import downloads_bp
+from api.batch import batch_bp
+from api.sync import sync_bp
+from api.bandwidth import bandwidth_bp
+from api.files import files_bp
+from api.storage import storage_bp
 from api.progress import progress_bp
 from api.utils import utils_bp
+from youtube_audio_extractor.priority import get_scheduler
+from youtube_audio_extractor.staging import get_staging_area
+
+# Videos fetched and FFmpeg jobs run at once across all requests; single
+# downloads from the UI are served first and always have one slot of each kept free
+WORKER_SLOTS = 4
+FFMPEG_SLOTS = max(2, os.cpu_count() or 1)
+
+# Files are made here before they are moved into downloads/ (unset: downloads/.staging);
+# a tmpfs such as /dev/shm/yae keeps encoding scratch work off the library disk
+STAGING_DIR = os.environ.get('YAE_STAGING_DIR') or None
 
 app = Flask(__name__)
 CORS(app, resources={
@@ -25,9 +42,21 @@ CORS(app, resources={
 
 # Register all blueprints
 app.register_blueprint(downloads_bp)
+app.register_blueprint(batch_bp)
+app.register_blueprint(sync_bp)
+app.register_blueprint(bandwidth_bp)
+app.register_blueprint(files_bp)
+app.register_blueprint(storage_bp)
 app.register_blueprint(progress_bp)
 app.register_blueprint(utils_bp)
 
+get_scheduler().configure(worker_slots=WORKER_SLOTS, ffmpeg_slots=FFMPEG_SLOTS)
+
+if STAGING_DIR:
+    get_staging_area().configure(STAGING_DIR)
+# Staging directories of earlier runs that were interrupted
+get_staging_area().sweep()
+
 # Serve static files from the built frontend
 @app.route('/')
 def serve_index():
@@ -0,0 +1,193 @@
+"""
+Bandwidth governor for YouTube Audio Extractor.
+Shares one download budget between all jobs in the process: a global cap
+split between running downloads by priority lane, plus an optional cap per
+download. Each download's share is enforced by yt-dlp's own rate limiter:
+it is written to the 'ratelimit' option of the YoutubeDL instance running
+the download, which yt-dlp reads for every chunk it receives, and updated
+there whenever a download starts or finishes and the shares are re-balanced.
+"""
+
+import itertools
+import threading
+from contextlib import contextmanager
+
+from yt_dlp.utils import format_bytes, parse_bytes
+
+# Priority lanes and their weight when splitting the global budget
+LANES = ('interactive', 'bulk')
+LANE_WEIGHTS = {'interactive': 4, 'bulk': 1}
+
+
+def parse_rate(value):
+    """Parse a rate such as '2M', '500K' or a number of bytes/s; None, '' and 0 mean unlimited."""
+    if value in (None, '', 0, '0'):
+        return None
+    if isinstance(value, (int, float)):
+        rate = value
+    else:
+        rate = parse_bytes(str(value).strip())
+    if not rate or rate < 0:
+        raise ValueError(f"Invalid rate '{value}' (use e.g. 500K or 2M bytes per second)")
+    return int(rate)
+
+
+def format_rate(rate):
+    return f'{format_bytes(rate)}/s' if rate else 'unlimited'
+
+
+class BandwidthJob:
+    """One running download's slice of the budget."""
+
+    def __init__(self, governor, job_id, lane, limit=None, name=None):
+        self.governor = governor
+        self.id = job_id
+        self.lane = lane
+        self.limit = limit
+        self.name = name
+        self.share = None
+        self.speed = 0
+        self.downloaded = 0
+        self._params = None
+        self._seen = {}
+
+    def set_share(self, share):
+        self.share = share
+        if self._params is not None:
+            self._params['ratelimit'] = self.ratelimit(self._params)
+
+    def ratelimit(self, params=None):
+        """yt-dlp 'ratelimit' for the share: it applies to each connection, so concurrent fragment
+        downloads split the share between them."""
+        if not self.share:
+            return None
+        return max(1, self.share // max(1, (params or {}).get('concurrent_fragment_downloads') or 1))
+
+    def ydl_options(self):
+        """yt-dlp options for this download: its share as 'ratelimit', and the metering hook."""
+        return {'progress_hooks': [self.hook], 'ratelimit': self.ratelimit()}
+
+    @contextmanager
+    def attach(self, ydl):
+        """Keep the 'ratelimit' of the YoutubeDL instance running this download at the download's
+        share for the duration of the block, as shares are re-balanced."""
+        with self.governor._lock:
+            self._params = ydl.params
+            self._params['ratelimit'] = self.ratelimit(self._params)
+        try:
+            yield ydl
+        finally:
+            with self.governor._lock:
+                self._params = None
+
+    def hook(self, d):
+        """yt-dlp progress hook: meter the downloaded bytes and speed."""
+        key = d.get('tmpfilename') or d.get('filename')
+        if d.get('status') != 'downloading':
+            self._seen.pop(key, None)
+            return
+
+        downloaded = d.get('downloaded_bytes') or 0
+        if key not in self._seen:
+            # The first report includes bytes resumed from a .part file
+            self._seen[key] = downloaded
+            return
+        amount = downloaded - self._seen[key]
+        self._seen[key] = downloaded
+        if amount <= 0:
+            return
+
+        self.downloaded += amount
+        self.speed = d.get('speed') or self.speed
+
+    def status(self):
+        return {'id': self.id, 'name': self.name, 'lane': self.lane, 'share': self.share,
+                'speed': self.speed, 'downloaded_bytes': self.downloaded}
+
+
+class BandwidthGovernor:
+    """Splits a global bandwidth cap between the downloads running in this process."""
+
+    def __init__(self, global_limit=None, per_job_limit=None, lane_weights=None):
+        self.global_limit = global_limit
+        self.per_job_limit = per_job_limit
+        self.lane_weights = dict(LANE_WEIGHTS if lane_weights is None else lane_weights)
+        self._jobs = []
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def configure(self, global_limit=None, per_job_limit=None, lane_weights=None):
+        """Change the caps (bytes/s, None for unlimited); running downloads are re-balanced at once."""
+        with self._lock:
+            self.global_limit = global_limit
+            self.per_job_limit = per_job_limit
+            if lane_weights:
+                self.lane_weights.update(lane_weights)
+            self._rebalance()
+
+    @contextmanager
+    def job(self, lane='bulk', limit=None, name=None):
+        """Register a download for the duration of the block."""
+        if lane not in LANES:
+            raise ValueError(f"Unknown bandwidth lane '{lane}' (choose from {', '.join(LANES)})")
+
+        with self._lock:
+            job = BandwidthJob(self, next(self._ids), lane, limit, name)
+            self._jobs.append(job)
+            self._rebalance()
+        try:
+            yield job
+        finally:
+            with self._lock:
+                self._jobs.remove(job)
+                self._rebalance()
+
+    def _rebalance(self):
+        caps = {job: min([cap for cap in (job.limit, self.per_job_limit) if cap], default=None)
+                for job in self._jobs}
+        if not self.global_limit:
+            for job in self._jobs:
+                job.set_share(caps[job])
+            return
+
+        # Weighted fair shares; a job capped below its share leaves the rest to the others
+        remaining = self.global_limit
+        pending = list(self._jobs)
+        while pending:
+            total_weight = sum(self.lane_weights.get(job.lane, 1) for job in pending)
+            capped = [job for job in pending
+                      if caps[job] and caps[job] < remaining * self.lane_weights.get(job.lane, 1) / total_weight]
+            if not capped:
+                for job in pending:
+                    job.set_share(int(remaining * self.lane_weights.get(job.lane, 1) / total_weight))
+                break
+            for job in capped:
+                job.set_share(caps[job])
+                remaining -= caps[job]
+                pending.remove(job)
+
+    def status(self):
+        """Caps, per-lane totals and every running download's share and speed."""
+        with self._lock:
+            jobs = [job.status() for job in self._jobs]
+        lanes = {}
+        for lane in LANES:
+            lane_jobs = [job for job in jobs if job['lane'] == lane]
+            lanes[lane] = {
+                'jobs': len(lane_jobs),
+                'weight': self.lane_weights.get(lane, 1),
+                'allocated': sum(job['share'] or 0 for job in lane_jobs),
+                'speed': sum(job['speed'] or 0 for job in lane_jobs),
+            }
+        return {'global_limit': self.global_limit, 'per_job_limit': self.per_job_limit, 'lanes': lanes, 'jobs': jobs}
+
+    def describe(self):
+        return f'{format_rate(self.global_limit)} total, {format_rate(self.per_job_limit)} per download'
+
+
+_governor = BandwidthGovernor()
+
+
+def get_governor():
+    """Return the process-wide bandwidth governor."""
+    return _governor
@@ -0,0 +1,207 @@
+"""
+Batch downloads for YouTube Audio Extractor.
+Runs a list of video URLs through a bounded pool of workers with one
+aggregate progress stream, a per-item result manifest and continue-on-error semantics.
+"""
+
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+import click
+
+from .concurrency import MAX_ADAPTIVE_WORKERS, AdaptiveConcurrency, run_jobs
+from .core import clean_directory_name, download_audio_with_progress
+from .manifests import write_json_atomic
+
+DEFAULT_BATCH_WORKERS = 3
+
+# Item statuses that would end the whole job's progress stream if passed through unchanged
+TERMINAL_STATUSES = ('completed', 'failed', 'error', 'end')
+
+
+def read_url_list(lines):
+    """Parse URLs from lines of text: one per line, blank lines and '#' comments ignored, duplicates dropped."""
+    urls = []
+    for line in lines:
+        url = line.strip()
+        if url and not url.startswith('#') and url not in urls:
+            urls.append(url)
+    return urls
+
+
+def default_manifest_path(output_dir="downloads"):
+    """Manifest location for a batch written into output_dir."""
+    base_dir = Path("downloads") if output_dir == "downloads" else Path("downloads") / clean_directory_name(output_dir)
+    return base_dir / f"batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+
+class BatchProgress:
+    """Folds the progress of concurrently running items into one stream."""
+
+    def __init__(self, total, progress_hook=None):
+        self.total = total
+        self.progress_hook = progress_hook
+        self.fractions = [0.0] * total
+        self.done = 0
+        self.failed = 0
+        self._last_percent = -1
+        self._lock = threading.Lock()
+
+    def emit(self, data):
+        if self.progress_hook:
+            self.progress_hook(data)
+        elif data.get('message'):
+            click.echo(data['message'])
+
+    def percent(self):
+        return sum(self.fractions) / self.total * 100
+
+    def item_hook(self, index, url):
+        """Progress hook for one item, reporting into the aggregate stream."""
+        def hook(d):
+            status = d.get('status')
+
+            if status == 'downloading':
+                if d.get('total_bytes'):
+                    with self._lock:
+                        # Downloading is counted as the first 90% of an item, processing as the rest
+                        self.fractions[index] = 0.9 * d['downloaded_bytes'] / d['total_bytes']
+                        percent = int(self.percent())
+                        if percent == self._last_percent:
+                            return
+                        self._last_percent = percent
+                    if self.progress_hook:
+                        self.progress_hook({'status': 'batch_progress', 'percent': percent,
+                                            'message': f'Batch progress: {percent}% ({self.done + self.failed}/{self.total} items finished)'})
+                return
+
+            if not d.get('message') or status == 'finished':
+                return
+
+            item = {key: value for key, value in d.items() if key != 'status'}
+            item.update({
+                'status': f'item_{status}' if status in TERMINAL_STATUSES else status,
+                'message': f"[{index + 1}/{self.total}] {d['message']}",
+                'batch_index': index + 1,
+                'url': url,
+            })
+            if self.progress_hook or status in ('starting', 'error', 'warning'):
+                self.emit(item)
+
+        return hook
+
+    def finish_item(self, index, success, error=None):
+        with self._lock:
+            self.fractions[index] = 1.0
+            if success:
+                self.done += 1
+            else:
+                self.failed += 1
+            percent = self.percent()
+
+        self.emit({
+            'status': 'batch_item_finished',
+            'message': f"{'✅' if success else '❌'} [{index + 1}/{self.total}] "
+                       f"{'Finished' if success else f'Failed: {error}'} ({self.done + self.failed}/{self.total} done)",
+            'percent': percent,
+            'batch_index': index + 1,
+            'successful_downloads': self.done,
+            'failed_downloads': self.failed,
+        })
+
+
+def run_batch(urls, output_dir="downloads", workers=DEFAULT_BATCH_WORKERS, progress_hook=None,
+              manifest_path=None, adaptive=False, **download_options):
+    """Download every URL with at most ``workers`` running at once.
+
+    With ``adaptive`` the number of parallel downloads starts at ``workers``
+    and then follows measured throughput (see concurrency.py).
+    A failing item never stops the batch. A manifest with one entry per URL
+    (status, output files, error, timing) is rewritten atomically as items
+    finish. Returns the manifest dict. Items always report through a progress
+    hook, so pass ``interactive=True`` to be asked before split originals are
+    removed, as single CLI downloads are (see core.remove_original).
+    """
+    manifest_path = Path(manifest_path) if manifest_path else default_manifest_path(output_dir)
+    progress = BatchProgress(len(urls), progress_hook)
+    manifest = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'output_dir': output_dir,
+        'total': len(urls),
+        'items': [{'index': i + 1, 'url': url, 'status': 'pending'} for i, url in enumerate(urls)],
+    }
+    manifest_lock = threading.Lock()
+
+    controller = None
+    if adaptive:
+        controller = AdaptiveConcurrency(
+            initial=workers,
+            report=lambda message, metrics: progress.emit({'status': 'concurrency', 'message': f'🎛️  {message}',
+                                                           **metrics}))
+
+    def save_manifest():
+        with manifest_lock:
+            manifest['successful'] = progress.done
+            manifest['failed'] = progress.failed
+            write_json_atomic(manifest_path, manifest)
+
+    def run_item(index):
+        url = urls[index]
+        item = manifest['items'][index]
+        item_hook = progress.item_hook(index, url)
+        result = {}
+
+        def capture(d):
+            if d.get('status') == 'completed':
+                result['files'] = d.get('files', [])
+                result['output_dir'] = d.get('output_dir')
+            elif d.get('status') == 'error':
+                result['error'] = d.get('message')
+            item_hook(d)
+
+        started = time.time()
+        with manifest_lock:
+            item['status'] = 'running'
+        try:
+            success = download_audio_with_progress(url, output_dir, progress_hook=capture,
+                                                   ydl_options=controller.ydl_options() if controller else None,
+                                                   lane='bulk', **download_options)
+        except Exception as e:
+            success = False
+            result['error'] = str(e)
+        if controller:
+            controller.record_result(success, result.get('error'))
+
+        with manifest_lock:
+            item.update(result)
+            item['status'] = 'completed' if success else 'failed'
+            item['elapsed_seconds'] = round(time.time() - started, 1)
+            if success:
+                item.pop('error', None)
+            elif 'error' not in item:
+                item['error'] = 'Download failed'
+
+        progress.finish_item(index, success, item.get('error'))
+        save_manifest()
+        return success
+
+    progress.emit({'status': 'info', 'message': f'📦 Batch of {len(urls)} videos with '
+                                                f'{f"up to {MAX_ADAPTIVE_WORKERS} adaptive" if adaptive else workers} workers'})
+    save_manifest()
+
+    run_jobs(run_item, range(len(urls)), workers, controller)
+    if controller:
+        manifest['concurrency'] = {**controller.metrics(), 'decisions': list(controller.decisions)}
+        save_manifest()
+
+    progress.emit({
+        'status': 'batch_completed',
+        'message': f'🎯 Batch completed! Successful: {progress.done}, Failed: {progress.failed}. Manifest: {manifest_path}',
+        'successful_downloads': progress.done,
+        'failed_downloads': progress.failed,
+        'manifest': str(manifest_path),
+    })
+    manifest['manifest_path'] = str(manifest_path)
+    return manifest
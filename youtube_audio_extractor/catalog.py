@@ -0,0 +1,417 @@
+"""
+Library catalog and layout for YouTube Audio Extractor.
+Single videos saved to the downloads root can be kept flat (the default)
+or sharded into one folder per video, grouped by video ID prefix
+(downloads/by-id/dQ/dQw4w9WgXcQ/) or by download month
+(downloads/by-date/2024-05/dQw4w9WgXcQ/), so no directory grows to tens of
+thousands of entries. Every output is recorded in a catalog
+(downloads/.catalog.sqlite3) together with its browsing path, the path it
+would have in the flat layout, so listings and lookups read the catalog
+instead of scanning directories. The size, inode and link count of every
+file are recorded as well, so the storage quota (see storage.py) can tell
+what the library takes up and what evicting an item frees without walking
+it. migrate() moves an existing library from one layout to another.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from .chapters import CHAPTERS_DIR_NAME
+from .library_store import get_blob_store
+from .manifests import read_json
+from .split_manifest import manifest_path
+from .splitting import SPLIT_DIR_NAME
+from .virtual_chapters import cue_path, index_path
+
+DOWNLOADS_DIR = Path('downloads')
+CATALOG_FILENAME = '.catalog.sqlite3'
+
+LAYOUTS = ('flat', 'id', 'date')
+DEFAULT_LAYOUT = 'flat'
+
+# Top-level folders holding the per-video folders of a sharded layout
+SHARD_ROOTS = {'id': 'by-id', 'date': 'by-date'}
+
+# Path parts from the downloads root to a per-video folder (e.g. by-id/dQ/dQw4w9WgXcQ)
+SHARD_DEPTH = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,     -- relative to the downloads root
+    browse TEXT NOT NULL,      -- where the file appears when browsing (its path in the flat layout)
+    home TEXT,                 -- folder of the single video the file belongs to ('' is the root);
+                               -- NULL for playlists and custom folders, which are never moved
+    video_id TEXT,
+    download_id TEXT,
+    size INTEGER,
+    modified REAL,
+    device INTEGER,            -- the file's inode (hardlinks share one) and its number of links
+    inode INTEGER,
+    links INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_by_browse ON files (browse);
+CREATE INDEX IF NOT EXISTS files_by_download ON files (download_id);
+CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+# Columns added since the first version of the catalog, for catalogs created before them
+ADDED_COLUMNS = ('device INTEGER', 'inode INTEGER', 'links INTEGER')
+
+
+def shard_home(layout, video_id, when=None):
+    """Folder (relative to downloads/) for a single video in layout; '' is the root itself.
+
+    Videos without a known ID stay in the root.
+    """
+    if layout == 'flat' or not video_id:
+        return ''
+    if layout == 'id':
+        return f"{SHARD_ROOTS['id']}/{video_id[:2]}/{video_id}"
+    return f"{SHARD_ROOTS['date']}/{time.strftime('%Y-%m', time.localtime(when))}/{video_id}"
+
+
+def shard_item(parts):
+    """The leading parts of a relative path naming its per-video folder, or None outside the shards."""
+    if parts and parts[0] in SHARD_ROOTS.values():
+        return parts[:SHARD_DEPTH] if len(parts) > SHARD_DEPTH else None
+    return None
+
+
+def output_files(path):
+    """Every file an output of encode_downloads/split_output consists of.
+
+    A folder of chunks yields its files; a whole file yields itself, its
+    virtual chapter index and CUE sheet, and the chapter or chunk files
+    (with their manifest) it was split into.
+    """
+    path = Path(path)
+    if path.is_dir():
+        return sorted(file for file in path.iterdir() if file.is_file())
+
+    files = [file for file in (path, index_path(path), cue_path(path)) if file.is_file()]
+    for split_dir in (path.parent / CHAPTERS_DIR_NAME, path.parent / SPLIT_DIR_NAME):
+        manifest = read_json(manifest_path(split_dir, path))
+        if manifest:
+            files.append(manifest_path(split_dir, path))
+            files.extend(split_dir / segment['file'] for segment in manifest['segments']
+                         if (split_dir / segment['file']).is_file())
+    return files
+
+
+def stem_candidates(name):
+    """Prefixes of a file name that may be the stem of the audio file it was made from."""
+    name = name.lstrip('.')
+    return [name[:i] for i, char in enumerate(name) if char in '._'] + [name]
+
+
+class Catalog:
+    """Outputs in the downloads root, their browsing paths and the library layout, in SQLite."""
+
+    def __init__(self, root=DOWNLOADS_DIR, store=None):
+        self.root = Path(root)
+        self.store = store or get_blob_store()
+        self._lock = threading.RLock()
+        self._db = None
+        self._used = None  # running total of usage(), once it has been worked out
+
+    def _connect(self):
+        if self._db is None:
+            self.root.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.root / CATALOG_FILENAME, check_same_thread=False)
+            db.executescript(SCHEMA)
+            columns = {row[1] for row in db.execute('PRAGMA table_info(files)')}
+            added = [column for column in ADDED_COLUMNS if column.split()[0] not in columns]
+            for column in added:
+                db.execute(f'ALTER TABLE files ADD COLUMN {column}')
+            db.execute('CREATE INDEX IF NOT EXISTS files_by_inode ON files (device, inode)')
+            self._db = db
+            if self._setting('indexed') is None:
+                # First use: catalog what is already there, once
+                self._index_existing()
+                self._set_setting('indexed', str(time.time()))
+            elif added:
+                self._refresh()
+        return self._db
+
+    def _setting(self, key, default=None):
+        row = self._db.execute('SELECT value FROM settings WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else default
+
+    def _set_setting(self, key, value):
+        with self._db:
+            self._db.execute('INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)', (key, value))
+
+    def _relative(self, path):
+        return Path(os.path.relpath(path, self.root)).as_posix()
+
+    @property
+    def layout(self):
+        with self._lock:
+            self._connect()
+            return self._setting('layout', DEFAULT_LAYOUT)
+
+    def home_for(self, video_id, when=None):
+        """Output folder for a single video saved to the downloads root, in the current layout."""
+        home = shard_home(self.layout, video_id, when)
+        return self.root / home if home else self.root
+
+    def _sizes(self, inodes):
+        """Bytes the inodes take up together (nothing for those no file in the catalog links to)."""
+        return sum(self._db.execute('SELECT COALESCE(MAX(size), 0) FROM files WHERE device = ? AND inode = ?',
+                                    inode).fetchone()[0] for inode in inodes)
+
+    def _add(self, files, home=None, video_id=None, download_id=None):
+        rows = []
+        for file in files:
+            try:
+                stat = Path(file).stat()
+            except OSError:
+                continue
+            path = self._relative(file)
+            home_path = None if home is None else ('' if Path(home) == self.root else self._relative(home))
+            browse = path if not home_path else Path(os.path.relpath(file, home)).as_posix()
+            rows.append((path, browse, home_path, video_id, download_id, stat.st_size, stat.st_mtime,
+                         stat.st_dev, stat.st_ino, stat.st_nlink))
+
+        # The inodes of the files and of what they replace are the only ones whose usage changes
+        inodes = {(row[7], row[8]) for row in rows}
+        inodes.update(self._db.execute('SELECT device, inode FROM files WHERE path = ?', (row[0],)).fetchone()
+                      or (row[7], row[8]) for row in rows)
+        before = self._sizes(inodes) if self._used is not None else 0
+        with self._db:
+            self._db.executemany('INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            # Other links to the same data see its new size and link count too
+            self._db.executemany('UPDATE files SET size = ?, links = ? WHERE device = ? AND inode = ?',
+                                 [(row[5], row[9], row[7], row[8]) for row in rows])
+        if self._used is not None:
+            self._used += self._sizes(inodes) - before
+
+    def _refresh(self):
+        """Update the size, inode and link count of every file, and drop files that no longer exist.
+
+        Returns how many were dropped.
+        """
+        rows = self._db.execute('SELECT path FROM files').fetchall()
+        updates, gone = [], []
+        for path, in rows:
+            try:
+                stat = (self.root / path).stat()
+            except OSError:
+                gone.append((path,))
+                continue
+            updates.append((stat.st_size, stat.st_mtime, stat.st_dev, stat.st_ino, stat.st_nlink, path))
+        with self._db:
+            self._db.executemany('UPDATE files SET size = ?, modified = ?, device = ?, inode = ?, links = ? '
+                                 'WHERE path = ?', updates)
+            self._db.executemany('DELETE FROM files WHERE path = ?', gone)
+        self._used = None
+        return len(gone)
+
+    def record(self, files, home=None, video_id=None, download_id=None):
+        """Add (or update) output files; ``home`` is the folder of a single video saved to the downloads
+        root (see home_for), None for files in playlist and custom folders."""
+        with self._lock:
+            self._connect()
+            self._add(files, home, video_id, download_id)
+
+    def forget(self, path):
+        """Drop a file, or everything under a folder, from the catalog."""
+        path = self._relative(path)
+        where = "path = ? OR path LIKE ? ESCAPE '\\'"
+        args = (path, path.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '/%')
+        with self._lock, self._connect():
+            removed = self._db.execute(f'SELECT device, inode, COUNT(*) FROM files WHERE {where} '
+                                       'GROUP BY device, inode', args).fetchall()
+            inodes = [(device, inode) for device, inode, _ in removed]
+            before = self._sizes(inodes) if self._used is not None else 0
+            self._db.execute(f'DELETE FROM files WHERE {where}', args)
+            # Whatever links to the same data is left has fewer links now
+            self._db.executemany('UPDATE files SET links = links - ? WHERE device = ? AND inode = ?',
+                                 [(count, device, inode) for device, inode, count in removed])
+            if self._used is not None:
+                self._used += self._sizes(inodes) - before
+
+    def usage(self):
+        """Bytes taken up by the files in the catalog, counting hardlinked data once.
+
+        Worked out once, then kept up to date as files are recorded and forgotten.
+        """
+        with self._lock:
+            if self._used is None:
+                row = self._connect().execute('SELECT SUM(size) FROM (SELECT MAX(size) AS size FROM files '
+                                              'GROUP BY device, inode)').fetchone()
+                self._used = row[0] or 0
+            return self._used
+
+    def rescan(self):
+        """Bring the catalog in line with the disk: add files written behind its back, update sizes and
+        link counts and drop files deleted outside the app. Returns (files added, files dropped)."""
+        with self._lock:
+            self._connect()
+            dropped = self._refresh()
+            known = {path for path, in self._db.execute('SELECT path FROM files')}
+            added = self._index_existing(known)
+        return added, dropped
+
+    def linked(self, inodes):
+        """The (device, inode) pairs among ``inodes`` that a file in the catalog links to."""
+        with self._lock:
+            db = self._connect()
+            return {inode for inode in inodes
+                    if db.execute('SELECT 1 FROM files WHERE device = ? AND inode = ? LIMIT 1', inode).fetchone()}
+
+    def entries(self):
+        """(path, size, modified, (device, inode), links) of every file in the catalog."""
+        with self._lock:
+            rows = self._connect().execute('SELECT path, size, modified, device, inode, links FROM files').fetchall()
+        return [(self.root / path, size, modified, (device, inode), links)
+                for path, size, modified, device, inode, links in rows]
+
+    def files(self, download_id):
+        """Files recorded for a download, newest first."""
+        with self._lock:
+            rows = self._connect().execute('SELECT path FROM files WHERE download_id = ? ORDER BY modified DESC',
+                                           (download_id,)).fetchall()
+        return [self.root / path for path, in rows]
+
+    def latest(self, suffix):
+        """The most recently written file with suffix (e.g. '.mp3'), or None."""
+        with self._lock:
+            row = self._connect().execute('SELECT path FROM files WHERE path LIKE ? ORDER BY modified DESC LIMIT 1',
+                                          ('%' + suffix,)).fetchone()
+        return self.root / row[0] if row else None
+
+    def browse(self, suffix='.mp3'):
+        """Top level of the library as it appears in the flat layout.
+
+        Returns a list of files (with suffix) and folders (with the number
+        of suffix files inside); hidden files are left out.
+        """
+        with self._lock:
+            rows = self._connect().execute('SELECT path, browse, size, modified FROM files').fetchall()
+
+        files, folders = [], {}
+        for path, browse, size, modified in rows:
+            parts = browse.split('/')
+            if any(part.startswith('.') for part in parts):
+                continue
+            if len(parts) == 1:
+                if browse.lower().endswith(suffix):
+                    files.append({'name': browse, 'type': 'file', 'path': path, 'size': size, 'modified': modified})
+                continue
+            folder = folders.setdefault(parts[0], {'name': parts[0], 'type': 'folder', 'mp3_count': 0, 'modified': 0})
+            folder['mp3_count'] += browse.lower().endswith(suffix)
+            folder['modified'] = max(folder['modified'], modified)
+        return files + list(folders.values())
+
+    def _index_existing(self, known=()):
+        """Catalog a library written before the catalog existed (one scan of the downloads root).
+
+        Files whose relative path is in ``known`` are left alone. Returns how many were added.
+        """
+        # Video IDs of root files, from the library store and .info.json files
+        ids = {}
+        for video_id, outputs in self.store._load()['videos'].items():
+            for entry in outputs.values():
+                ids[Path(entry['name']).stem] = video_id
+
+        singles, folders = [], []
+        added = 0
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            relative = Path(dirpath).relative_to(self.root).parts
+            if not relative:
+                dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+            for name in filenames:
+                path = Path(dirpath) / name
+                if not relative and name.startswith('.'):
+                    continue  # caches and state files
+                if known and self._relative(path) in known:
+                    continue
+                if name.endswith('.info.json'):
+                    info = read_json(path) or {}
+                    if info.get('id'):
+                        ids[name[:-len('.info.json')]] = info['id']
+                item = shard_item(relative + (name,))
+                if item:
+                    self._add([path], self.root.joinpath(*item), item[-1])
+                    added += 1
+                elif not relative or relative[0] in (CHAPTERS_DIR_NAME, SPLIT_DIR_NAME):
+                    singles.append(path)
+                elif relative[0] not in SHARD_ROOTS.values():
+                    folders.append(path)
+
+        for path in singles:
+            video_id = next((ids[stem] for stem in stem_candidates(path.name) if stem in ids), None)
+            self._add([path], self.root, video_id)
+        self._add(folders)
+        self._used = None
+        return added + len(singles) + len(folders)
+
+    def migrate(self, layout, dry_run=False):
+        """Move single videos saved to the downloads root into layout and make it the current one.
+
+        Files keep their browsing path; playlist and custom folders are not
+        touched. Returns a summary dict.
+        """
+        if layout not in LAYOUTS:
+            raise ValueError(f"layout must be one of: {', '.join(LAYOUTS)}")
+
+        with self._lock:
+            db = self._connect()
+            rows = db.execute('SELECT path, browse, home, video_id, modified FROM files '
+                              'WHERE home IS NOT NULL ORDER BY path').fetchall()
+
+            # A video stays together: its folder is dated by its oldest file
+            oldest = {}
+            for _, _, home, video_id, modified in rows:
+                key = (home, video_id)
+                oldest[key] = min(oldest.get(key, modified), modified)
+
+            moved = skipped = 0
+            left = set()
+            for path, browse, home, video_id, modified in rows:
+                new_home = shard_home(layout, video_id, oldest[(home, video_id)])
+                new_path = f"{new_home}/{browse}" if new_home else browse
+                if new_path == path:
+                    continue
+                source, target = self.root / path, self.root / new_path
+                if target.exists() or not source.exists():
+                    skipped += 1
+                    continue
+                moved += 1
+                if dry_run:
+                    continue
+                target.parent.mkdir(parents=True, exist_ok=True)
+                os.rename(source, target)
+                left.add(source.parent)
+                with db:
+                    db.execute('UPDATE files SET path = ?, home = ? WHERE path = ?', (new_path, new_home, path))
+
+            if not dry_run:
+                self._set_setting('layout', layout)
+                self._remove_empty(left)
+
+        return {'layout': layout, 'moved': moved, 'skipped': skipped, 'dry_run': dry_run}
+
+    def _remove_empty(self, directories):
+        """Remove folders emptied by a migration, up to (not including) the downloads root."""
+        root = self.root.resolve()
+        for directory in sorted(directories, key=lambda d: len(d.parts), reverse=True):
+            directory = directory.resolve()
+            while root in directory.parents:
+                try:
+                    directory.rmdir()
+                except OSError:
+                    break  # not empty
+                directory = directory.parent
+
+
+_catalog = Catalog()
+
+
+def get_catalog():
+    """Return the process-wide library catalog."""
+    return _catalog
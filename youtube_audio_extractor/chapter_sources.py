@@ -0,0 +1,185 @@
+"""
+Local chapter sources for YouTube Audio Extractor.
+Chapter lists are read, where possible, without asking YouTube again: from
+the chapters embedded in a downloaded file, from the .info.json yt-dlp can
+write next to it, from a virtual chapter index, or from a small on-disk
+cache of chapter lists seen before (keyed by video ID). Cached chapter lists
+expire like cached metadata, so chapters the uploader edits are picked up.
+"""
+
+import atexit
+import json
+import subprocess
+import threading
+import time
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+from .manifests import read_json, write_json_atomic
+from .metadata import CACHE_TTL
+from .virtual_chapters import index_path
+
+CHAPTER_CACHE_PATH = Path('downloads') / '.chapter_cache.json'
+
+# Chapter lists are small; keep the most recently used ones
+CHAPTER_CACHE_MAX_ENTRIES = 1000
+
+# Uploaders edit chapters, so a cached list is only trusted as long as cached metadata
+CHAPTER_CACHE_TTL = CACHE_TTL
+
+# The cache file is written out at most this often (seconds), not on every new entry
+CHAPTER_CACHE_SAVE_INTERVAL = 10
+
+
+def is_local_file(path):
+    """Whether path names an existing local file (URLs never do)."""
+    try:
+        return Path(path).is_file()
+    except (OSError, ValueError):
+        return False
+
+
+def video_id_from_url(url):
+    """The YouTube video ID in a watch, youtu.be, shorts or embed URL, or None."""
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host.endswith('youtu.be'):
+        return parsed.path.strip('/').split('/')[0] or None
+    if 'youtube.com' in host:
+        video_ids = parse_qs(parsed.query).get('v')
+        if video_ids:
+            return video_ids[0]
+        parts = parsed.path.strip('/').split('/')
+        if len(parts) >= 2 and parts[0] in ('shorts', 'embed', 'live', 'v'):
+            return parts[1]
+    return None
+
+
+def probe_file_chapters(path):
+    """(chapters, info) embedded in a media file, read with FFprobe; chapters is empty if it has none."""
+    cmd = ['ffprobe', '-v', 'quiet', '-print_format', 'json', '-show_chapters', '-show_format', str(path)]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+        probed = json.loads(result.stdout or '{}')
+    except (OSError, ValueError):
+        probed = {}
+
+    chapters = [{
+        'start_time': float(chapter.get('start_time', 0)),
+        'end_time': float(chapter.get('end_time', 0)),
+        'title': chapter.get('tags', {}).get('title', ''),
+    } for chapter in probed.get('chapters', [])]
+    file_format = probed.get('format', {})
+    info = {
+        'title': file_format.get('tags', {}).get('title') or Path(path).stem,
+        'duration': float(file_format['duration']) if file_format.get('duration') else None,
+    }
+    return chapters, info
+
+
+def info_json_path(path):
+    """The .info.json yt-dlp writes next to a download (same name, .info.json extension)."""
+    path = Path(path)
+    return path if path.name.endswith('.info.json') else path.with_name(path.stem + '.info.json')
+
+
+def read_local_chapters(path):
+    """(chapters, info) for a local file, without any network access.
+
+    Tries the chapters embedded in the file, then its .info.json, then its
+    virtual chapter index. Chapters are dicts with start_time, end_time and
+    title, like yt-dlp's; the list is empty if no source has any.
+    """
+    path = Path(path)
+    info = {'title': path.stem, 'duration': None}
+    if not path.name.endswith('.info.json'):
+        chapters, info = probe_file_chapters(path)
+        if chapters:
+            return chapters, info
+
+    info_json = read_json(info_json_path(path))
+    if info_json and info_json.get('chapters'):
+        return info_json['chapters'], info_json
+
+    index = read_json(index_path(path))
+    if index and index.get('chapters'):
+        return index['chapters'], dict(info, duration=index.get('duration') or info.get('duration'))
+
+    return [], info
+
+
+class ChapterCache:
+    """Chapter lists of videos seen before, kept in a JSON file so they survive restarts."""
+
+    def __init__(self, path=CHAPTER_CACHE_PATH, max_entries=CHAPTER_CACHE_MAX_ENTRIES, ttl=CHAPTER_CACHE_TTL):
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = None
+        self._saved = 0
+        self._dirty = False
+
+    def _load(self):
+        if self._entries is None:
+            self._entries = read_json(self.path, {})
+        return self._entries
+
+    def get(self, video_id):
+        """(chapters, info) cached for video_id, or None."""
+        if not video_id:
+            return None
+        with self._lock:
+            cached = self._load().get(video_id)
+            if cached is not None and time.time() - cached.get('cached', 0) > self.ttl:
+                del self._entries[video_id]
+                self._dirty = True
+                cached = None
+        if cached is None:
+            return None
+        return cached['chapters'], {'id': video_id, 'title': cached.get('title'), 'duration': cached.get('duration')}
+
+    def put(self, info):
+        """Remember the chapters (possibly none) of an extracted video info dict."""
+        video_id = info.get('id')
+        if not video_id:
+            return
+        entry = {
+            'title': info.get('title'),
+            'duration': info.get('duration'),
+            'chapters': [{'start_time': chapter.get('start_time', 0), 'end_time': chapter.get('end_time', 0),
+                          'title': chapter.get('title', '')} for chapter in info.get('chapters') or []],
+            'cached': time.time(),
+        }
+        with self._lock:
+            entries = self._load()
+            entries.pop(video_id, None)
+            entries[video_id] = entry  # most recent last
+            while len(entries) > self.max_entries:
+                del entries[next(iter(entries))]
+            self._dirty = True
+            if time.monotonic() - self._saved >= CHAPTER_CACHE_SAVE_INTERVAL:
+                self._save()
+
+    def _save(self):
+        try:
+            write_json_atomic(self.path, self._entries)
+            self._dirty = False
+        except OSError:
+            pass  # the cache is only an optimisation
+        self._saved = time.monotonic()
+
+    def flush(self):
+        """Write out entries added since the cache file was last saved."""
+        with self._lock:
+            if self._dirty:
+                self._save()
+
+
+_chapter_cache = ChapterCache()
+atexit.register(_chapter_cache.flush)
+
+
+def get_chapter_cache():
+    """Return the process-wide chapter cache."""
+    return _chapter_cache
@@ -4,54 +4,79 @@ Contains functions for detecting and using YouTube video chapters for audio spli
 """
 
 import click
-import yt_dlp
+import os
 from pathlib import Path
 import subprocess
 import re
+from .session import get_pool
+from .metadata import get_metadata_cache
+from .split_manifest import SplitManifest, segment_key
+from .staging import get_staging_area, publish
+from .chapter_sources import get_chapter_cache, is_local_file, read_local_chapters, video_id_from_url
 
+# Subdirectory of the output directory that chapter files are written to
+CHAPTERS_DIR_NAME = "chapters"
+
+
+def fetch_chapters(url, info=None):
+    """Chapters of a YouTube video: from ``info`` if it was already extracted, then from the
+    chapter and metadata caches, and only then from the network."""
+    if info is None:
+        cached = get_chapter_cache().get(video_id_from_url(url))
+        if cached is not None:
+            return cached
+
+        info = get_metadata_cache().get(url)
+        if info is None:
+            with get_pool().acquire(quiet=True, no_warnings=True) as ydl:
+                info = ydl.extract_info(url, download=False)
+            get_metadata_cache().put(url, info)
+
+    get_chapter_cache().put(info)
+    return info.get('chapters') or [], info
 
-def get_video_chapters(url):
-    """Extract chapter information from a YouTube video."""
-    try:
-        ydl_opts = {
-            'quiet': True,
-            'no_warnings': True,
-        }
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
+def get_video_chapters(url, info=None):
+    """Extract chapter information from a YouTube video.
 
-            # Check for chapters in video info
-            chapters = info.get('chapters', [])
+    ``url`` may also be the path of a local file, whose chapters are then read
+    without any network access (see chapter_sources.py). ``info`` is the video's
+    already extracted metadata, if there is any.
+    """
+    try:
+        if is_local_file(url):
+            chapters, info = read_local_chapters(url)
+        else:
+            chapters, info = fetch_chapters(url, info)
 
-            if not chapters:
-                click.echo("ℹ️  No chapters found in this video")
-                return None, info
+        if not chapters:
+            click.echo("ℹ️  No chapters found in this video")
+            return None, info
 
-            click.echo(f"📚 Found {len(chapters)} chapters in the video")
+        click.echo(f"📚 Found {len(chapters)} chapters in the video")
 
-            # Extract chapter information
-            chapter_info = []
-            for i, chapter in enumerate(chapters):
-                start_time = chapter.get('start_time', 0)
-                end_time = chapter.get('end_time', 0)
-                title = chapter.get('title', f'Chapter {i+1}')
+        # Extract chapter information
+        chapter_info = []
+        for i, chapter in enumerate(chapters):
+            start_time = chapter.get('start_time', 0)
+            end_time = chapter.get('end_time', 0)
+            title = chapter.get('title') or f'Chapter {i+1}'
 
-                # Clean chapter title for filename
-                clean_title = clean_chapter_title(title)
+            # Clean chapter title for filename
+            clean_title = clean_chapter_title(title)
 
-                chapter_info.append({
-                    'index': i + 1,
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'title': title,
-                    'clean_title': clean_title,
-                    'duration': end_time - start_time if end_time > start_time else 0
-                })
+            chapter_info.append({
+                'index': i + 1,
+                'start_time': start_time,
+                'end_time': end_time,
+                'title': title,
+                'clean_title': clean_title,
+                'duration': end_time - start_time if end_time > start_time else 0
+            })
 
-                click.echo(f"  📖 Chapter {i+1}: {title} ({start_time:.0f}s - {end_time:.0f}s)")
+            click.echo(f"  📖 Chapter {i+1}: {title} ({start_time:.0f}s - {end_time:.0f}s)")
 
-            return chapter_info, info
+        return chapter_info, info
 
     except Exception as e:
         click.echo(f"❌ Error extracting chapter info: {e}")
@@ -73,34 +98,77 @@ def clean_chapter_title(title):
 
 
 def split_audio_by_chapters(input_file, output_dir, chapters, bitrate="192"):
-    """Split audio file according to YouTube video chapters."""
+    """Split audio file according to YouTube video chapters.
+
+    Chapter files from an earlier split of the same file are kept if their
+    time range is unchanged (and renamed if only the title changed); FFmpeg
+    only runs for new or changed chapters (see split_manifest.py).
+    """
     try:
         if not chapters:
             click.echo("❌ No chapters provided for splitting")
             return False
 
         # Create output directory for chapter files
-        chapters_dir = Path(output_dir) / "chapters"
+        chapters_dir = Path(output_dir) / CHAPTERS_DIR_NAME
         chapters_dir.mkdir(parents=True, exist_ok=True)
 
         click.echo(f"✂️  Splitting audio into {len(chapters)} chapter files...")
 
         # Split the audio file by chapters
         base_name = Path(input_file).stem
-
-        for chapter in chapters:
+        extension = Path(input_file).suffix
+        manifest = SplitManifest(chapters_dir, input_file, 'chapters', {})
+
+        # Create filename: base_name_chapter01_chapter_title.mp3
+        targets = [(chapter, segment_key(chapter['start_time'], chapter['duration']),
+                    chapters_dir / f"{base_name}_chapter{chapter['index']:02d}_{chapter['clean_title']}{extension}")
+                   for chapter in chapters]
+
+        # Chapters cut earlier are moved aside before any is renamed, so no rename overwrites another
+        kept, aside = {}, {}
+        try:
+            for chapter, key, output_file in targets:
+                found = manifest.take(key)
+                if found:
+                    path, segment = found
+                    if path != output_file:
+                        renaming = path.with_name(f".{path.name}.renaming")
+                        os.replace(path, renaming)
+                        aside[renaming] = path
+                        path = renaming
+                    kept[chapter['index']] = (path, segment)
+
+            for chapter, key, output_file in targets:
+                if chapter['index'] in kept:
+                    path, segment = kept[chapter['index']]
+                    if path != output_file:
+                        os.replace(path, output_file)
+                        del aside[path]
+                        click.echo(f"🔁 Chapter {chapter['index']}: renamed to {output_file.name}")
+                    else:
+                        click.echo(f"⏭️  Chapter {chapter['index']}: {output_file.name} is up to date")
+                    manifest.record(key, output_file, segment)
+        finally:
+            # Files that could not be renamed go back to their earlier names, which the manifest still lists
+            for renaming, path in aside.items():
+                try:
+                    os.replace(renaming, path)
+                except OSError as e:
+                    click.echo(f"⚠️  Could not restore {path.name}: {e}")
+
+        for chapter, key, output_file in targets:
             start_time = chapter['start_time']
             duration = chapter['duration']
-            clean_title = chapter['clean_title']
             index = chapter['index']
+            if index in kept:
+                continue
 
-            # Create filename: base_name_chapter01_chapter_title.mp3
-            output_file = chapters_dir / f"{base_name}_chapter{index:02d}_{clean_title}.mp3"
-
-            # Use FFmpeg to extract the chapter segment
+            # Use FFmpeg to extract the chapter segment (into the staging area, see staging.py)
+            staged = get_staging_area().path_for(output_file)
             cmd = [
                 'ffmpeg', '-i', input_file, '-ss', str(start_time),
-                '-t', str(duration), '-c', 'copy', '-y', str(output_file)
+                '-t', str(duration), '-c', 'copy', '-y', str(staged)
             ]
 
             result = subprocess.run(cmd, capture_output=True, text=True)
@@ -108,11 +176,14 @@ def split_audio_by_chapters(input_file, output_dir, chapters, bitrate="192"):
             if result.returncode != 0:
                 click.echo(f"❌ Error splitting chapter {index}: {result.stderr}")
                 return False
+            publish(staged, output_file)
 
             # Get the actual file size
             chapter_size = output_file.stat().st_size / (1024 * 1024)
             click.echo(f"✅ Chapter {index}: {output_file.name} ({chapter_size:.1f} MB)")
+            manifest.record(key, output_file)
 
+        manifest.save()
         click.echo(f"🎯 All chapter files saved to: {chapters_dir}")
         return True
 
@@ -122,7 +193,7 @@ def split_audio_by_chapters(input_file, output_dir, chapters, bitrate="192"):
 
 
 def list_chapters(url):
-    """List available chapters for a YouTube video."""
+    """List available chapters for a YouTube video or a local file."""
     chapters, info = get_video_chapters(url)
 
     if not chapters:
@@ -146,6 +217,6 @@ def list_chapters(url):
 
 
 def has_chapters(url):
-    """Check if a YouTube video has chapters."""
+    """Check if a YouTube video or a local file has chapters."""
     chapters, _ = get_video_chapters(url)
     return chapters is not None and len(chapters) > 0
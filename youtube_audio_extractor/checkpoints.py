@@ -0,0 +1,88 @@
+"""
+Playlist checkpoints for YouTube Audio Extractor.
+Records the state of every entry of a playlist job in a manifest inside the
+playlist directory, so an interrupted job can be resumed by video ID.
+"""
+
+import threading
+from datetime import datetime
+from pathlib import Path
+
+from .manifests import read_json, write_json_atomic
+
+CHECKPOINT_FILENAME = '.playlist_checkpoint.json'
+
+
+def entry_id(entry):
+    """Stable identifier of a PlaylistEntry: the video ID, falling back to its URL."""
+    return entry.id or entry.url
+
+
+class PlaylistCheckpoint:
+    """Per-entry state (pending, running, completed, failed) of one playlist job.
+
+    Every change is written atomically, so after a crash the manifest reflects
+    the last finished step. Entries left 'running' are retried on resume.
+    """
+
+    def __init__(self, playlist_dir, url, title, resume=False):
+        self.playlist_dir = Path(playlist_dir)
+        self.path = self.playlist_dir / CHECKPOINT_FILENAME
+        self._lock = threading.Lock()
+
+        data = read_json(self.path) if resume else None
+        if not data or data.get('url') != url:
+            data = {
+                'url': url,
+                'title': title,
+                'created': datetime.now().isoformat(timespec='seconds'),
+                'entries': {},
+            }
+        self.data = data
+        self.entries = data['entries']
+
+    def is_completed(self, video_id):
+        return self.entries.get(video_id, {}).get('state') == 'completed'
+
+    def video_dir(self, video_id, default):
+        """Directory for an entry: the one recorded earlier, so partial downloads are found again."""
+        recorded = self.entries.get(video_id, {}).get('dir')
+        return self.playlist_dir / recorded if recorded else Path(default)
+
+    def start(self, video_id, index, title, url, video_dir):
+        with self._lock:
+            record = self.entries.setdefault(video_id, {'attempts': 0})
+            record.update({
+                'index': index,
+                'title': title,
+                'url': url,
+                'dir': Path(video_dir).relative_to(self.playlist_dir).as_posix(),
+                'state': 'running',
+            })
+            record['attempts'] += 1
+        self.save()
+
+    def finish(self, video_id, success, error=None):
+        with self._lock:
+            record = self.entries[video_id]
+            record['state'] = 'completed' if success else 'failed'
+            video_dir = self.playlist_dir / record['dir']
+            record['outputs'] = sorted(
+                path.relative_to(self.playlist_dir).as_posix()
+                for path in video_dir.rglob('*')
+                if path.is_file() and path.suffix != '.part'
+            ) if video_dir.exists() else []
+            if success:
+                record.pop('error', None)
+            else:
+                record['error'] = error or 'Download failed'
+        self.save()
+
+    def counts(self):
+        states = [record.get('state') for record in self.entries.values()]
+        return {state: states.count(state) for state in ('completed', 'failed', 'running')}
+
+    def save(self):
+        with self._lock:
+            self.data['updated'] = datetime.now().isoformat(timespec='seconds')
+            write_json_atomic(self.path, self.data)
@@ -3,11 +3,27 @@ Command-line interface for YouTube Audio Extractor.
 Contains all CLI commands and user interface logic.
 """
 
+import functools
 import click
 from .core import download_audio, validate_youtube_url
+from .encoding import CODECS
+from .ranges import parse_timestamp, parse_chapter_selection
+from .batch import DEFAULT_BATCH_WORKERS, read_url_list, run_batch
 from .formats import list_formats
 from .chapters import list_chapters, has_chapters
+from .chapter_sources import is_local_file
 from .playlists import download_playlist, list_playlist_videos, validate_playlist_url
+from .sync import DEFAULT_STOP_AFTER, sync_collection
+from .metadata import DEFAULT_PREFETCH_WORKERS
+from .scheduling import DEFAULT_SCHEDULE, SCHEDULING_POLICIES
+from .bandwidth import get_governor, parse_rate
+from .splitting import DEFAULT_MAX_SIZE_MB, SIZE_PRESETS, parse_max_size
+from .silence import numpy_available
+from .library_store import dedupe_library, get_blob_store
+from .storage import get_storage_manager, parse_size, format_size
+from .catalog import LAYOUTS, get_catalog
+from .staging import get_staging_area
+from .transcode_cache import get_transcode_cache
 
 
 def show_bitrate_info():
@@ -37,9 +53,12 @@ def show_bitrate_info():
     click.echo("  • 160-192 kbps: High-quality music")
     click.echo("  • 256-320 kbps: Lossless-like quality, larger files")
     click.echo("\n✂️  Large File Splitting:")
-    click.echo("  • Use --split-large-files to automatically split files >16MB")
+    click.echo("  • Use --split-large-files to automatically split files >16MB (change with --max-size)")
     click.echo("  • Split files are saved in a 'split_chunks' subfolder")
     click.echo("  • Works with any bitrate setting")
+    click.echo("\n🎛️  Multiple Outputs:")
+    click.echo("  • Repeat --bitrate and/or --codec (mp3, opus, m4a) to encode several outputs")
+    click.echo("  • One download and one decode; each output gets its own subfolder, e.g. mp3_320k/")
     click.echo("\n📚  Chapter-Based Splitting:")
     click.echo("  • Use --split-by-chapters to split by video chapters")
     click.echo("  • Chapter files are saved in a 'chapters' subfolder")
@@ -50,37 +69,189 @@ def show_bitrate_info():
     click.echo("  • Supports all splitting options for individual videos")
 
 
+def parse_time_option(ctx, param, value):
+    """Click callback turning a --start/--end value into seconds."""
+    if value is None:
+        return None
+    try:
+        return parse_timestamp(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def parse_chapters_option(ctx, param, value):
+    """Click callback turning a --chapters value such as '3,5-7' into chapter numbers."""
+    if value is None:
+        return None
+    try:
+        return parse_chapter_selection(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def parse_rate_option(ctx, param, value):
+    """Click callback turning a rate such as '2M' or '500K' into bytes per second."""
+    try:
+        return parse_rate(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def parse_max_size_option(ctx, param, value):
+    """Click callback turning a --max-size value (MB or a preset name) into MB."""
+    try:
+        return parse_max_size(value)
+    except ValueError as e:
+        raise click.BadParameter(str(e))
+
+
+def split_size_options(func):
+    """Add the --max-size and --split-at-silence options used by --split-large-files."""
+    func = click.option('--split-at-silence', is_flag=True,
+                        help='Split large files in the pauses nearest to the size limit (implies '
+                             '--split-large-files; needs NumPy)')(func)
+    presets = ', '.join(f'{name}={size}' for name, size in SIZE_PRESETS.items())
+    func = click.option('--max-size', 'max_size_mb', default=str(DEFAULT_MAX_SIZE_MB), callback=parse_max_size_option,
+                        help=f'Largest chunk in MB for --split-large-files, or a preset ({presets}; '
+                             f'default: {DEFAULT_MAX_SIZE_MB})')(func)
+    return func
+
+
+def check_split_at_silence(split_at_silence):
+    """Whether --split-at-silence can be used, explaining why not if it can't."""
+    if split_at_silence and not numpy_available():
+        click.echo("❌ Error: --split-at-silence needs NumPy")
+        click.echo("   Install it with: pip install numpy")
+        return False
+    return True
+
+
+def rate_limit_options(func):
+    """Add the --limit-rate and --job-limit-rate options to a download command."""
+    func = click.option('--job-limit-rate', callback=parse_rate_option,
+                        help='Maximum download speed of each video, e.g. 1M')(func)
+    func = click.option('--limit-rate', callback=parse_rate_option,
+                        help='Maximum combined download speed, e.g. 4M or 500K (shared between parallel downloads)')(func)
+    return func
+
+
+def configure_bandwidth(limit_rate, job_limit_rate):
+    """Apply the --limit-rate and --job-limit-rate options to the bandwidth governor."""
+    if limit_rate or job_limit_rate:
+        governor = get_governor()
+        governor.configure(global_limit=limit_rate, per_job_limit=job_limit_rate)
+        click.echo(f"🚦 Bandwidth: {governor.describe()}")
+
+
+def writes_output(func):
+    """Sweep the staging area before a command that writes downloads (not for --help or listings)."""
+    @functools.wraps(func)
+    def command(*args, **kwargs):
+        # Left behind by interrupted runs
+        get_staging_area().sweep()
+        return func(*args, **kwargs)
+    return command
+
+
 @click.group()
-def cli():
+@click.option('--staging-dir', type=click.Path(file_okay=False),
+              help='Where files are made before they are moved into downloads/, e.g. a tmpfs '
+                   '(default: downloads/.staging)')
+@click.option('--no-transcode-cache', is_flag=True,
+              help='Encode every output afresh, without hashing sources for the transcode cache')
+def cli(staging_dir, no_transcode_cache):
     """YouTube Audio Extractor - Download audio from YouTube videos and playlists."""
-    pass
+    if no_transcode_cache:
+        get_transcode_cache().configure(enabled=False)
+    if staging_dir:
+        get_staging_area().configure(staging_dir)
 
 
 @cli.command()
-@click.argument('url')
+@click.argument('url', required=False)
+@click.option('--from-file', type=click.File('r'),
+              help="Download every URL listed in this file, one per line ('-' reads from stdin)")
+@click.option('--workers', '-w', default=DEFAULT_BATCH_WORKERS, type=click.IntRange(min=1),
+              help=f'Videos downloaded at once with --from-file (default: {DEFAULT_BATCH_WORKERS})')
+@click.option('--adaptive', is_flag=True,
+              help='With --from-file, start at --workers and adjust parallel downloads to the measured throughput')
+@click.option('--manifest', type=click.Path(dir_okay=False),
+              help='Where to write the per-video result manifest for --from-file (default: batch_<time>.json in the output directory)')
 @click.option('--output-dir', '-o', default='downloads',
               help='Output directory name (will be created within downloads/ folder)')
 @click.option('--format-id', '-f',
               help='Specific format ID to download (use list-formats to see available formats)')
 @click.option('--quality', '-q', default='best',
               help='Audio quality (default: best)')
-@click.option('--bitrate', '-b', default='192', type=click.Choice(['32', '64', '96', '128', '160', '192', '256', '320']),
-              help='Audio bitrate in kbps (default: 192)')
+@click.option('--bitrate', '-b', default=['192'], multiple=True,
+              type=click.Choice(['32', '64', '96', '128', '160', '192', '256', '320']),
+              help='Audio bitrate in kbps (default: 192); repeat to produce several outputs')
+@click.option('--codec', default=['mp3'], multiple=True, type=click.Choice(list(CODECS)),
+              help='Output codec (default: mp3); repeat to produce several outputs')
 @click.option('--split-large-files', '-s', is_flag=True,
-              help='Automatically split files larger than 16MB into smaller chunks')
+              help='Automatically split files larger than --max-size (default: 16MB) into smaller chunks')
 @click.option('--split-by-chapters', '-c', is_flag=True,
               help='Split audio according to YouTube video chapters')
-def download(url, output_dir, format_id, quality, bitrate, split_large_files, split_by_chapters):
-    """Download audio from a YouTube video."""
+@click.option('--virtual-chapters', is_flag=True,
+              help='Keep MP3 files whole and write a CUE sheet and chapter index instead of one file per '
+                   'chapter (implies --split-by-chapters)')
+@click.option('--parallel-encode/--no-parallel-encode', default=None,
+              help='Encode audio in parallel segments across CPU cores (default: automatic for inputs over 30 minutes)')
+@click.option('--encode-workers', type=click.IntRange(min=1),
+              help='Number of parallel encoder processes (default: number of CPU cores)')
+@click.option('--start', 'start_time', callback=parse_time_option,
+              help='Only download from this time on (seconds, MM:SS or HH:MM:SS)')
+@click.option('--end', 'end_time', callback=parse_time_option,
+              help='Only download up to this time (seconds, MM:SS or HH:MM:SS)')
+@click.option('--chapters', 'chapter_numbers', callback=parse_chapters_option,
+              help='Only download these chapters, e.g. 3,5-7 (each becomes its own file)')
+@split_size_options
+@rate_limit_options
+@writes_output
+def download(url, from_file, workers, adaptive, manifest, output_dir, format_id, quality, bitrate, codec, split_large_files,
+             split_by_chapters, virtual_chapters, parallel_encode, encode_workers, start_time, end_time, chapter_numbers,
+             max_size_mb, split_at_silence, limit_rate, job_limit_rate):
+    """Download audio from a YouTube video, or from a list of videos with --from-file."""
+    if bool(url) == bool(from_file):
+        click.echo("❌ Error: Provide either a URL or --from-file, not both")
+        return
+
+    if not check_split_at_silence(split_at_silence):
+        return
+    split_large_files = split_large_files or split_at_silence
+    split_by_chapters = split_by_chapters or virtual_chapters
+
     # Validate that only one splitting method is selected
     if split_large_files and split_by_chapters:
         click.echo("❌ Error: Cannot use both --split-large-files and --split-by-chapters at the same time")
         click.echo("   Choose one splitting method:")
-        click.echo("   • --split-large-files: Split by file size (16MB chunks)")
+        click.echo("   • --split-large-files: Split by file size (--max-size chunks)")
         click.echo("   • --split-by-chapters: Split by video chapters")
         return
 
-    download_audio(url, output_dir, format_id, quality, bitrate, split_large_files, split_by_chapters)
+    if chapter_numbers and (start_time is not None or end_time is not None or split_by_chapters):
+        click.echo("❌ Error: --chapters cannot be combined with --start/--end or --split-by-chapters")
+        click.echo("   Selected chapters are already saved as separate files")
+        return
+
+    options = {'format_id': format_id, 'quality': quality, 'bitrate': list(bitrate),
+               'split_large_files': split_large_files, 'split_by_chapters': split_by_chapters,
+               'parallel_encode': parallel_encode, 'encode_workers': encode_workers, 'codec': list(codec),
+               'start_time': start_time, 'end_time': end_time, 'chapter_numbers': chapter_numbers,
+               'max_size_mb': max_size_mb, 'split_at_silence': split_at_silence, 'virtual_chapters': virtual_chapters}
+    configure_bandwidth(limit_rate, job_limit_rate)
+
+    if from_file:
+        urls = read_url_list(from_file)
+        if not urls:
+            click.echo("❌ Error: No URLs found in the input")
+            return
+        # Batch items report through a hook, but the CLI still asks before removing split originals
+        run_batch(urls, output_dir, workers=workers, manifest_path=manifest, adaptive=adaptive, interactive=True,
+                  **options)
+        return
+
+    download_audio(url, output_dir, **options)
 
 
 @cli.command()
@@ -89,23 +260,48 @@ def download(url, output_dir, format_id, quality, bitrate, split_large_files, sp
               help='Output directory name (will be created within downloads/ folder)')
 @click.option('--quality', '-q', default='best',
               help='Audio quality (default: best)')
-@click.option('--bitrate', '-b', default='192', type=click.Choice(['32', '64', '96', '128', '160', '192', '256', '320']),
-              help='Audio bitrate in kbps (default: 192)')
+@click.option('--bitrate', '-b', default=['192'], multiple=True,
+              type=click.Choice(['32', '64', '96', '128', '160', '192', '256', '320']),
+              help='Audio bitrate in kbps (default: 192); repeat to produce several outputs')
+@click.option('--codec', default=['mp3'], multiple=True, type=click.Choice(list(CODECS)),
+              help='Output codec (default: mp3); repeat to produce several outputs')
 @click.option('--split-large-files', '-s', is_flag=True,
-              help='Automatically split files larger than 16MB into smaller chunks')
+              help='Automatically split files larger than --max-size (default: 16MB) into smaller chunks')
 @click.option('--split-by-chapters', '-c', is_flag=True,
               help='Split audio according to YouTube video chapters')
+@click.option('--virtual-chapters', is_flag=True,
+              help='Keep MP3 files whole and write a CUE sheet and chapter index instead of one file per '
+                   'chapter (implies --split-by-chapters)')
 @click.option('--start-index', '-start', default=1, type=int,
               help='Start downloading from this video index (default: 1)')
 @click.option('--end-index', '-end', type=int,
               help='Stop downloading at this video index (default: all remaining videos)')
-def playlist(url, output_dir, quality, bitrate, split_large_files, split_by_chapters, start_index, end_index):
+@click.option('--resume', is_flag=True,
+              help='Continue an interrupted run: skip videos already downloaded and retry failed ones')
+@click.option('--workers', '-w', default=1, type=click.IntRange(1, 8),
+              help='Videos processed at the same time (default: 1)')
+@click.option('--schedule', default=DEFAULT_SCHEDULE, type=click.Choice(SCHEDULING_POLICIES),
+              help='Order videos are started in: fifo (playlist order) or lpt (longest first, '
+                   'shortest total time with several workers)')
+@click.option('--adaptive', is_flag=True,
+              help='Start at --workers and adjust parallel downloads to the measured throughput')
+@split_size_options
+@rate_limit_options
+@writes_output
+def playlist(url, output_dir, quality, bitrate, codec, split_large_files, split_by_chapters, virtual_chapters,
+             start_index, end_index, resume, workers, schedule, adaptive, max_size_mb, split_at_silence, limit_rate,
+             job_limit_rate):
     """Download entire YouTube playlist."""
+    if not check_split_at_silence(split_at_silence):
+        return
+    split_large_files = split_large_files or split_at_silence
+    split_by_chapters = split_by_chapters or virtual_chapters
+
     # Validate that only one splitting method is selected
     if split_large_files and split_by_chapters:
         click.echo("❌ Error: Cannot use both --split-large-files and --split-by-chapters at the same time")
         click.echo("   Choose one splitting method:")
-        click.echo("   • --split-large-files: Split by file size (16MB chunks)")
+        click.echo("   • --split-large-files: Split by file size (--max-size chunks)")
         click.echo("   • --split-by-chapters: Split by video chapters")
         return
 
@@ -115,19 +311,72 @@ def playlist(url, output_dir, quality, bitrate, split_large_files, split_by_chap
         click.echo("   Playlist URLs should contain 'playlist' or 'list=' parameter")
         return
 
-    download_playlist(url, output_dir, quality, bitrate, split_large_files, split_by_chapters, start_index, end_index)
+    configure_bandwidth(limit_rate, job_limit_rate)
+    download_playlist(url, output_dir, quality, list(bitrate), split_large_files, split_by_chapters, start_index, end_index,
+                      codec=list(codec), resume=resume, workers=workers, schedule=schedule,
+                      adaptive=adaptive, max_size_mb=max_size_mb, split_at_silence=split_at_silence,
+                      virtual_chapters=virtual_chapters)
 
 
 @cli.command()
 @click.argument('url')
-def list_playlist_cmd(url):
+@click.option('--output-dir', '-o', default='downloads',
+              help='Output directory name (will be created within downloads/ folder)')
+@click.option('--quality', '-q', default='best',
+              help='Audio quality (default: best)')
+@click.option('--bitrate', '-b', default=['192'], multiple=True,
+              type=click.Choice(['32', '64', '96', '128', '160', '192', '256', '320']),
+              help='Audio bitrate in kbps (default: 192); repeat to produce several outputs')
+@click.option('--codec', default=['mp3'], multiple=True, type=click.Choice(list(CODECS)),
+              help='Output codec (default: mp3); repeat to produce several outputs')
+@click.option('--split-large-files', '-s', is_flag=True,
+              help='Automatically split files larger than --max-size (default: 16MB) into smaller chunks')
+@click.option('--split-by-chapters', '-c', is_flag=True,
+              help='Split audio according to YouTube video chapters')
+@click.option('--virtual-chapters', is_flag=True,
+              help='Keep MP3 files whole and write a CUE sheet and chapter index instead of one file per '
+                   'chapter (implies --split-by-chapters)')
+@click.option('--stop-after', default=DEFAULT_STOP_AFTER, type=click.IntRange(min=1),
+              help=f'Stop listing after this many already-downloaded videos in a row (default: {DEFAULT_STOP_AFTER})')
+@click.option('--full-scan', is_flag=True,
+              help='List the whole collection (for playlists where new videos are added at the end)')
+@split_size_options
+@rate_limit_options
+@writes_output
+def sync(url, output_dir, quality, bitrate, codec, split_large_files, split_by_chapters, virtual_chapters,
+         stop_after, full_scan, max_size_mb, split_at_silence, limit_rate, job_limit_rate):
+    """Download only the videos added to a channel or playlist since the last sync."""
+    if not check_split_at_silence(split_at_silence):
+        return
+    split_large_files = split_large_files or split_at_silence
+    split_by_chapters = split_by_chapters or virtual_chapters
+
+    if split_large_files and split_by_chapters:
+        click.echo("❌ Error: Cannot use both --split-large-files and --split-by-chapters at the same time")
+        return
+
+    if not validate_playlist_url(url):
+        click.echo("❌ Error: Invalid YouTube playlist or channel URL provided!")
+        return
+
+    configure_bandwidth(limit_rate, job_limit_rate)
+    sync_collection(url, output_dir, quality, list(bitrate), list(codec), split_large_files, split_by_chapters,
+                    stop_after=stop_after, full_scan=full_scan, max_size_mb=max_size_mb,
+                    split_at_silence=split_at_silence, virtual_chapters=virtual_chapters)
+
+
+@cli.command()
+@click.argument('url')
+@click.option('--workers', '-w', default=DEFAULT_PREFETCH_WORKERS, type=click.IntRange(1, 16),
+              help=f'Videos whose details are fetched at the same time (default: {DEFAULT_PREFETCH_WORKERS})')
+def list_playlist_cmd(url, workers):
     """List all videos in a YouTube playlist."""
     if not validate_playlist_url(url):
         click.echo("❌ Error: Invalid YouTube playlist URL provided!")
         click.echo("   Playlist URLs should contain 'playlist' or 'list=' parameter")
         return
 
-    list_playlist_videos(url)
+    list_playlist_videos(url, workers)
 
 
 @cli.command()
@@ -140,15 +389,15 @@ def list_formats_cmd(url):
 @cli.command()
 @click.argument('url')
 def list_chapters_cmd(url):
-    """List available chapters for a YouTube video."""
+    """List available chapters for a YouTube video or a downloaded file."""
     list_chapters(url)
 
 
 @cli.command()
 @click.argument('url')
 def check_chapters_cmd(url):
-    """Check if a YouTube video has chapters."""
-    if not validate_youtube_url(url):
+    """Check if a YouTube video or a downloaded file has chapters."""
+    if not is_local_file(url) and not validate_youtube_url(url):
         click.echo("❌ Invalid YouTube URL provided!")
         return
 
@@ -160,6 +409,74 @@ def check_chapters_cmd(url):
         click.echo("💡 Use --split-large-files to split by file size instead")
 
 
+@cli.command()
+@click.option('--dir', 'root', default='downloads', type=click.Path(exists=True, file_okay=False),
+              help='Library directory to deduplicate (default: downloads)')
+@click.option('--workers', '-w', type=click.IntRange(min=1),
+              help='Files hashed at the same time (default: number of CPU cores)')
+@click.option('--dry-run', is_flag=True, help='Only report how much space would be reclaimed')
+@click.option('--prune', is_flag=True, help='Also remove stored audio no library file links to any more')
+def dedupe(root, workers, dry_run, prune):
+    """Store duplicate audio files in the library once, as links to a shared copy."""
+    click.echo(f"🔍 Looking for duplicate audio files in {root}...")
+    summary = dedupe_library(root, workers, dry_run)
+    click.echo(f"📊 Scanned {summary['scanned']} files, hashed {summary['hashed']} with a same-size twin")
+    if dry_run:
+        click.echo(f"💡 {summary['duplicates']} duplicates; deduplicating would reclaim "
+                   f"{summary['reclaimed'] / (1024 * 1024):.1f} MB")
+    else:
+        click.echo(f"✅ Linked {summary['duplicates']} duplicates, reclaimed {summary['reclaimed'] / (1024 * 1024):.1f} MB")
+
+    if prune and not dry_run:
+        removed, freed = get_blob_store().prune()
+        click.echo(f"🧹 Removed {removed} unreferenced stored files ({freed / (1024 * 1024):.1f} MB)")
+
+
+@cli.command()
+@click.option('--quota', help='Size limit of the downloads folder, e.g. 50G (0 removes the limit)')
+@click.option('--pin', multiple=True, help='Never evict this item (a folder or file name in downloads/); repeatable')
+@click.option('--unpin', multiple=True, help='Allow evicting this item again; repeatable')
+@click.option('--rescan', is_flag=True, help='Measure the downloads folder again (after adding or deleting files by hand)')
+def storage(quota, pin, unpin, rescan):
+    """Show or change the storage quota; the least recently used downloads are evicted to stay within it."""
+    manager = get_storage_manager()
+    if rescan:
+        click.echo("🔍 Scanning the downloads folder...")
+        added, dropped = manager.rescan()
+        click.echo(f"✅ Found {added} new files, dropped {dropped} that no longer exist")
+    if quota is not None or pin or unpin:
+        try:
+            manager.configure(quota=parse_size(quota) if quota is not None else manager.quota, pin=pin, unpin=unpin)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--quota')
+
+    status = manager.status()
+    click.echo(f"💾 Quota: {format_size(status['quota'])}, used: {status['used'] / (1024 * 1024):.1f} MB")
+    if status['pinned']:
+        click.echo(f"📌 Pinned: {', '.join(status['pinned'])}")
+    items = sorted(status['items'], key=lambda item: item['last_access'])
+    if items:
+        click.echo("🕰️  Evicted first (least recently used):")
+        for item in [item for item in items if not item['pinned']][:10]:
+            click.echo(f"   {item['name']} ({item['size'] / (1024 * 1024):.1f} MB)")
+
+
+@cli.command()
+@click.argument('layout', type=click.Choice(LAYOUTS))
+@click.option('--dry-run', is_flag=True, help='Only report how many files would be moved')
+def migrate_layout_cmd(layout, dry_run):
+    """Move single videos in downloads/ to another layout: flat, id (by-id/<prefix>/<video id>/)
+    or date (by-date/<year-month>/<video id>/)."""
+    catalog = get_catalog()
+    click.echo(f"📦 Moving the library from the {catalog.layout} layout to the {layout} layout...")
+    summary = catalog.migrate(layout, dry_run)
+    if dry_run:
+        click.echo(f"💡 {summary['moved']} files would be moved, {summary['skipped']} skipped")
+    else:
+        click.echo(f"✅ Moved {summary['moved']} files, skipped {summary['skipped']} (missing or name taken)")
+        click.echo(f"📁 New single-video downloads are saved in the {layout} layout")
+
+
 @cli.command()
 def bitrates():
     """Show available audio bitrates and their file sizes."""
@@ -179,16 +496,29 @@ def info():
     click.echo("  python youtube_audio_extractor.py download <youtube_url> --bitrate 128")
     click.echo("  python youtube_audio_extractor.py download <youtube_url> --split-large-files")
     click.echo("  python youtube_audio_extractor.py download <youtube_url> --split-by-chapters")
+    click.echo("  python youtube_audio_extractor.py download <youtube_url> --parallel-encode --encode-workers 8")
+    click.echo("  python youtube_audio_extractor.py download <youtube_url> -b 320 -b 64 --codec mp3 --codec opus")
+    click.echo("  python youtube_audio_extractor.py download <youtube_url> --start 1:05:00 --end 1:10:00")
+    click.echo("  python youtube_audio_extractor.py download <youtube_url> --chapters 3,5-7")
+    click.echo("  python youtube_audio_extractor.py download --from-file urls.txt --workers 4")
     click.echo("\n  # Playlist downloads:")
     click.echo("  python youtube_audio_extractor.py playlist <playlist_url>")
     click.echo("  python youtube_audio_extractor.py playlist <playlist_url> --bitrate 320")
     click.echo("  python youtube_audio_extractor.py playlist <playlist_url> --start-index 5 --end-index 10")
     click.echo("  python youtube_audio_extractor.py playlist <playlist_url> --split-by-chapters")
+    click.echo("  python youtube_audio_extractor.py playlist <playlist_url> --resume")
+    click.echo("  python youtube_audio_extractor.py playlist <playlist_url> --workers 4 --schedule lpt")
+    click.echo("  python youtube_audio_extractor.py sync <channel_url>")
     click.echo("\n  # Information commands:")
     click.echo("  python youtube_audio_extractor.py list-formats <youtube_url>")
     click.echo("  python youtube_audio_extractor.py list-chapters <youtube_url>")
     click.echo("  python youtube_audio_extractor.py list-playlist <playlist_url>")
     click.echo("  python youtube_audio_extractor.py check-chapters <youtube_url>")
     click.echo("  python youtube_audio_extractor.py bitrates")
+    click.echo("\n  # Maintenance:")
+    click.echo("  python youtube_audio_extractor.py dedupe --dry-run")
+    click.echo("  python youtube_audio_extractor.py storage --quota 50G --pin Favourites")
+    click.echo("  python youtube_audio_extractor.py migrate-layout id --dry-run")
+    click.echo("  python youtube_audio_extractor.py --staging-dir /dev/shm/yae playlist <playlist_url>")
     click.echo("\nFor more help:")
     click.echo("  python youtube_audio_extractor.py --help")
@@ -0,0 +1,236 @@
+"""
+Adaptive download concurrency for YouTube Audio Extractor.
+An AIMD controller (additive increase, multiplicative decrease) that raises
+the number of parallel downloads while measured throughput keeps growing
+and halves it on throttling, errors or a throughput collapse.
+"""
+
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Bounds for adaptive runs
+MAX_ADAPTIVE_WORKERS = 8
+MAX_FRAGMENTS = 8
+
+# Seconds between two decisions
+DECISION_INTERVAL = 10.0
+
+# Speed samples older than this no longer count towards throughput
+SAMPLE_TTL = 5.0
+
+# Throughput must beat the best seen with one download fewer by this
+# fraction to earn another slot; falling short of it by as much gives the slot back
+GAIN_FRACTION = 0.05
+
+# Decisions spent holding at a level before trying one more download again
+PROBE_AFTER = 6
+
+# Failures without a single success in one interval count as congestion
+FAILURES_TO_BACK_OFF = 2
+
+THROTTLE_PATTERN = re.compile(r'\b429\b|too many requests|rate.?limit|throttl', re.IGNORECASE)
+
+
+def is_throttle_error(message):
+    """Whether an error message says the server is rate limiting us."""
+    return bool(message and THROTTLE_PATTERN.search(message))
+
+
+class AdaptiveConcurrency:
+    """Decides how many downloads run at once and how many fragments each fetches in parallel.
+
+    Feed it yt-dlp progress updates through ``ydl_options()`` and job outcomes
+    through ``record_result``; jobs take a slot with ``acquire``/``release``.
+    Each decision is passed to ``report(message, metrics)``.
+    """
+
+    def __init__(self, initial=2, min_limit=1, max_limit=MAX_ADAPTIVE_WORKERS, max_fragments=MAX_FRAGMENTS,
+                 interval=DECISION_INTERVAL, report=None):
+        self.min_limit = min_limit
+        self.max_limit = max(min_limit, max_limit)
+        self.max_fragments = max_fragments
+        self.limit = min(max(initial, min_limit), self.max_limit)
+        self.fragments = 1
+        self.interval = interval
+        self.report = report
+
+        self.active = 0
+        self.increases = 0
+        self.decreases = 0
+        self.throttle_events = 0
+        self.decisions = deque(maxlen=50)
+
+        self._cond = threading.Condition()
+        self._speeds = {}
+        self._successes = 0
+        self._failures = 0
+        self._best = {}
+        self._holds = 0
+        self._last_decision = time.monotonic()
+
+    # Slots
+
+    def acquire(self):
+        with self._cond:
+            while self.active >= self.limit:
+                self._cond.wait()
+            self.active += 1
+
+    def release(self):
+        with self._cond:
+            self.active -= 1
+            self._cond.notify_all()
+
+    # Signals
+
+    def ydl_options(self):
+        """yt-dlp options for a download starting now."""
+        return {'concurrent_fragment_downloads': self.fragments, 'progress_hooks': [self.observe]}
+
+    def observe(self, d):
+        """yt-dlp progress hook collecting speed samples."""
+        key = d.get('tmpfilename') or d.get('filename')
+        if d.get('status') in ('finished', 'error'):
+            # A finished download no longer contributes to throughput
+            with self._cond:
+                self._speeds.pop(key, None)
+            return
+        if d.get('status') != 'downloading' or not d.get('speed'):
+            return
+        with self._cond:
+            self._speeds[key] = (time.monotonic(), d['speed'])
+        self._maybe_decide()
+
+    def record_result(self, success, error=None):
+        """Record a finished job; a throttling error backs off at once."""
+        if not success and is_throttle_error(error):
+            with self._cond:
+                self.throttle_events += 1
+                self._decrease('server is throttling requests')
+            return
+
+        with self._cond:
+            if success:
+                self._successes += 1
+            else:
+                self._failures += 1
+        self._maybe_decide()
+
+    def throughput(self):
+        """Current combined download speed in bytes/s."""
+        now = time.monotonic()
+        with self._cond:
+            return sum(speed for sampled, speed in self._speeds.values() if now - sampled <= SAMPLE_TTL)
+
+    # Decisions
+
+    def _maybe_decide(self):
+        throughput = self.throughput()
+        with self._cond:
+            now = time.monotonic()
+            if now - self._last_decision < self.interval:
+                return
+
+            if self._failures >= FAILURES_TO_BACK_OFF and not self._successes:
+                self._decrease(f'{self._failures} downloads failed')
+            elif self.active >= self.limit:
+                # Only a level whose slots are all busy says anything about the pipe
+                self._best[self.limit] = max(self._best.get(self.limit, 0), throughput)
+                fewer = self._best.get(self.limit - 1)
+                if fewer is None or throughput >= fewer * (1 + GAIN_FRACTION):
+                    self._increase(f'throughput {format_speed(throughput)}')
+                elif throughput < fewer * (1 - GAIN_FRACTION):
+                    self._step_back(f'throughput {format_speed(throughput)}, '
+                                    f'{format_speed(fewer)} with one download fewer')
+                else:
+                    self._holds += 1
+                    if self._holds >= PROBE_AFTER:
+                        # Conditions change: measure the level below again before the next probe
+                        self._best.pop(self.limit - 1, None)
+                        self._holds = 0
+
+            self._successes = self._failures = 0
+            self._last_decision = now
+
+    def _increase(self, reason):
+        if self.limit < self.max_limit:
+            self.limit += 1
+        elif self.fragments < self.max_fragments:
+            self.fragments += 1
+        else:
+            return
+        self.increases += 1
+        self._holds = 0
+        self._cond.notify_all()
+        self._record('increase', reason)
+
+    def _step_back(self, reason):
+        # More parallel downloads did not help: additive decrease by one
+        self._best.pop(self.limit, None)
+        self.limit -= 1
+        self.decreases += 1
+        self._record('decrease', reason)
+
+    def _decrease(self, reason):
+        limit = max(self.min_limit, self.limit // 2)
+        fragments = max(1, self.fragments // 2)
+        if (limit, fragments) == (self.limit, self.fragments):
+            return
+        self.limit, self.fragments = limit, fragments
+        self.decreases += 1
+        # Throughput measured before congestion is no longer a fair baseline
+        self._best.clear()
+        self._holds = 0
+        self._last_decision = time.monotonic()
+        self._record('decrease', reason)
+
+    def _record(self, action, reason):
+        metrics = self.metrics()
+        self.decisions.append({'time': time.time(), 'action': action, 'reason': reason, **metrics})
+        if self.report:
+            verb = 'Raising' if action == 'increase' else 'Lowering'
+            self.report(f'{verb} concurrency to {self.limit} downloads x {self.fragments} fragments ({reason})',
+                        metrics)
+
+    def metrics(self):
+        return {
+            'concurrency_limit': self.limit,
+            'concurrent_fragments': self.fragments,
+            'active_downloads': self.active,
+            'concurrency_increases': self.increases,
+            'concurrency_decreases': self.decreases,
+            'throttle_events': self.throttle_events,
+        }
+
+
+def format_speed(bytes_per_second):
+    return f'{bytes_per_second / (1024 * 1024):.1f} MB/s'
+
+
+def run_jobs(func, jobs, workers=1, controller=None):
+    """Run ``func`` on every job, in order, with at most ``workers`` at once.
+
+    With a controller, the number of jobs running at once follows its limit
+    instead. Returns the results in job order.
+    """
+    jobs = list(jobs)
+    if controller is None:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return list(executor.map(func, jobs))
+
+    def run(job):
+        try:
+            return func(job)
+        finally:
+            controller.release()
+
+    futures = []
+    with ThreadPoolExecutor(max_workers=controller.max_limit) as executor:
+        for job in jobs:
+            # Blocks while the controller's limit is reached, so jobs start in order
+            controller.acquire()
+            futures.append(executor.submit(run, job))
+    return [future.result() for future in futures]
@@ -3,13 +3,33 @@ Core functionality for YouTube Audio Extractor.
 Contains main download logic and URL validation.
 """
 
+import math
 import os
+import threading
 import click
-import yt_dlp
 from pathlib import Path
 from urllib.parse import urlparse
-from .splitting import split_audio_file
+from .splitting import (DEFAULT_MAX_SIZE_MB, SPLIT_DIR_NAME, split_audio_file, predicted_size_mb, plan_chunks,
+                        plan_cuts, chunk_pattern, list_chunks, fit_chunks)
 from .chapters import get_video_chapters, split_audio_by_chapters, has_chapters
+from .virtual_chapters import write_chapter_index, cue_path
+from .formats import DEFAULT_FORMAT, filter_audio_formats, plan_source_format
+from .ranges import select_sections
+from .session import get_pool, apply_options, merge_options
+from .bandwidth import get_governor
+from .priority import get_scheduler
+from .encoding import (CODECS, SegmentedOutput, encode_audio, plan_parallel, probe_audio, output_formats,
+                       output_label, describe_output_formats)
+from .reporting import report
+from .transcode_cache import get_transcode_cache
+from .library_store import get_blob_store
+from .chapter_sources import video_id_from_url
+from .storage import get_storage_manager, predicted_job_bytes
+from .catalog import get_catalog, output_files
+from .staging import get_staging_area, publish
+
+# Only one prompt is shown at a time, however many downloads run in parallel
+_prompt_lock = threading.Lock()
 
 
 def validate_youtube_url(url):
@@ -41,9 +61,311 @@ def progress_hook(d):
         click.echo("\n🔄 Processing audio...")
 
 
+def downloaded_files(info):
+    """Return the paths of the source files yt-dlp downloaded for a video."""
+    return [Path(d['filepath']) for d in info.get('requested_downloads', []) if d.get('filepath')]
+
+
+def apply_format_plan(ydl, info, formats, progress_hook=None):
+    """Select the smallest source stream that satisfies every output format, and report the choice."""
+    format_id, reason = plan_source_format(filter_audio_formats(info), formats, info.get('duration'))
+    if format_id:
+        apply_options(ydl, {'format': format_id})
+
+    if progress_hook:
+        progress_hook({'status': 'info', 'message': f'Source format: {reason}'})
+    else:
+        click.echo(f"🧮 Source format: {reason}")
+
+
+def recall_outputs(video_id, formats, output_dir, progress_hook=None):
+    """Link the outputs of a video that is already in the library into output_dir.
+
+    Returns (OutputFormat, Path) pairs laid out as encode_downloads would
+    write them, or None unless every format is stored (see library_store.py).
+    """
+    store = get_blob_store()
+    if not video_id or not all(store.has(video_id, output_format) for output_format in formats):
+        return None
+    outputs = []
+    for output_format in formats:
+        target_dir = Path(output_dir) / output_label(output_format) if len(formats) > 1 else Path(output_dir)
+        path = store.recall(video_id, output_format, target_dir)
+        if path is None:
+            return None
+        outputs.append((output_format, path))
+
+    report(progress_hook, 'info', 'Already in the library, linked the stored audio instead of downloading',
+           "♻️  Already in the library, linked the stored audio instead of downloading")
+    return outputs
+
+
+def reserve_storage(info, formats, sections=None, name=None, wait=0):
+    """Reserve room within the storage quota for a video's outputs (see storage.py).
+
+    Sections are clamped to the video's duration. If the length of an
+    open-ended section cannot be known, nothing is set aside, as for any
+    video of unknown duration. Raises storage.InsufficientStorage if the
+    outputs cannot fit.
+    """
+    duration = info.get('duration')
+    if sections:
+        end = duration if duration else math.inf
+        lengths = [min(section['end_time'] or end, end) - min(section['start_time'], end) for section in sections]
+        duration = sum(lengths) if math.isfinite(sum(lengths)) else None
+    return get_storage_manager().reserve(predicted_job_bytes(duration, formats), name=name, wait=wait)
+
+
+def touch_outputs(outputs):
+    """Record outputs as just used, so the storage quota evicts them last."""
+    storage = get_storage_manager()
+    for _, path in outputs:
+        storage.touch(path)
+
+
+def remember_outputs(video_id, outputs):
+    """Keep a video's whole-file outputs in the library store, for recall_outputs."""
+    if not video_id:
+        return
+    store = get_blob_store()
+    for output_format, path in outputs:
+        if path.is_file():
+            try:
+                store.remember(video_id, output_format, path)
+            except OSError:
+                pass  # the store is only an optimisation
+
+
+def encode_downloads(info, formats, parallel_encode=None, encode_workers=None, progress_hook=None,
+                     max_size_mb=None, split_at_silence=False):
+    """Encode every downloaded source stream of a video to each output format and remove the sources.
+
+    With a single format the output is written next to the source; with several,
+    each format gets its own subdirectory (e.g. ``mp3_320k/``). Returns a list of
+    (OutputFormat, Path) pairs, or an empty list if encoding failed.
+
+    With ``max_size_mb``, an output predicted to be larger is encoded straight
+    into size-bounded chunks in a ``split_chunks/`` directory, and that
+    directory is returned as its path; no full-size file is written. Chunks
+    that still come out too large are re-cut (see splitting.fit_chunks). With
+    ``split_at_silence`` the chunk boundaries are moved into nearby pauses.
+
+    Whole-file outputs already encoded from the same source content with the
+    same settings and encode mode are taken from the transcode cache instead of
+    being encoded again, and new ones are added to it (see transcode_cache.py).
+    Sources are only hashed for this while the cache is enabled.
+
+    Outputs are written to the staging area and published into place only
+    once every output of the source has been encoded (see staging.py).
+    """
+    cache = get_transcode_cache()
+    staging = get_staging_area()
+    outputs = []
+    for source in downloaded_files(info):
+        duration = probe_audio(source)[0] if max_size_mb else None
+
+        # Each target is encoded into the staging area and published once all of them are done
+        targets = []
+        for output_format in formats:
+            target_dir = source.parent
+            if len(formats) > 1:
+                target_dir = target_dir / output_label(output_format)
+            extension = CODECS[output_format.codec][1]
+
+            if duration and predicted_size_mb(duration, output_format.bitrate) > max_size_mb:
+                num_chunks, chunk_duration = plan_chunks(duration, output_format.bitrate, max_size_mb)
+                split_dir = target_dir / SPLIT_DIR_NAME
+                pattern = staging.dir_for(split_dir) / chunk_pattern(source.stem, extension)
+                report(progress_hook, 'processing',
+                       f'Output would exceed {max_size_mb:g}MB, encoding {num_chunks} chunks of ~{chunk_duration:.1f} seconds',
+                       f"✂️  Output would exceed {max_size_mb:g}MB, encoding {num_chunks} chunks of ~{chunk_duration:.1f} seconds")
+                split_points = None
+                if split_at_silence:
+                    try:
+                        split_points = plan_cuts(source, duration, output_format.bitrate, max_size_mb, at_silence=True)
+                        report(progress_hook, 'info', 'Split points moved into the nearest pauses',
+                               "🤫 Split points moved into the nearest pauses")
+                    except RuntimeError as e:
+                        report(progress_hook, 'warning', f'{e}; splitting at fixed times', f"⚠️  {e}; splitting at fixed times")
+                targets.append((output_format, split_dir, SegmentedOutput(pattern, chunk_duration, split_points)))
+            else:
+                path = target_dir / (source.stem + extension)
+                targets.append((output_format, path, staging.path_for(path)))
+
+        # Only whole-file outputs are cached, and only hashed for when the cache is on. Outputs are
+        # cached per encode mode, which is planned for all targets and kept for those left to encode
+        whole_files = any(not isinstance(staged, SegmentedOutput) for _, _, staged in targets)
+        source_digest = cache.source_digest(source) if whole_files else None
+        parallel = parallel_encode
+        mode = 'single'
+        if source_digest is not None:
+            segments = plan_parallel(source, [(f, staged) for f, _, staged in targets], parallel_encode,
+                                     encode_workers)[0]
+            parallel = segments > 1
+            mode = 'parallel' if parallel else 'single'
+        to_encode = [(f, staged) for f, _, staged in targets
+                     if isinstance(staged, SegmentedOutput) or not cache.fetch(source_digest, f, staged, mode)]
+        if len(to_encode) < len(targets):
+            cached = len(targets) - len(to_encode)
+            report(progress_hook, 'info', f'Reused {cached} previously encoded output(s) from the cache',
+                   f"♻️  Reused {cached} previously encoded output(s) from the cache")
+
+        if to_encode:
+            if not encode_audio(source, to_encode, parallel, encode_workers, progress_hook):
+                return []
+            for output_format, staged in to_encode:
+                if not isinstance(staged, SegmentedOutput):
+                    cache.store(source_digest, output_format, staged, mode)
+
+        # Chunk lengths were estimated from the nominal bitrate; check the real sizes
+        chunk_lists = {}
+        for output_format, _, staged in targets:
+            if isinstance(staged, SegmentedOutput):
+                chunks = fit_chunks(list_chunks(staged.pattern.parent, source.stem, CODECS[output_format.codec][1]),
+                                    max_size_mb)
+                if chunks is None:
+                    return []
+                chunk_lists[output_format] = chunks
+
+        # An output with the source's own name replaces it when published
+        if all(path != source for _, path, _ in targets):
+            source.unlink()
+        for output_format, path, staged in targets:
+            if isinstance(staged, SegmentedOutput):
+                for chunk in chunk_lists[output_format]:
+                    publish(chunk, path / chunk.name)
+            else:
+                publish(staged, path)
+            outputs.append((output_format, path))
+
+    return outputs
+
+
+def remove_original(downloaded_file, prompt, progress_hook=None, interactive=None):
+    """Remove an output's original file once it has been split.
+
+    Interactive runs (the CLI; by default, runs without a progress hook) ask
+    first; prompts from parallel batch items are asked one at a time.
+    """
+    if interactive is None:
+        interactive = progress_hook is None
+    if interactive:
+        with _prompt_lock:
+            if not click.confirm(f"🗑️  {prompt} ({downloaded_file.name})?"):
+                return
+    downloaded_file.unlink()
+    report(progress_hook, 'info', 'Original file removed', "✅ Original file removed")
+
+
+def split_output(downloaded_file, output_dir, bitrate, chapters, split_large_files=False,
+                 split_by_chapters=False, progress_hook=None, max_size_mb=DEFAULT_MAX_SIZE_MB, split_at_silence=False,
+                 virtual_chapters=False, interactive=None):
+    """Apply chapter-based or size-based splitting to one finished output file.
+
+    With ``virtual_chapters`` an MP3 file is kept whole and only indexed by
+    chapter (see virtual_chapters.py); other formats are split as usual.
+    ``interactive`` asks before removing the original file (see remove_original).
+    """
+    if downloaded_file.is_dir():
+        # Already encoded straight into chunks (see encode_downloads)
+        chunks = sorted(path for path in downloaded_file.iterdir() if not path.name.startswith('.'))
+        report(progress_hook, 'success', f'Audio saved as {len(chunks)} chunks in {downloaded_file}',
+               f"🎯 Audio saved as {len(chunks)} chunks in {downloaded_file}")
+        return
+
+    file_size_mb = downloaded_file.stat().st_size / (1024 * 1024)
+
+    if progress_hook:
+        progress_hook({'status': 'info', 'message': f'Downloaded file: {downloaded_file.name} ({file_size_mb:.1f} MB)'})
+    else:
+        click.echo(f"📊 Downloaded file: {downloaded_file.name} ({file_size_mb:.1f} MB)")
+
+    # Handle chapter-based splitting first (if requested)
+    if split_by_chapters:
+        if chapters and virtual_chapters:
+            if write_chapter_index(downloaded_file, chapters, downloaded_file.stem):
+                report(progress_hook, 'success',
+                       f'Indexed {len(chapters)} virtual chapters in {cue_path(downloaded_file).name} (no files copied)',
+                       f"✅ Indexed {len(chapters)} virtual chapters in {cue_path(downloaded_file).name} (no files copied)")
+                return
+            report(progress_hook, 'warning', 'Virtual chapters need an MP3 file, writing chapter files instead',
+                   "⚠️  Virtual chapters need an MP3 file, writing chapter files instead")
+
+        if chapters:
+            if split_audio_by_chapters(str(downloaded_file), output_dir, chapters, bitrate):
+                if progress_hook:
+                    progress_hook({'status': 'success', 'message': 'Chapter-based splitting completed successfully!'})
+                else:
+                    click.echo("✅ Chapter-based splitting completed successfully!")
+                remove_original(downloaded_file, "Remove the original file after chapter splitting",
+                                progress_hook, interactive)
+            else:
+                if progress_hook:
+                    progress_hook({'status': 'error', 'message': 'Chapter-based splitting failed!'})
+                else:
+                    click.echo("❌ Chapter-based splitting failed!")
+        else:
+            if progress_hook:
+                progress_hook({'status': 'info', 'message': 'No chapters found, skipping chapter splitting'})
+            else:
+                click.echo("ℹ️  No chapters found, skipping chapter splitting")
+
+    # Handle size-based splitting (if requested and not already handled by chapters)
+    elif split_large_files:
+        if file_size_mb > max_size_mb:
+            if progress_hook:
+                progress_hook({'status': 'processing', 'message': f'File is larger than {max_size_mb:g}MB, splitting into chunks...'})
+            else:
+                click.echo(f"🔧 File is larger than {max_size_mb:g}MB, splitting into chunks...")
+
+            if split_audio_file(str(downloaded_file), output_dir, max_size_mb, bitrate, split_at_silence):
+                if progress_hook:
+                    progress_hook({'status': 'success', 'message': 'Audio splitting completed successfully!'})
+                else:
+                    click.echo("✅ Audio splitting completed successfully!")
+                remove_original(downloaded_file, "Remove the original large file", progress_hook, interactive)
+            else:
+                if progress_hook:
+                    progress_hook({'status': 'error', 'message': 'Audio splitting failed!'})
+                else:
+                    click.echo("❌ Audio splitting failed!")
+        else:
+            if progress_hook:
+                progress_hook({'status': 'info', 'message': f'File is already under {max_size_mb:g}MB, no splitting needed'})
+            else:
+                click.echo(f"ℹ️  File is already under {max_size_mb:g}MB, no splitting needed")
+
+
 def download_audio_with_progress(url, output_dir="downloads", format_id=None, quality="best", bitrate="192",
-                                split_large_files=False, split_by_chapters=False, progress_hook=None, download_id=None):
-    """Download audio from YouTube video with custom progress tracking."""
+                                split_large_files=False, split_by_chapters=False, progress_hook=None, download_id=None,
+                                parallel_encode=None, encode_workers=None, codec="mp3",
+                                start_time=None, end_time=None, chapter_numbers=None, ydl_options=None,
+                                lane='interactive', rate_limit=None, max_size_mb=DEFAULT_MAX_SIZE_MB,
+                                split_at_silence=False, virtual_chapters=False, interactive=None):
+    """Download audio from YouTube video with custom progress tracking.
+
+    ``bitrate`` and ``codec`` may each be a single value or a list; every
+    combination is encoded from one download and one decode.
+    ``start_time``/``end_time`` (seconds) or ``chapter_numbers`` restrict the
+    download to part of the video; only that part is fetched, and each selected
+    chapter becomes its own file.
+    With ``split_large_files``, outputs are split into chunks of at most ``max_size_mb``,
+    cut in pauses with ``split_at_silence`` (needs NumPy).
+    With ``split_by_chapters`` and ``virtual_chapters``, MP3 outputs are kept whole
+    with a CUE sheet and chapter byte-range index instead of one file per chapter.
+    ``parallel_encode`` forces segment-parallel MP3 encoding on or off; by default
+    it is used automatically for long inputs (see encoding.PARALLEL_ENCODE_THRESHOLD).
+    ``ydl_options`` are extra yt-dlp options for this download (extra progress hooks are added).
+    The download waits for worker and FFmpeg slots in ``lane`` ('interactive' or 'bulk',
+    see priority.py) and takes that lane's share of the process bandwidth budget,
+    capped at ``rate_limit`` bytes/s if given (see bandwidth.py).
+    Whole videos already in the library store are linked instead of downloaded
+    (see library_store.py).
+    The predicted output size is reserved within the storage quota before the
+    download starts; if it cannot fit, the download is refused (see storage.py).
+    ``interactive`` asks before removing an original file after splitting; by
+    default only runs without a progress hook ask (see remove_original).
+    """
     if not validate_youtube_url(url):
         if progress_hook:
             progress_hook({'status': 'error', 'message': 'Invalid YouTube URL provided!'})
@@ -51,9 +373,19 @@ def download_audio_with_progress(url, output_dir="downloads", format_id=None, qu
             click.echo("❌ Invalid YouTube URL provided!")
         return False
 
+    try:
+        formats = output_formats(bitrate, codec)
+    except ValueError as e:
+        if progress_hook:
+            progress_hook({'status': 'error', 'message': str(e)})
+        else:
+            click.echo(f"❌ {e}")
+        return False
+
     # Ensure output directory is always within the downloads folder
     if output_dir == "downloads":
-        final_output_dir = "downloads"
+        # A folder of its own in a sharded library layout, the root itself in the flat one (see catalog.py)
+        final_output_dir = get_catalog().home_for(video_id_from_url(url))
     else:
         # Create a clean subfolder name and place it in downloads/
         clean_dir_name = clean_directory_name(output_dir)
@@ -62,15 +394,11 @@ def download_audio_with_progress(url, output_dir="downloads", format_id=None, qu
     # Create output directory if it doesn't exist
     Path(final_output_dir).mkdir(parents=True, exist_ok=True)
 
-    # Configure yt-dlp options
+    # Configure yt-dlp options (the source stream is encoded by encode_downloads)
     ydl_opts = {
-        'outtmpl': os.path.join(final_output_dir, '%(title)s.%(ext)s'),
-        'format': 'bestaudio[ext=m4a]/bestaudio[ext=mp3]/bestaudio' if format_id is None else format_id,
-        'postprocessors': [{
-            'key': 'FFmpegExtractAudio',
-            'preferredcodec': 'mp3',
-            'preferredquality': bitrate,
-        }],
+        # Selected parts are named after the section, e.g. "Title_chapter03_Intro.m4a"
+        'outtmpl': os.path.join(final_output_dir, '%(title)s%(section_title&_{}|)s.%(ext)s'),
+        'format': DEFAULT_FORMAT if format_id is None else format_id,
         'quiet': False,
         'no_warnings': False,
     }
@@ -78,8 +406,12 @@ def download_audio_with_progress(url, output_dir="downloads", format_id=None, qu
     # Add progress hook if provided
     if progress_hook:
         ydl_opts['progress_hooks'] = [progress_hook]
+    ydl_opts = merge_options(ydl_opts, ydl_options)
 
+    reservation = staging_job = None
     try:
+        # Files are made in a staging directory of this job and published when finished
+        staging_job = get_staging_area().begin(url)
         if progress_hook:
             progress_hook({'status': 'starting', 'message': f'Starting audio extraction from: {url}'})
         else:
@@ -91,15 +423,15 @@ def download_audio_with_progress(url, output_dir="downloads", format_id=None, qu
             click.echo(f"📁 Output directory: {final_output_dir}")
 
         if progress_hook:
-            progress_hook({'status': 'info', 'message': f'Audio quality: {bitrate} kbps'})
+            progress_hook({'status': 'info', 'message': f'Audio quality: {describe_output_formats(formats)}'})
         else:
-            click.echo(f"🎚️  Audio quality: {bitrate} kbps")
+            click.echo(f"🎚️  Audio quality: {describe_output_formats(formats)}")
 
         if split_large_files:
             if progress_hook:
-                progress_hook({'status': 'info', 'message': 'Large file splitting: Enabled (max 16MB per chunk)'})
+                progress_hook({'status': 'info', 'message': f'Large file splitting: Enabled (max {max_size_mb:g}MB per chunk)'})
             else:
-                click.echo("✂️  Large file splitting: Enabled (max 16MB per chunk)")
+                click.echo(f"✂️  Large file splitting: Enabled (max {max_size_mb:g}MB per chunk)")
 
         if split_by_chapters:
             if progress_hook:
@@ -113,102 +445,81 @@ def download_audio_with_progress(url, output_dir="downloads", format_id=None, qu
                 else:
                     click.echo("⚠️  Warning: Video doesn't appear to have chapters. Chapter splitting may not work as expected.")
 
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
+        scheduler = get_scheduler()
+        # A video already in the library is linked into place instead of downloaded again
+        whole_video = format_id is None and start_time is None and end_time is None and not chapter_numbers
+        outputs = recall_outputs(video_id_from_url(url), formats, final_output_dir, progress_hook) if whole_video else None
+        info = None
+        if outputs is None:
+            with scheduler.slot('worker', lane), get_governor().job(lane, rate_limit, name=url) as bandwidth, \
+                    get_pool().acquire(**merge_options(ydl_opts, bandwidth.ydl_options())) as ydl, \
+                    bandwidth.attach(ydl):
+                info = ydl.extract_info(url, download=False)
+                # Without an explicit format, fetch only as much audio as the outputs need
+                if format_id is None:
+                    apply_format_plan(ydl, info, formats, progress_hook)
+
+                sections = select_sections(info, start_time, end_time, chapter_numbers)
+                if sections:
+                    # Fetch only the byte ranges covering the selected parts
+                    ydl.params['download_ranges'] = lambda *_: sections
+                    if progress_hook:
+                        progress_hook({'status': 'info', 'message': f'Downloading {len(sections)} selected part(s) only'})
+                    else:
+                        click.echo(f"⏱️  Downloading {len(sections)} selected part(s) only")
 
-        if progress_hook:
-            progress_hook({'status': 'finished', 'message': 'Audio extraction completed successfully!'})
-        else:
-            click.echo("✅ Audio extraction completed successfully!")
+                # Refuse up front if the outputs cannot fit within the storage quota
+                reservation = reserve_storage(info, formats, sections, name=url)
+                info = ydl.process_ie_result(info, download=True)
 
-        # Find the downloaded audio file (MP3, M4A, or other audio formats)
-        audio_files = list(Path(final_output_dir).glob("*.mp3")) + list(Path(final_output_dir).glob("*.m4a")) + list(Path(final_output_dir).glob("*.webm"))
-        if not audio_files:
-            if progress_hook:
-                progress_hook({'status': 'error', 'message': 'No audio file found after download'})
-            else:
-                click.echo("❌ No audio file found after download")
-            return False
+            with scheduler.slot('ffmpeg', lane):
+                outputs = encode_downloads(info, formats, parallel_encode, encode_workers, progress_hook,
+                                           max_size_mb=max_size_mb if split_large_files and not split_by_chapters else None,
+                                           split_at_silence=split_at_silence)
+            if not outputs:
+                if progress_hook:
+                    progress_hook({'status': 'error', 'message': 'No audio file found after download'})
+                else:
+                    click.echo("❌ No audio file found after download")
+                return False
 
-        downloaded_file = audio_files[-1]  # Get the most recent audio file
-        file_size_mb = downloaded_file.stat().st_size / (1024 * 1024)
+            if whole_video:
+                remember_outputs(info.get('id'), outputs)
 
         if progress_hook:
-            progress_hook({'status': 'info', 'message': f'Downloaded file: {downloaded_file.name} ({file_size_mb:.1f} MB)'})
+            progress_hook({'status': 'finished', 'message': 'Audio extraction completed successfully!'})
         else:
-            click.echo(f"📊 Downloaded file: {downloaded_file.name} ({file_size_mb:.1f} MB)")
+            click.echo("✅ Audio extraction completed successfully!")
 
-        # Handle chapter-based splitting first (if requested)
+        chapters = None
         if split_by_chapters:
             if progress_hook:
                 progress_hook({'status': 'processing', 'message': 'Splitting audio by video chapters...'})
             else:
                 click.echo("🔧 Splitting audio by video chapters...")
 
-            chapters, _ = get_video_chapters(url)
-
-            if chapters:
-                if split_audio_by_chapters(str(downloaded_file), final_output_dir, chapters, bitrate):
-                    if progress_hook:
-                        progress_hook({'status': 'success', 'message': 'Chapter-based splitting completed successfully!'})
-                    else:
-                        click.echo("✅ Chapter-based splitting completed successfully!")
-                    # In web mode, don't prompt for confirmation - just remove the original file
-                    if progress_hook:
-                        downloaded_file.unlink()
-                        progress_hook({'status': 'info', 'message': 'Original file removed'})
-                    else:
-                        # In CLI mode, ask for confirmation
-                        if click.confirm("🗑️  Remove the original file after chapter splitting?"):
-                            downloaded_file.unlink()
-                            click.echo("✅ Original file removed")
-                else:
-                    if progress_hook:
-                        progress_hook({'status': 'error', 'message': 'Chapter-based splitting failed!'})
-                    else:
-                        click.echo("❌ Chapter-based splitting failed!")
-            else:
-                if progress_hook:
-                    progress_hook({'status': 'info', 'message': 'No chapters found, skipping chapter splitting'})
-                else:
-                    click.echo("ℹ️  No chapters found, skipping chapter splitting")
-
-        # Handle size-based splitting (if requested and not already handled by chapters)
-        elif split_large_files:
-            if file_size_mb > 16:
-                if progress_hook:
-                    progress_hook({'status': 'processing', 'message': 'File is larger than 16MB, splitting into chunks...'})
-                else:
-                    click.echo("🔧 File is larger than 16MB, splitting into chunks...")
+            chapters, _ = get_video_chapters(url, info)
 
-                if split_audio_file(str(downloaded_file), final_output_dir, 16, bitrate):
-                    if progress_hook:
-                        progress_hook({'status': 'success', 'message': 'Audio splitting completed successfully!'})
-                    else:
-                        click.echo("✅ Audio splitting completed successfully!")
-                    # In web mode, don't prompt for confirmation - just remove the original file
-                    if progress_hook:
-                        downloaded_file.unlink()
-                        progress_hook({'status': 'info', 'message': 'Original file removed'})
-                    else:
-                        # In CLI mode, ask for confirmation
-                        if click.confirm("🗑️  Remove the original large file?"):
-                            downloaded_file.unlink()
-                            click.echo("✅ Original file removed")
-                else:
-                    if progress_hook:
-                        progress_hook({'status': 'error', 'message': 'Audio splitting failed!'})
-                    else:
-                        click.echo("❌ Audio splitting failed!")
-            else:
-                if progress_hook:
-                    progress_hook({'status': 'info', 'message': 'File is already under 16MB, no splitting needed'})
-                else:
-                    click.echo("ℹ️  File is already under 16MB, no splitting needed")
+        # Each output is split on its own, into its own directory
+        with scheduler.slot('ffmpeg', lane):
+            for output_format, downloaded_file in outputs:
+                split_output(downloaded_file, str(downloaded_file.parent), output_format.bitrate, chapters,
+                             split_large_files, split_by_chapters, progress_hook, max_size_mb, split_at_silence,
+                             virtual_chapters, interactive)
+        touch_outputs(outputs)
+        files = [file for _, path in outputs for file in output_files(path)]
+        get_catalog().record(files, home=final_output_dir if output_dir == "downloads" else None,
+                             video_id=(info or {}).get('id') or video_id_from_url(url), download_id=download_id)
 
         # Send final completion message
         if progress_hook:
-            progress_hook({'status': 'completed', 'message': 'Download and processing completed successfully!', 'percent': 100})
+            progress_hook({
+                'status': 'completed',
+                'message': 'Download and processing completed successfully!',
+                'percent': 100,
+                'output_dir': str(final_output_dir),
+                'files': [str(file) for file in files if not file.name.startswith('.')]
+            })
 
         return True
 
@@ -218,11 +529,22 @@ def download_audio_with_progress(url, output_dir="downloads", format_id=None, qu
         else:
             click.echo(f"❌ Error during download: {e}")
         return False
+    finally:
+        if reservation:
+            reservation.release()
+        if staging_job:
+            staging_job.close()
 
 
-def download_audio(url, output_dir="downloads", format_id=None, quality="best", bitrate="192", split_large_files=False, split_by_chapters=False):
+def download_audio(url, output_dir="downloads", format_id=None, quality="best", bitrate="192", split_large_files=False, split_by_chapters=False,
+                   parallel_encode=None, encode_workers=None, codec="mp3", start_time=None, end_time=None, chapter_numbers=None,
+                   max_size_mb=DEFAULT_MAX_SIZE_MB, split_at_silence=False, virtual_chapters=False):
     """Download audio from YouTube video."""
-    return download_audio_with_progress(url, output_dir, format_id, quality, bitrate, split_large_files, split_by_chapters)
+    return download_audio_with_progress(url, output_dir, format_id, quality, bitrate, split_large_files, split_by_chapters,
+                                        parallel_encode=parallel_encode, encode_workers=encode_workers, codec=codec,
+                                        start_time=start_time, end_time=end_time, chapter_numbers=chapter_numbers,
+                                        max_size_mb=max_size_mb, split_at_silence=split_at_silence,
+                                        virtual_chapters=virtual_chapters)
 
 
 def clean_directory_name(name):
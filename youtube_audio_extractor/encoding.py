@@ -0,0 +1,296 @@
+"""
+Audio encoding for YouTube Audio Extractor.
+Turns downloaded source streams into one or more output files, encoding long
+MP3 outputs as parallel segments that are joined back together without gaps.
+"""
+
+import math
+import os
+import subprocess
+import tempfile
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .mp3 import iter_frames
+from .reporting import report
+
+# Supported output codecs: name -> (FFmpeg encoder, file extension)
+CODECS = {
+    'mp3': ('libmp3lame', '.mp3'),
+    'opus': ('libopus', '.opus'),
+    'm4a': ('aac', '.m4a'),
+}
+
+OutputFormat = namedtuple('OutputFormat', ['codec', 'bitrate'])
+
+# An output written straight to numbered chunk files by FFmpeg's segment muxer;
+# ``pattern`` is an FFmpeg file pattern such as 'Title_part%02d.mp3'. Chunks are
+# cut at the given ``split_points`` (seconds), or else every ``segment_time`` seconds
+SegmentedOutput = namedtuple('SegmentedOutput', ['pattern', 'segment_time', 'split_points'], defaults=(None,))
+
+# Inputs at least this long (in seconds) are encoded in parallel segments by default
+PARALLEL_ENCODE_THRESHOLD = 1800
+
+# Segments shorter than this are not worth a separate FFmpeg process
+MIN_SEGMENT_SECONDS = 120
+
+MP3_FRAME_SAMPLES = 1152
+
+# Priming samples FFmpeg's libmp3lame puts in front of the audio (encoder delay + decoder delay)
+LAME_PRIMING_SAMPLES = 576 + 529
+
+# Whole frames each segment encodes before and after its own range, so that the
+# kept frames are encoded with real neighbouring audio on both sides
+PREROLL_FRAMES = 2
+TAIL_FRAMES = 2
+
+MP3_SAMPLE_RATES = (32000, 44100, 48000)
+
+
+def probe_audio(input_file):
+    """Return (duration_seconds, sample_rate) of the first audio stream, or (None, None)."""
+    cmd = [
+        'ffprobe', '-v', 'quiet', '-select_streams', 'a:0',
+        '-show_entries', 'stream=sample_rate:format=duration',
+        '-of', 'default=noprint_wrappers=1', str(input_file)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+
+    if result.returncode != 0:
+        return None, None
+
+    values = dict(line.split('=', 1) for line in result.stdout.splitlines() if '=' in line)
+    try:
+        duration = float(values.get('duration', ''))
+    except ValueError:
+        duration = None
+    try:
+        sample_rate = int(values.get('sample_rate', ''))
+    except ValueError:
+        sample_rate = None
+
+    return duration, sample_rate
+
+
+def output_formats(bitrate="192", codec="mp3"):
+    """Build the list of requested OutputFormats from one or several bitrates and codecs.
+
+    Every codec is produced at every bitrate, in the order given.
+    """
+    bitrates = [bitrate] if isinstance(bitrate, (str, int)) else bitrate
+    codecs = [codec] if isinstance(codec, str) else codec
+    if not isinstance(bitrates, (list, tuple)) or not all(isinstance(rate, (str, int)) for rate in bitrates):
+        raise ValueError(f"Invalid bitrate: {bitrate!r}")
+    if not isinstance(codecs, (list, tuple)):
+        raise ValueError(f"Invalid codec: {codec!r}")
+
+    formats = []
+    for name in codecs:
+        if not isinstance(name, str) or name not in CODECS:
+            raise ValueError(f"Unsupported codec: {name}")
+        for rate in bitrates:
+            output_format = OutputFormat(name, str(rate))
+            if output_format not in formats:
+                formats.append(output_format)
+    return formats
+
+
+def output_label(output_format):
+    """Directory name used for one output when several are produced, e.g. 'mp3_320k'."""
+    return f"{output_format.codec}_{output_format.bitrate}k"
+
+
+def describe_output_formats(formats):
+    """Human-readable summary of the requested outputs."""
+    if formats == [OutputFormat('mp3', formats[0].bitrate)]:
+        return f"{formats[0].bitrate} kbps"
+    return ', '.join(f"{f.bitrate} kbps {f.codec}" for f in formats)
+
+
+def default_encode_workers():
+    """Number of parallel encoder processes to use when none is requested."""
+    return os.cpu_count() or 1
+
+
+def plan_parallel(input_file, targets, parallel=None, workers=None):
+    """How encode_audio would encode targets: (segments, duration, sample_rate).
+
+    ``segments`` is the number of parallel segments, or 0 or 1 for a single
+    pass; the source is only probed for a single MP3 target.
+    """
+    if len(targets) != 1 or targets[0][0].codec != 'mp3' or isinstance(targets[0][1], SegmentedOutput):
+        return 0, None, None
+
+    workers = workers or default_encode_workers()
+    duration, sample_rate = probe_audio(input_file)
+    if parallel is None:
+        parallel = duration is not None and duration >= PARALLEL_ENCODE_THRESHOLD
+
+    segments = 0
+    if parallel and duration:
+        segments = min(workers, max(1, int(duration // MIN_SEGMENT_SECONDS)))
+    return segments, duration, sample_rate
+
+
+def encode_audio(input_file, targets, parallel=None, workers=None, progress_hook=None):
+    """Encode an audio source to every (OutputFormat, output_file) in targets.
+
+    Several targets are encoded by a single FFmpeg process that decodes the
+    source once. A single MP3 target can instead be encoded as parallel
+    segments: ``parallel`` forces this on (True) or off (False), and by default
+    it is used for inputs longer than PARALLEL_ENCODE_THRESHOLD. A target file
+    may be a SegmentedOutput, which is always encoded in the single pass.
+    """
+    segments, duration, sample_rate = plan_parallel(input_file, targets, parallel, workers)
+    if segments > 1:
+        output_format, output_file = targets[0]
+        report(progress_hook, 'processing',
+               f'Encoding {duration / 60:.0f} min of audio in {segments} parallel segments...',
+               f"⚡ Encoding {duration / 60:.0f} min of audio in {segments} parallel segments...")
+        return encode_parallel(input_file, output_file, output_format.bitrate, duration, sample_rate,
+                               segments, progress_hook)
+
+    if len(targets) > 1:
+        report(progress_hook, 'processing', f'Encoding {len(targets)} outputs in one pass...',
+               f"🔄 Encoding {len(targets)} outputs in one pass...")
+    else:
+        report(progress_hook, 'processing', 'Encoding audio...', "🔄 Encoding audio...")
+    return encode_outputs(input_file, targets, progress_hook)
+
+
+def output_args(output_format):
+    """FFmpeg arguments that select and encode the audio of one output."""
+    encoder, _ = CODECS[output_format.codec]
+    return ['-map', '0:a:0', '-vn', '-c:a', encoder, '-b:a', f'{output_format.bitrate}k']
+
+
+def encode_outputs(input_file, targets, progress_hook=None):
+    """Encode an audio source to all targets with one FFmpeg process (one decode, many encoders)."""
+    cmd = ['ffmpeg', '-i', str(input_file)]
+    for output_format, output_file in targets:
+        cmd += output_args(output_format)
+        if isinstance(output_file, SegmentedOutput):
+            # Cut into chunks while encoding; every chunk starts its own timeline at 0
+            cmd += ['-f', 'segment', '-segment_start_number', '1', '-reset_timestamps', '1']
+            if output_file.split_points:
+                cmd += ['-segment_times', ','.join(f'{point:.3f}' for point in output_file.split_points)]
+            else:
+                cmd += ['-segment_time', f'{output_file.segment_time:.3f}']
+            output_file = output_file.pattern
+        cmd += ['-y', str(output_file)]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+
+    if result.returncode != 0:
+        report(progress_hook, 'error', f'Error encoding audio: {result.stderr}', f"❌ Error encoding audio: {result.stderr}")
+        return False
+
+    return True
+
+
+def plan_segments(total_frames, segments):
+    """Split total_frames into contiguous (first_frame, frame_count) ranges."""
+    per_segment = math.ceil(total_frames / segments)
+    plan = []
+    first = 0
+    while first < total_frames:
+        count = min(per_segment, total_frames - first)
+        plan.append((first, count))
+        first += count
+    return plan
+
+
+def encode_parallel(input_file, output_file, bitrate, duration, sample_rate, segments, progress_hook=None):
+    """Encode an audio source to MP3 as parallel segments joined with the concat demuxer.
+
+    Segment boundaries fall on MP3 frame boundaries of the output. Each segment is
+    encoded with a short pre-roll sized so that, after LAME's priming samples, its
+    first real sample starts exactly on a frame; the pre-roll and tail frames are
+    then dropped, so the joined frames line up sample-for-sample with a single pass.
+    The bit reservoir is disabled so that no kept frame depends on a dropped one.
+    """
+    if sample_rate not in MP3_SAMPLE_RATES:
+        sample_rate = 44100
+
+    total_samples = round(duration * sample_rate)
+    total_frames = math.ceil(total_samples / MP3_FRAME_SAMPLES)
+    plan = plan_segments(total_frames, segments)
+    preroll_samples = PREROLL_FRAMES * MP3_FRAME_SAMPLES - LAME_PRIMING_SAMPLES
+
+    with tempfile.TemporaryDirectory(prefix='.encode_', dir=Path(output_file).parent) as work_dir:
+        work_dir = Path(work_dir)
+
+        def encode_segment(index):
+            first_frame, frame_count = plan[index]
+            start = first_frame * MP3_FRAME_SAMPLES - preroll_samples
+            end = (first_frame + frame_count + TAIL_FRAMES) * MP3_FRAME_SAMPLES
+
+            filters = [f'aresample={sample_rate}']
+            if start < 0:
+                # Nothing precedes the first segment, so pad its pre-roll with silence
+                filters.append(f'adelay=delays={-start}S:all=1')
+                start = 0
+
+            segment_file = work_dir / f'segment_{index:03d}.mp3'
+            cmd = [
+                'ffmpeg', '-ss', f'{start / sample_rate:.6f}', '-t', f'{(end - start) / sample_rate:.6f}',
+                '-i', str(input_file), '-vn', '-af', ','.join(filters),
+                '-c:a', 'libmp3lame', '-b:a', f'{bitrate}k', '-reservoir', '0',
+                '-write_xing', '0', '-id3v2_version', '0', '-y', str(segment_file)
+            ]
+            result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+            if result.returncode != 0:
+                raise RuntimeError(f'segment {index + 1}: {result.stderr}')
+
+            trimmed_file = work_dir / f'trimmed_{index:03d}.mp3'
+            trim_frames(segment_file, trimmed_file, PREROLL_FRAMES, frame_count)
+            segment_file.unlink()
+            return trimmed_file
+
+        try:
+            with ThreadPoolExecutor(max_workers=len(plan)) as executor:
+                trimmed_files = list(executor.map(encode_segment, range(len(plan))))
+        except (RuntimeError, OSError) as e:
+            report(progress_hook, 'error', f'Error encoding {e}', f"❌ Error encoding {e}")
+            return False
+
+        concat_list = work_dir / 'segments.txt'
+        concat_list.write_text(''.join(f"file '{path.name}'\n" for path in trimmed_files))
+
+        cmd = [
+            'ffmpeg', '-f', 'concat', '-safe', '0', '-i', str(concat_list),
+            '-c', 'copy', '-y', str(output_file)
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+
+        if result.returncode != 0:
+            report(progress_hook, 'error', f'Error joining encoded segments: {result.stderr}',
+                   f"❌ Error joining encoded segments: {result.stderr}")
+            return False
+
+    return True
+
+
+def trim_frames(input_file, output_file, skip_frames, keep_frames):
+    """Copy keep_frames MP3 frames from input_file to output_file, after skipping skip_frames."""
+    with open(input_file, 'rb') as src:
+        start = end = None
+        for number, (offset, length, _, _) in enumerate(iter_frames(src)):
+            if number < skip_frames:
+                continue
+            if start is None:
+                start = offset
+            end = offset + length
+            if number == skip_frames + keep_frames - 1:
+                break
+
+        with open(output_file, 'wb') as dst:
+            if start is not None:
+                src.seek(start)
+                remaining = end - start
+                while remaining > 0:
+                    chunk = src.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        break
+                    dst.write(chunk)
+                    remaining -= len(chunk)
@@ -0,0 +1,101 @@
+"""
+Playlist enumeration for YouTube Audio Extractor.
+Keeps only the fields the downloader uses (id, url, title, duration, index)
+for every entry of a collection, stored column by column, so that listing
+a channel with thousands of uploads stays small in memory.
+"""
+
+from array import array
+
+# Column value for an entry whose duration is not known
+UNKNOWN_DURATION = -1.0
+
+
+class PlaylistEntry:
+    """One video of a collection."""
+
+    __slots__ = ('duration', 'id', 'index', 'title', 'url')
+
+    def __init__(self, index, id, url, title=None, duration=None):
+        self.index = index
+        self.id = id
+        self.url = url
+        self.title = title
+        self.duration = duration
+
+    @classmethod
+    def from_info(cls, index, entry):
+        """Build an entry from a (flat) yt-dlp entry dict."""
+        return cls(index, entry.get('id'), entry.get('url') or entry.get('webpage_url'),
+                   entry.get('title'), entry.get('duration'))
+
+    def __repr__(self):
+        return f"PlaylistEntry({self.index}, {self.id!r}, {self.title!r})"
+
+
+class PlaylistEntries:
+    """The entries of a collection, one column per field.
+
+    Indexing returns PlaylistEntry records built on demand; slicing returns
+    another PlaylistEntries.
+    """
+
+    def __init__(self):
+        self.indexes = array('l')
+        self.ids = []
+        self.urls = []
+        self.titles = []
+        self.durations = array('d')
+
+    @classmethod
+    def from_infos(cls, entries, limit=None):
+        """Collect entries from an iterable of yt-dlp entry dicts, skipping failed (None) ones.
+
+        The iterable is consumed one entry at a time, so a lazily paged
+        listing never has all of its raw dicts in memory at once.
+        """
+        collected = cls()
+        for entry in entries:
+            if entry is None:
+                continue
+            collected.append(PlaylistEntry.from_info(len(collected) + 1, entry))
+            if limit and len(collected) >= limit:
+                break
+        return collected
+
+    def append(self, entry):
+        self.indexes.append(entry.index)
+        self.ids.append(entry.id)
+        self.urls.append(entry.url)
+        self.titles.append(entry.title)
+        self.durations.append(UNKNOWN_DURATION if entry.duration is None else float(entry.duration))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            part = PlaylistEntries()
+            part.indexes = self.indexes[position]
+            part.ids = self.ids[position]
+            part.urls = self.urls[position]
+            part.titles = self.titles[position]
+            part.durations = self.durations[position]
+            return part
+
+        duration = self.durations[position]
+        return PlaylistEntry(self.indexes[position], self.ids[position], self.urls[position],
+                             self.titles[position], None if duration == UNKNOWN_DURATION else duration)
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+
+def open_collection(ydl, url):
+    """Extract a collection without resolving its entries, which stay a lazily paged iterable."""
+    info = ydl.extract_info(url, download=False, process=False)
+    # Channel URLs redirect to their uploads tab
+    while info and info.get('_type') in ('url', 'url_transparent'):
+        info = ydl.extract_info(info['url'], download=False, process=False, ie_key=info.get('ie_key'))
+    return info
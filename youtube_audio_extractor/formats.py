@@ -4,23 +4,45 @@ Contains functions for listing and managing audio formats.
 """
 
 import click
-import yt_dlp
+
+from .session import get_pool
+
+# The format yt-dlp is asked for when no planner choice or explicit format is given
+DEFAULT_FORMAT = 'bestaudio[ext=m4a]/bestaudio[ext=mp3]/bestaudio'
+
+# How many MP3 kbps one kbps of each source codec is worth when transcoding.
+# Opus and AAC reach a given quality at a lower bitrate than MP3.
+CODEC_EFFICIENCY = {
+    'opus': 1.5,
+    'mp4a': 1.3,
+    'aac': 1.3,
+    'vorbis': 1.3,
+    'mp3': 1.0,
+}
+
+# Relative efficiency of each output codec compared to MP3
+OUTPUT_EFFICIENCY = {
+    'mp3': 1.0,
+    'opus': 1.5,
+    'm4a': 1.3,
+}
+
+
+def filter_audio_formats(info):
+    """Return the audio-only formats from extracted video info."""
+    audio_formats = []
+    for fmt in info.get('formats') or []:
+        if fmt.get('acodec') != 'none' and fmt.get('vcodec') == 'none':
+            audio_formats.append(fmt)
+    return audio_formats
 
 
 def get_audio_formats(ydl_opts, url):
     """Get available audio formats for the video."""
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+        with get_pool().acquire(**ydl_opts) as ydl:
             info = ydl.extract_info(url, download=False)
-            formats = info.get('formats', [])
-
-            # Filter audio-only formats
-            audio_formats = []
-            for fmt in formats:
-                if fmt.get('acodec') != 'none' and fmt.get('vcodec') == 'none':
-                    audio_formats.append(fmt)
-
-            return audio_formats, info
+            return filter_audio_formats(info), info
     except Exception as e:
         click.echo(f"Error extracting video info: {e}")
         return None, None
@@ -55,3 +77,70 @@ def list_formats(url):
             filesize = f"{filesize / 1024 / 1024:.1f} MB"
 
         click.echo(f"ID: {format_id:>5} | Format: {ext:>4} | Size: {filesize:>8}")
+
+
+def format_bitrate(fmt):
+    """Audio bitrate of a format in kbps, or None if yt-dlp doesn't know it."""
+    return fmt.get('abr') or fmt.get('tbr')
+
+
+def format_size(fmt, duration=None):
+    """Size of a format in bytes: exact, approximate, or estimated from bitrate and duration."""
+    size = fmt.get('filesize') or fmt.get('filesize_approx')
+    if not size and duration and format_bitrate(fmt):
+        size = format_bitrate(fmt) * 1000 / 8 * duration
+    return size
+
+
+def source_quality(fmt):
+    """MP3-equivalent quality of a source format in kbps."""
+    codec = (fmt.get('acodec') or '').split('.')[0].lower()
+    return format_bitrate(fmt) * CODEC_EFFICIENCY.get(codec, 1.0)
+
+
+def plan_source_format(audio_formats, output_formats, duration=None):
+    """Choose the smallest source audio format that still meets the requested output quality.
+
+    Returns (format_id, reason), or (None, reason) when the formats carry no
+    bitrate information and the default selection should be kept.
+    """
+    candidates = [fmt for fmt in audio_formats if format_bitrate(fmt) and fmt.get('format_id')]
+    if not candidates:
+        return None, 'no bitrate information for the available formats, keeping default selection'
+
+    # Stay on the original audio track when a video has dubbed tracks
+    top_language = max(fmt.get('language_preference') or 0 for fmt in candidates)
+    candidates = [fmt for fmt in candidates if (fmt.get('language_preference') or 0) == top_language]
+
+    # Avoid dynamic-range-compressed variants unless they are all there is
+    if any(not fmt.get('has_drc') for fmt in candidates):
+        candidates = [fmt for fmt in candidates if not fmt.get('has_drc')]
+
+    # The most demanding output decides what the source must provide
+    required = max(int(f.bitrate) * OUTPUT_EFFICIENCY.get(f.codec, 1.0) for f in output_formats)
+
+    def size_key(fmt):
+        return format_size(fmt, duration) or format_bitrate(fmt) * 1e9
+
+    sufficient = [fmt for fmt in candidates if source_quality(fmt) >= required]
+    if sufficient:
+        chosen = min(sufficient, key=size_key)
+        reason = f'smallest source meeting {required:.0f} kbps MP3-equivalent'
+    else:
+        chosen = max(candidates, key=source_quality)
+        reason = f'no source meets {required:.0f} kbps MP3-equivalent, using the best available'
+
+    description = f"{chosen['format_id']} ({chosen.get('acodec', '?')}, {format_bitrate(chosen):.0f} kbps"
+    size = format_size(chosen, duration)
+    if size:
+        description += f", ~{size / 1024 / 1024:.1f} MB"
+    description += ')'
+
+    # Compare against what the default format string would have fetched
+    default_pool = [fmt for fmt in candidates if fmt.get('ext') == 'm4a'] or candidates
+    default = max(default_pool, key=format_bitrate)
+    default_size = format_size(default, duration)
+    if default is not chosen and size and default_size:
+        reason += f"; default selection {default['format_id']} would be ~{default_size / 1024 / 1024:.1f} MB"
+
+    return chosen['format_id'], f'{description}: {reason}'
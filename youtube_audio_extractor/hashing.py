@@ -0,0 +1,36 @@
+"""
+File hashing for YouTube Audio Extractor.
+Content hashes identify files across runs (split manifests, caches); a
+hash recorded with the file's size and modification time is trusted again
+as long as neither changed, so unchanged files are not re-read.
+"""
+
+import hashlib
+import os
+
+HASH_ALGORITHM = 'sha256'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def file_digest(path, algorithm=HASH_ALGORITHM, chunk_size=HASH_CHUNK_SIZE):
+    """Hex digest of a file's content, read in fixed-size chunks."""
+    digest = hashlib.new(algorithm)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path, known=None):
+    """{'size', 'mtime_ns', 'sha256'} of a file.
+
+    ``known`` is a fingerprint recorded earlier for the same path; its hash
+    is reused if size and modification time are unchanged.
+    """
+    stat = os.stat(path)
+    if known and known.get('size') == stat.st_size and known.get('mtime_ns') == stat.st_mtime_ns \
+            and known.get(HASH_ALGORITHM):
+        digest = known[HASH_ALGORITHM]
+    else:
+        digest = file_digest(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, HASH_ALGORITHM: digest}
@@ -0,0 +1,204 @@
+"""
+Deduplicated library storage for YouTube Audio Extractor.
+Finished audio files are kept once in a content-addressed blob store under
+downloads/.store/, and every place they appear in the library (the same
+video in several playlists, for instance) is a hardlink to the blob, or a
+symlink where a hardlink is not possible. The store also remembers which
+video and output format each blob came from, so a video that is already in
+the library is linked into a new place instead of being downloaded again.
+Files are shared, not copied: edit a library file's tags in place and every
+link to it changes.
+"""
+
+import os
+import shutil
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .encoding import output_label
+from .hashing import file_digest
+from .manifests import read_json, write_json_atomic
+
+STORE_DIR = Path('downloads') / '.store'
+INDEX_FILENAME = 'index.json'
+
+# Audio files considered by dedupe_library
+LIBRARY_EXTENSIONS = ('.mp3', '.m4a', '.opus')
+
+
+class BlobStore:
+    """Content-addressed files (objects/<first two hex digits>/<sha256><ext>) plus a video index."""
+
+    def __init__(self, directory=STORE_DIR):
+        self.directory = Path(directory)
+        self._lock = threading.RLock()
+        self._index = None
+
+    def _load(self):
+        if self._index is None:
+            index = read_json(self.directory / INDEX_FILENAME, {})
+            self._index = {'videos': index.get('videos', {}), 'symlinked': set(index.get('symlinked', []))}
+        return self._index
+
+    def _save(self):
+        index = self._load()
+        write_json_atomic(self.directory / INDEX_FILENAME, {
+            'videos': index['videos'],
+            'symlinked': sorted(index['symlinked']),
+        })
+
+    def blob_path(self, digest, extension):
+        return self.directory / 'objects' / digest[:2] / (digest + extension)
+
+    def _link(self, blob, destination):
+        """Replace destination with a hardlink to blob (a symlink if that fails)."""
+        staging = destination.with_name(f".{destination.name}.linking")
+        try:
+            staging.unlink()
+        except FileNotFoundError:
+            pass
+        try:
+            os.link(blob, staging)
+        except OSError:
+            staging.symlink_to(blob.resolve())
+            self._load()['symlinked'].add(blob.stem)
+        os.replace(staging, destination)
+
+    def add(self, path, digest=None):
+        """Keep a file's content in the store and leave a link in its place.
+
+        If the store already holds the same content, the file is replaced by a
+        link to it. Returns (digest, bytes reclaimed).
+        """
+        path = Path(path)
+        digest = digest or file_digest(path)
+        blob = self.blob_path(digest, path.suffix)
+        with self._lock:
+            if blob.exists():
+                if os.path.samefile(blob, path):
+                    return digest, 0
+                size = path.stat().st_size
+                self._link(blob, path)
+                self._save()
+                return digest, size
+
+            blob.parent.mkdir(parents=True, exist_ok=True)
+            try:
+                os.link(path, blob)
+            except OSError:
+                # The store is on another file system: move the file in and point a symlink at it
+                shutil.move(str(path), blob)
+                path.symlink_to(blob.resolve())
+                self._load()['symlinked'].add(digest)
+                self._save()
+            return digest, 0
+
+    def remember(self, video_id, output_format, path):
+        """Add a finished output of a video to the store and record where it came from."""
+        digest, _ = self.add(path)
+        with self._lock:
+            self._load()['videos'].setdefault(video_id, {})[output_label(output_format)] = {
+                'digest': digest,
+                'name': Path(path).name,
+            }
+            self._save()
+
+    def has(self, video_id, output_format):
+        """Whether the store holds this output of the video."""
+        with self._lock:
+            entry = self._load()['videos'].get(video_id, {}).get(output_label(output_format))
+            return entry is not None and self.blob_path(entry['digest'], Path(entry['name']).suffix).exists()
+
+    def recall(self, video_id, output_format, target_dir):
+        """Link the stored output of a video into target_dir; returns its path, or None if not stored."""
+        with self._lock:
+            entry = self._load()['videos'].get(video_id, {}).get(output_label(output_format))
+            if entry is None:
+                return None
+            destination = Path(target_dir) / entry['name']
+            blob = self.blob_path(entry['digest'], destination.suffix)
+            if not blob.exists():
+                return None
+            destination.parent.mkdir(parents=True, exist_ok=True)
+            if not (destination.exists() and os.path.samefile(blob, destination)):
+                self._link(blob, destination)
+                self._save()
+            return destination
+
+    def prune(self):
+        """Remove blobs no library file links to any more; returns (blobs removed, bytes freed)."""
+        removed = freed = 0
+        with self._lock:
+            symlinked = self._load()['symlinked']
+            for blob in (self.directory / 'objects').glob('*/*'):
+                # Symlinked blobs have no link count to go by, so they are kept
+                if blob.stem in symlinked or blob.stat().st_nlink > 1:
+                    continue
+                freed += blob.stat().st_size
+                blob.unlink()
+                removed += 1
+        return removed, freed
+
+
+def library_files(root):
+    """Audio files under root, skipping symlinks and hidden files and directories (the store itself)."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+        for name in filenames:
+            path = Path(dirpath) / name
+            if not name.startswith('.') and path.suffix.lower() in LIBRARY_EXTENSIONS and not path.is_symlink():
+                yield path
+
+
+def dedupe_library(root='downloads', workers=None, dry_run=False, store=None):
+    """Replace duplicate audio files under root by links to one copy in the blob store.
+
+    Only files whose size matches another file's are hashed (on ``workers``
+    threads); files that are already links to the same data count once.
+    Returns a summary dict.
+    """
+    store = store or get_blob_store()
+    by_size = defaultdict(dict)
+    scanned = 0
+    for path in library_files(root):
+        stat = path.stat()
+        scanned += 1
+        by_size[stat.st_size].setdefault((stat.st_dev, stat.st_ino), path)
+
+    # One path per distinct file; sizes seen only once cannot have duplicates
+    candidates = [path for files in by_size.values() if len(files) > 1 for path in files.values()]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        digests = dict(zip(candidates, executor.map(file_digest, candidates)))
+
+    by_digest = defaultdict(list)
+    for path, digest in digests.items():
+        by_digest[digest].append(path)
+
+    duplicates = reclaimed = 0
+    for digest, paths in by_digest.items():
+        if len(paths) < 2:
+            continue
+        duplicates += len(paths) - 1
+        if dry_run:
+            reclaimed += sum(path.stat().st_size for path in paths[1:])
+            continue
+        for path in paths:
+            reclaimed += store.add(path, digest)[1]
+
+    return {
+        'scanned': scanned,
+        'hashed': len(candidates),
+        'duplicates': duplicates,
+        'reclaimed': reclaimed,
+        'dry_run': dry_run,
+    }
+
+
+_blob_store = BlobStore()
+
+
+def get_blob_store():
+    """Return the process-wide blob store."""
+    return _blob_store
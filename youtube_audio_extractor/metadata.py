@@ -0,0 +1,167 @@
+"""
+Video metadata prefetching for YouTube Audio Extractor.
+Resolves full yt-dlp info for many videos concurrently, with a bounded
+number of workers, a minimum gap between requests and a shared cache.
+"""
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .session import get_pool
+
+DEFAULT_PREFETCH_WORKERS = 4
+
+# Minimum seconds between two metadata requests, across all workers
+DEFAULT_MIN_INTERVAL = 0.2
+
+# Videos whose metadata is kept resolved ahead of the playlist downloader
+DEFAULT_LOOKAHEAD = 2
+
+# Stream URLs in the info expire after a few hours, so cached info must not outlive that
+CACHE_TTL = 30 * 60
+CACHE_MAX_ENTRIES = 128
+
+
+class MetadataCache:
+    """A small thread-safe LRU cache of extracted info dicts, keyed by URL."""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES, ttl=CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        with self._lock:
+            cached = self._entries.get(url)
+            if cached is None:
+                return None
+            stored, info = cached
+            if time.monotonic() - stored > self.ttl:
+                del self._entries[url]
+                return None
+            self._entries.move_to_end(url)
+            return info
+
+    def put(self, url, info):
+        with self._lock:
+            self._entries[url] = (time.monotonic(), info)
+            self._entries.move_to_end(url)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_metadata_cache = MetadataCache()
+
+
+def get_metadata_cache():
+    """Return the process-wide metadata cache."""
+    return _metadata_cache
+
+
+class MetadataPrefetcher:
+    """Resolves full info for videos on a bounded pool of workers."""
+
+    def __init__(self, workers=DEFAULT_PREFETCH_WORKERS, min_interval=DEFAULT_MIN_INTERVAL, cache=None):
+        self.workers = max(1, workers)
+        self.min_interval = min_interval
+        self.cache = get_metadata_cache() if cache is None else cache
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='metadata')
+        self._throttle_lock = threading.Lock()
+        self._next_request = 0.0
+        self._pending = set()
+
+    def _throttle(self):
+        with self._throttle_lock:
+            now = time.monotonic()
+            wait = self._next_request - now
+            self._next_request = max(now, self._next_request) + self.min_interval
+        if wait > 0:
+            time.sleep(wait)
+
+    def fetch(self, url):
+        """Full info for one video, from the cache when possible."""
+        info = self.cache.get(url)
+        if info is not None:
+            return info
+
+        self._throttle()
+        with get_pool().acquire(quiet=True, no_warnings=True) as ydl:
+            info = ydl.extract_info(url, download=False)
+        self.cache.put(url, info)
+        return info
+
+    def submit(self, url):
+        future = self._executor.submit(self.fetch, url)
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        return future
+
+    def resolve(self, urls):
+        """Fetch info for every URL, yielding (index, url, info, error) as each one completes."""
+        futures = {self.submit(url): (index, url) for index, url in enumerate(urls)}
+        for future in as_completed(futures):
+            index, url = futures[future]
+            try:
+                yield index, url, future.result(), None
+            except Exception as e:
+                # One video failing to resolve must not end the others
+                yield index, url, None, e
+
+    def lookahead(self, urls, ahead=DEFAULT_LOOKAHEAD):
+        return Lookahead(self, urls, ahead)
+
+    def close(self):
+        # Requests that have not started yet are dropped rather than run for nobody
+        for future in list(self._pending):
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Lookahead:
+    """Keeps the info of the next ``ahead`` videos resolving while the current ones download.
+
+    ``urls`` is the order the videos will be downloaded in; ``get`` may be
+    called from several download threads.
+    """
+
+    def __init__(self, prefetcher, urls, ahead=DEFAULT_LOOKAHEAD):
+        self.prefetcher = prefetcher
+        self.urls = [url for url in urls if url]
+        self.ahead = ahead
+        self._positions = {url: position for position, url in reversed(list(enumerate(self.urls)))}
+        self._futures = {}
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        """Info for ``url`` (waiting for it if needed), or None if it could not be resolved."""
+        with self._lock:
+            position = self._positions.get(url)
+            if position is None:
+                return None
+
+            for upcoming in self.urls[position:position + self.ahead + 1]:
+                if upcoming not in self._futures:
+                    self._futures[upcoming] = self.prefetcher.submit(upcoming)
+
+            # Taken results are replaced by None, so they are not fetched again
+            future = self._futures[url]
+            self._futures[url] = None
+
+        if future is None:
+            return None
+        try:
+            # A private copy: downloading annotates the info dict in place
+            return copy.deepcopy(future.result())
+        except Exception:
+            # Failed or cancelled: the downloader extracts again and reports the error itself
+            return None
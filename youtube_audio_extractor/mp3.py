@@ -0,0 +1,81 @@
+"""
+MP3 frame parsing for YouTube Audio Extractor.
+Contains helpers for walking the frame headers of MPEG audio Layer III files.
+"""
+
+# Bitrates in kbps, indexed by [is_mpeg1][bitrate_index]
+BITRATES = {
+    True: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 0],
+    False: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160, 0],
+}
+
+# Sample rates in Hz, indexed by [version_bits][sample_rate_index]
+SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG-1
+    2: [22050, 24000, 16000],  # MPEG-2
+    0: [11025, 12000, 8000],   # MPEG-2.5
+}
+
+
+def parse_frame_header(header):
+    """Parse a 4-byte Layer III frame header into (frame_length, samples, sample_rate), or None."""
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+
+    version_bits = (header[1] >> 3) & 0x03
+    layer_bits = (header[1] >> 1) & 0x03
+    bitrate_index = (header[2] >> 4) & 0x0F
+    sample_rate_index = (header[2] >> 2) & 0x03
+    padding = (header[2] >> 1) & 0x01
+
+    if version_bits == 1 or layer_bits != 1 or sample_rate_index == 3:
+        return None
+
+    is_mpeg1 = version_bits == 3
+    bitrate = BITRATES[is_mpeg1][bitrate_index] * 1000
+    if not bitrate:
+        return None
+
+    sample_rate = SAMPLE_RATES[version_bits][sample_rate_index]
+    samples = 1152 if is_mpeg1 else 576
+    frame_length = (samples // 8) * bitrate // sample_rate + padding
+
+    return frame_length, samples, sample_rate
+
+
+def id3v2_size(data):
+    """Return the size of a leading ID3v2 tag in data, or 0 if there is none."""
+    if len(data) < 10 or data[:3] != b'ID3':
+        return 0
+
+    size = 0
+    for byte in data[6:10]:
+        size = (size << 7) | (byte & 0x7F)
+
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def iter_frames(f):
+    """Yield (offset, frame_length, samples, sample_rate) for each frame in a binary MP3 file object."""
+    f.seek(0)
+    offset = id3v2_size(f.read(10))
+    f.seek(offset)
+
+    while True:
+        header = f.read(4)
+        if len(header) < 4:
+            break
+
+        parsed = parse_frame_header(header)
+        if not parsed:
+            # Resynchronise on the next frame sync word
+            offset += 1
+            f.seek(offset)
+            continue
+
+        frame_length, samples, sample_rate = parsed
+        yield offset, frame_length, samples, sample_rate
+
+        offset += frame_length
+        f.seek(offset)
@@ -4,13 +4,38 @@ Handles downloading entire playlists with optional chapter splitting.
 """
 
 import os
+import threading
 import click
-import yt_dlp
 from pathlib import Path
 from urllib.parse import urlparse
-from .core import validate_youtube_url
-from .chapters import has_chapters, get_video_chapters, split_audio_by_chapters
-from .splitting import split_audio_file
+from .core import (validate_youtube_url, encode_downloads, apply_format_plan, recall_outputs, remember_outputs,
+                   reserve_storage, touch_outputs)
+from .formats import DEFAULT_FORMAT
+from .encoding import output_formats, describe_output_formats
+from .chapters import get_video_chapters, split_audio_by_chapters
+from .virtual_chapters import write_chapter_index
+from .chapter_sources import video_id_from_url
+from .splitting import DEFAULT_MAX_SIZE_MB, split_audio_file
+from .session import get_pool, merge_options
+from .bandwidth import get_governor
+from .priority import get_scheduler
+from .storage import BULK_WAIT
+from .catalog import get_catalog, output_files
+from .staging import get_staging_area
+from .checkpoints import PlaylistCheckpoint, entry_id
+from .entries import PlaylistEntries, open_collection
+from .metadata import MetadataPrefetcher, DEFAULT_LOOKAHEAD, DEFAULT_PREFETCH_WORKERS
+from .scheduling import DEFAULT_SCHEDULE, SCHEDULING_POLICIES, order_jobs
+from .concurrency import AdaptiveConcurrency, MAX_ADAPTIVE_WORKERS, run_jobs
+from .reporting import echo_update
+
+# Collection entries listed per run
+PLAYLIST_ITEM_LIMIT = 50
+
+SCHEDULE_DESCRIPTIONS = {
+    'fifo': 'in playlist order',
+    'lpt': 'longest videos first',
+}
 
 
 def validate_playlist_url(url):
@@ -26,7 +51,10 @@ def validate_playlist_url(url):
 
 
 def get_playlist_info(url):
-    """Get information about a YouTube playlist, channel, or search results."""
+    """Get information about a YouTube playlist, channel, or search results.
+
+    Returns (title, PlaylistEntries), or (None, None) on failure.
+    """
     if not validate_playlist_url(url):
         click.echo("❌ Invalid YouTube URL provided!")
         return None, None
@@ -35,29 +63,23 @@ def get_playlist_info(url):
         'quiet': True,
         'no_warnings': True,
         'extract_flat': True,  # Don't download, just get info
-        'playlist_items': '1-50',  # Limit to first 50 items for testing
     }
 
     try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=False)
+        with get_pool().acquire(**ydl_opts) as ydl:
+            info = open_collection(ydl, url)
 
             if not info:
                 click.echo("❌ Could not extract information from URL")
                 return None, None
 
             # Handle different types of URLs
-            if 'entries' in info and info['entries']:
+            if info.get('entries') is not None:
                 # This is a playlist, channel, or search result
                 title = info.get('title', 'Unknown Collection')
-                entries = info.get('entries', [])
-
-                if not entries:
-                    click.echo("❌ No videos found")
-                    return None, None
 
-                # Filter out None entries (failed extractions)
-                valid_entries = [entry for entry in entries if entry is not None]
+                # Only the fields we use are kept; failed extractions (None entries) are dropped
+                valid_entries = PlaylistEntries.from_infos(info['entries'], limit=PLAYLIST_ITEM_LIMIT)
 
                 if not valid_entries:
                     click.echo("❌ No valid videos found")
@@ -77,89 +99,50 @@ def get_playlist_info(url):
         return None, None
 
 
-def download_playlist(url, output_dir="downloads", quality="best", bitrate="192",
-                      split_large_files=False, split_by_chapters=False,
-                      start_index=1, end_index=None):
-    """Download entire YouTube playlist, channel, or search results."""
-    if not validate_playlist_url(url):
-        click.echo("❌ Invalid YouTube URL provided!")
-        return False
-
-    # Get playlist information
-    playlist_title, entries = get_playlist_info(url)
-    if not playlist_title or not entries:
-        return False
-
-    # Ensure output directory is always within the downloads folder
+def playlist_output_dir(output_dir, playlist_title):
+    """Directory a collection is saved to, always within the downloads folder."""
     if output_dir == "downloads":
         final_output_dir = "downloads"
     else:
         # Create a clean subfolder name and place it in downloads/
-        clean_dir_name = clean_directory_name(output_dir)
-        final_output_dir = Path("downloads") / clean_dir_name
-
-    # Create playlist output directory within the downloads folder
-    playlist_dir = Path(final_output_dir) / clean_filename(playlist_title)
-    playlist_dir.mkdir(parents=True, exist_ok=True)
-
-    click.echo(f"📁 Output directory: {playlist_dir}")
-    click.echo(f"🎚️  Audio quality: {bitrate} kbps")
-
-    if split_large_files:
-        click.echo("✂️  Large file splitting: Enabled (max 16MB per chunk)")
-
-    if split_by_chapters:
-        click.echo("📚  Chapter-based splitting: Enabled")
-
-    # Determine range of videos to download
-    total_videos = len(entries)
-    start_idx = max(1, start_index) - 1  # Convert to 0-based index
-    end_idx = min(total_videos, end_index) if end_index else total_videos
+        final_output_dir = Path("downloads") / clean_directory_name(output_dir)
 
-    videos_to_download = entries[start_idx:end_idx]
-    click.echo(f"🎯 Downloading videos {start_idx + 1} to {end_idx} of {total_videos}")
+    return Path(final_output_dir) / clean_filename(playlist_title)
 
-    # Download each video in the playlist
-    successful_downloads = 0
-    failed_downloads = 0
 
-    for i, entry in enumerate(videos_to_download, start=start_idx + 1):
-        video_url = entry.get('url')
-        video_title = entry.get('title', f'Video {i}')
-
-        if not video_url:
-            click.echo(f"❌ Skipping video {i}: No URL available")
-            failed_downloads += 1
-            continue
-
-        click.echo(f"\n🎵 [{i}/{end_idx}] Downloading: {video_title}")
-
-        # Create video-specific output directory
-        video_dir = playlist_dir / f"{i:02d}_{clean_filename(video_title)}"
-        video_dir.mkdir(exist_ok=True)
-
-        # Download the video
-        if download_playlist_video(video_url, str(video_dir), quality, bitrate,
-                                  split_large_files, split_by_chapters):
-            successful_downloads += 1
-            click.echo(f"✅ [{i}/{end_idx}] Successfully downloaded: {video_title}")
-        else:
-            failed_downloads += 1
-            click.echo(f"❌ [{i}/{end_idx}] Failed to download: {video_title}")
-
-    # Summary
-    click.echo("\n🎯 Download completed!")
-    click.echo(f"✅ Successful: {successful_downloads}")
-    click.echo(f"❌ Failed: {failed_downloads}")
-    click.echo(f"📁 All files saved to: {playlist_dir}")
-
-    return successful_downloads > 0
+def download_playlist(url, output_dir="downloads", quality="best", bitrate="192",
+                      split_large_files=False, split_by_chapters=False,
+                      start_index=1, end_index=None, codec="mp3", resume=False, workers=1,
+                      schedule=DEFAULT_SCHEDULE, adaptive=False, rate_limit=None, max_size_mb=DEFAULT_MAX_SIZE_MB,
+                      split_at_silence=False, virtual_chapters=False):
+    """Download entire YouTube playlist, channel, or search results."""
+    return download_playlist_with_progress(url, output_dir, quality, bitrate, split_large_files, split_by_chapters,
+                                           start_index, end_index, codec=codec, resume=resume, workers=workers,
+                                           schedule=schedule, adaptive=adaptive, rate_limit=rate_limit,
+                                           max_size_mb=max_size_mb, split_at_silence=split_at_silence,
+                                           virtual_chapters=virtual_chapters)
 
 
 def download_playlist_with_progress(url, output_dir="downloads", quality="best", bitrate="192",
                                   split_large_files=False, split_by_chapters=False,
-                                  start_index=1, end_index=None, progress_hook=None, download_id=None):
-    """Download entire YouTube playlist, channel, or search results with progress tracking."""
+                                  start_index=1, end_index=None, progress_hook=None, download_id=None, codec="mp3",
+                                  resume=False, workers=1, schedule=DEFAULT_SCHEDULE, adaptive=False,
+                                  rate_limit=None, max_size_mb=DEFAULT_MAX_SIZE_MB, split_at_silence=False,
+                                  virtual_chapters=False):
+    """Download entire YouTube playlist, channel, or search results with progress tracking.
+
+    ``bitrate`` and ``codec`` may each be a list to produce several outputs per video;
+    with ``split_large_files`` they are split into chunks of at most ``max_size_mb``,
+    cut in pauses with ``split_at_silence``. With ``virtual_chapters``, MP3 outputs
+    are indexed by chapter instead of split (see virtual_chapters.py).
+    Progress is checkpointed per video ID in the playlist directory; with ``resume``
+    completed videos are skipped and failed or interrupted ones are retried.
+    Up to ``workers`` videos are processed at once, dispatched in the order
+    chosen by ``schedule`` ('fifo' or 'lpt', see scheduling.py). With
+    ``adaptive`` the number of parallel videos starts at ``workers`` and then
+    follows measured throughput (see concurrency.py). Each video download
+    is capped at ``rate_limit`` bytes/s if given (see bandwidth.py).
+    """
     if not validate_playlist_url(url):
         if progress_hook:
             progress_hook({'status': 'error', 'message': 'Invalid YouTube URL provided!'})
@@ -167,35 +150,39 @@ def download_playlist_with_progress(url, output_dir="downloads", quality="best",
             click.echo("❌ Invalid YouTube URL provided!")
         return False
 
+    try:
+        formats = output_formats(bitrate, codec)
+        if schedule not in SCHEDULING_POLICIES:
+            raise ValueError(f"Unknown scheduling policy '{schedule}'")
+    except ValueError as e:
+        if progress_hook:
+            progress_hook({'status': 'error', 'message': str(e)})
+        else:
+            click.echo(f"❌ {e}")
+        return False
+
     # Get playlist information
     playlist_title, entries = get_playlist_info(url)
     if not playlist_title or not entries:
         return False
 
-    # Ensure output directory is always within the downloads folder
-    if output_dir == "downloads":
-        final_output_dir = "downloads"
-    else:
-        # Create a clean subfolder name and place it in downloads/
-        clean_dir_name = clean_directory_name(output_dir)
-        final_output_dir = Path("downloads") / clean_dir_name
-
     # Create playlist output directory within the downloads folder
-    playlist_dir = Path(final_output_dir) / clean_filename(playlist_title)
+    playlist_dir = playlist_output_dir(output_dir, playlist_title)
     playlist_dir.mkdir(parents=True, exist_ok=True)
+    checkpoint = PlaylistCheckpoint(playlist_dir, url, playlist_title, resume=resume)
 
     if progress_hook:
         progress_hook({'status': 'info', 'message': f'Output directory: {playlist_dir}'})
-        progress_hook({'status': 'info', 'message': f'Audio quality: {bitrate} kbps'})
+        progress_hook({'status': 'info', 'message': f'Audio quality: {describe_output_formats(formats)}'})
     else:
         click.echo(f"📁 Output directory: {playlist_dir}")
-        click.echo(f"🎚️  Audio quality: {bitrate} kbps")
+        click.echo(f"🎚️  Audio quality: {describe_output_formats(formats)}")
 
     if split_large_files:
         if progress_hook:
-            progress_hook({'status': 'info', 'message': 'Large file splitting: Enabled (max 16MB per chunk)'})
+            progress_hook({'status': 'info', 'message': f'Large file splitting: Enabled (max {max_size_mb:g}MB per chunk)'})
         else:
-            click.echo("✂️  Large file splitting: Enabled (max 16MB per chunk)")
+            click.echo(f"✂️  Large file splitting: Enabled (max {max_size_mb:g}MB per chunk)")
 
     if split_by_chapters:
         if progress_hook:
@@ -215,15 +202,33 @@ def download_playlist_with_progress(url, output_dir="downloads", quality="best",
     else:
         click.echo(f"🎯 Downloading videos {start_idx + 1} to {end_idx} of {total_videos}")
 
+    if resume:
+        counts = checkpoint.counts()
+        message = (f"Resuming: {counts['completed']} completed, "
+                   f"{counts['failed'] + counts['running']} to retry")
+        if progress_hook:
+            progress_hook({'status': 'info', 'message': message})
+        else:
+            click.echo(f"🔁 {message}")
+
     # Download each video in the playlist
     successful_downloads = 0
     failed_downloads = 0
+    skipped_downloads = 0
 
+    jobs = []
     for i, entry in enumerate(videos_to_download, start=start_idx + 1):
-        video_url = entry.get('url')
-        video_title = entry.get('title', f'Video {i}')
+        video_title = entry.title or f'Video {i}'
 
-        if not video_url:
+        if resume and checkpoint.is_completed(entry_id(entry)):
+            skipped_downloads += 1
+            if progress_hook:
+                progress_hook({'status': 'info', 'message': f'[{i}/{end_idx}] Already downloaded: {video_title}'})
+            else:
+                click.echo(f"⏭️  [{i}/{end_idx}] Already downloaded: {video_title}")
+            continue
+
+        if not entry.url:
             if progress_hook:
                 progress_hook({'status': 'warning', 'message': f'Skipping video {i}: No URL available'})
             else:
@@ -231,6 +236,37 @@ def download_playlist_with_progress(url, output_dir="downloads", quality="best",
             failed_downloads += 1
             continue
 
+        jobs.append((i, entry))
+
+    # Outputs keep their playlist number whatever order the videos run in
+    jobs = order_jobs(jobs, schedule)
+    if workers > 1 or schedule != DEFAULT_SCHEDULE or adaptive:
+        message = (f"Running {len(jobs)} videos on {'up to ' + str(MAX_ADAPTIVE_WORKERS) if adaptive else workers} "
+                   f"workers{' (adaptive)' if adaptive else ''}, {SCHEDULE_DESCRIPTIONS[schedule]}")
+        if progress_hook:
+            progress_hook({'status': 'info', 'message': message})
+        else:
+            click.echo(f"⚙️  {message}")
+
+    controller = None
+    if adaptive:
+        def report_decision(message, metrics):
+            if progress_hook:
+                progress_hook({'status': 'concurrency', 'message': message, **metrics})
+            else:
+                click.echo(f"🎛️  {message}")
+
+        controller = AdaptiveConcurrency(initial=workers, report=report_decision)
+
+    counters_lock = threading.Lock()
+
+    def download_entry(job):
+        nonlocal successful_downloads, failed_downloads
+        i, entry = job
+        video_url = entry.url
+        video_title = entry.title or f'Video {i}'
+        video_id = entry_id(entry)
+
         if progress_hook:
             progress_hook({
                 'status': 'downloading_video',
@@ -242,173 +278,214 @@ def download_playlist_with_progress(url, output_dir="downloads", quality="best",
         else:
             click.echo(f"\n🎵 [{i}/{end_idx}] Downloading: {video_title}")
 
-        # Create video-specific output directory
-        video_dir = playlist_dir / f"{i:02d}_{clean_filename(video_title)}"
+        # Create video-specific output directory (kept from an earlier run, so .part files are continued)
+        video_dir = checkpoint.video_dir(video_id, playlist_dir / f"{i:02d}_{clean_filename(video_title)}")
         video_dir.mkdir(exist_ok=True)
+        checkpoint.start(video_id, i, video_title, video_url, video_dir)
+
+        # Errors are collected in CLI mode too: the adaptive controller backs off on throttling
+        errors = []
+
+        def video_hook(d):
+            if d.get('status') == 'error':
+                errors.append(d.get('message'))
+            if progress_hook:
+                progress_hook(d)
+            else:
+                echo_update(d)
 
         # Download the video
-        if download_playlist_video_with_progress(video_url, str(video_dir), quality, bitrate,
-                                               split_large_files, split_by_chapters, progress_hook):
-            successful_downloads += 1
+        success = download_playlist_video_with_progress(video_url, str(video_dir), quality, formats,
+                                                        split_large_files, split_by_chapters, video_hook,
+                                                        info=lookahead.get(video_url),
+                                                        ydl_options=controller.ydl_options() if controller else None,
+                                                        rate_limit=rate_limit, max_size_mb=max_size_mb,
+                                                        split_at_silence=split_at_silence,
+                                                        virtual_chapters=virtual_chapters)
+        checkpoint.finish(video_id, success, errors[-1] if errors else None)
+        if controller:
+            controller.record_result(success, errors[-1] if errors else None)
+
+        with counters_lock:
+            if success:
+                successful_downloads += 1
+            else:
+                failed_downloads += 1
+            counts = successful_downloads, failed_downloads
+
+        if success:
             if progress_hook:
                 progress_hook({
                     'status': 'video_completed',
                     'message': f'[{i}/{end_idx}] Successfully downloaded: {video_title}',
                     'current_video': i,
                     'total_videos': end_idx,
-                    'successful_downloads': successful_downloads
+                    'successful_downloads': counts[0]
                 })
             else:
                 click.echo(f"✅ [{i}/{end_idx}] Successfully downloaded: {video_title}")
         else:
-            failed_downloads += 1
             if progress_hook:
                 progress_hook({
                     'status': 'video_failed',
                     'message': f'[{i}/{end_idx}] Failed to download: {video_title}',
                     'current_video': i,
                     'total_videos': end_idx,
-                    'failed_downloads': failed_downloads
+                    'failed_downloads': counts[1]
                 })
             else:
                 click.echo(f"❌ [{i}/{end_idx}] Failed to download: {video_title}")
 
+    # Resolve the next videos' metadata while the current ones download
+    with MetadataPrefetcher(workers=DEFAULT_LOOKAHEAD) as prefetcher:
+        lookahead = prefetcher.lookahead([entry.url for _, entry in jobs],
+                                         ahead=max(DEFAULT_LOOKAHEAD, MAX_ADAPTIVE_WORKERS if adaptive else workers))
+        # Jobs are started in order, so the schedule decides what starts next
+        run_jobs(download_entry, jobs, workers, controller)
+
     # Summary
     if progress_hook:
         progress_hook({
             'status': 'playlist_completed',
-            'message': f'Playlist download completed! Successful: {successful_downloads}, Failed: {failed_downloads}',
+            'message': f'Playlist download completed! Successful: {successful_downloads}, Failed: {failed_downloads}'
+                       + (f', Already downloaded: {skipped_downloads}' if skipped_downloads else ''),
             'successful_downloads': successful_downloads,
             'failed_downloads': failed_downloads,
-            'output_dir': str(playlist_dir)
+            'skipped_downloads': skipped_downloads,
+            'output_dir': str(playlist_dir),
+            'checkpoint': str(checkpoint.path),
+            **(controller.metrics() if controller else {})
         })
     else:
         click.echo("\n🎯 Download completed!")
         click.echo(f"✅ Successful: {successful_downloads}")
         click.echo(f"❌ Failed: {failed_downloads}")
+        if skipped_downloads:
+            click.echo(f"⏭️  Already downloaded: {skipped_downloads}")
         click.echo(f"📁 All files saved to: {playlist_dir}")
+        if failed_downloads:
+            click.echo("🔁 Run again with --resume to retry the failed videos")
 
-    return successful_downloads > 0
+    return successful_downloads + skipped_downloads > 0
 
 
-def download_playlist_video(url, output_dir, quality, bitrate, split_large_files, split_by_chapters):
+def download_playlist_video(url, output_dir, quality, bitrate, split_large_files, split_by_chapters, codec="mp3"):
     """Download a single video from a playlist."""
+    return download_playlist_video_with_progress(url, output_dir, quality, output_formats(bitrate, codec),
+                                                 split_large_files, split_by_chapters)
+
+
+def download_playlist_video_with_progress(url, output_dir, quality, formats, split_large_files, split_by_chapters,
+                                          progress_hook=None, info=None, ydl_options=None, rate_limit=None,
+                                          max_size_mb=DEFAULT_MAX_SIZE_MB, split_at_silence=False, virtual_chapters=False):
+    """Download a single video from a playlist with progress tracking.
+
+    ``formats`` is the list of OutputFormats to encode from the one download.
+    ``info`` is the video's already extracted metadata, if it was prefetched.
+    ``ydl_options`` are extra yt-dlp options for this download.
+    The video takes its worker, FFmpeg and bandwidth share in the bulk lane
+    (see priority.py and bandwidth.py), capped at ``rate_limit`` bytes/s if given.
+    Slots are held for this video only, so interactive jobs get in between entries.
+    A video already in the library store is linked instead of downloaded again.
+    Its predicted output size is reserved within the storage quota first,
+    waiting up to storage.BULK_WAIT seconds for room (see storage.py).
+    """
+    reservation = staging_job = None
     try:
-        # Configure yt-dlp options for this video
-        ydl_opts = {
-            'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
-            'format': 'bestaudio[ext=m4a]/bestaudio[ext=mp3]/bestaudio' if quality == "best" else quality,
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': bitrate,
-            }],
-            'quiet': True,  # Less verbose for playlist downloads
-            'no_warnings': True,
-        }
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-
-        # Find the downloaded MP3 file
-        mp3_files = list(Path(output_dir).glob("*.mp3"))
-        if not mp3_files:
-            return False
-
-        downloaded_file = mp3_files[-1]  # Get the most recent MP3 file
-        file_size_mb = downloaded_file.stat().st_size / (1024 * 1024)
-
-        # Handle chapter-based splitting first (if requested)
-        if split_by_chapters:
-            chapters, _ = get_video_chapters(url)
-            if chapters:
-                if split_audio_by_chapters(str(downloaded_file), output_dir, chapters, bitrate):
-                    # Remove original file after successful chapter splitting
-                    downloaded_file.unlink()
-                else:
-                    click.echo("⚠️  Chapter splitting failed for video")
-            else:
-                click.echo("ℹ️  No chapters found, keeping original file")
-
-        # Handle size-based splitting (if requested and not already handled by chapters)
-        elif split_large_files and file_size_mb > 16:
-            if split_audio_file(str(downloaded_file), output_dir, 16, bitrate):
-                # Remove original file after successful splitting
-                downloaded_file.unlink()
-            else:
-                click.echo("⚠️  File splitting failed for video")
-
-        return True
-
-    except Exception as e:
-        click.echo(f"❌ Error downloading video: {e}")
-        return False
-
-
-def download_playlist_video_with_progress(url, output_dir, quality, bitrate, split_large_files, split_by_chapters, progress_hook=None):
-    """Download a single video from a playlist with progress tracking."""
-    try:
-        # Configure yt-dlp options for this video
+        # Files are made in a staging directory of this job and published when finished
+        staging_job = get_staging_area().begin(url)
+        # Configure yt-dlp options for this video (encoding happens in encode_downloads)
         ydl_opts = {
             'outtmpl': os.path.join(output_dir, '%(title)s.%(ext)s'),
-            'format': 'bestaudio[ext=m4a]/bestaudio[ext=mp3]/bestaudio' if quality == "best" else quality,
-            'postprocessors': [{
-                'key': 'FFmpegExtractAudio',
-                'preferredcodec': 'mp3',
-                'preferredquality': bitrate,
-            }],
+            'format': DEFAULT_FORMAT if quality == "best" else quality,
             'quiet': True,  # Less verbose for playlist downloads
             'no_warnings': True,
+            'continuedl': True,  # Pick up .part files left by an interrupted run
         }
 
         # Add progress hook if provided
         if progress_hook:
             ydl_opts['progress_hooks'] = [progress_hook]
-
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            ydl.download([url])
-
-        # Find the downloaded MP3 file
-        mp3_files = list(Path(output_dir).glob("*.mp3"))
-        if not mp3_files:
-            return False
-
-        downloaded_file = mp3_files[-1]  # Get the most recent MP3 file
-        file_size_mb = downloaded_file.stat().st_size / (1024 * 1024)
-
-        # Handle chapter-based splitting first (if requested)
+        ydl_opts = merge_options(ydl_opts, ydl_options)
+
+        scheduler = get_scheduler()
+        # The same video from another playlist is linked from the library store
+        video_id = (info or {}).get('id') or video_id_from_url(url)
+        outputs = recall_outputs(video_id, formats, output_dir, progress_hook) if quality == "best" else None
+        if outputs is None:
+            with scheduler.slot('worker', 'bulk'), get_governor().job('bulk', rate_limit, name=url) as bandwidth, \
+                    get_pool().acquire(**merge_options(ydl_opts, bandwidth.ydl_options())) as ydl, \
+                    bandwidth.attach(ydl):
+                if info is None:
+                    info = ydl.extract_info(url, download=False)
+                if quality == "best":
+                    apply_format_plan(ydl, info, formats, progress_hook)
+                # Wait for room within the storage quota, or give up on this video
+                reservation = reserve_storage(info, formats, name=url, wait=BULK_WAIT)
+                info = ydl.process_ie_result(info, download=True)
+
+            with scheduler.slot('ffmpeg', 'bulk'):
+                outputs = encode_downloads(info, formats, progress_hook=progress_hook,
+                                           max_size_mb=max_size_mb if split_large_files and not split_by_chapters else None,
+                                           split_at_silence=split_at_silence)
+            if not outputs:
+                return False
+
+            if quality == "best":
+                remember_outputs(info.get('id'), outputs)
+
+        chapters = None
         if split_by_chapters:
-            chapters, _ = get_video_chapters(url)
-            if chapters:
-                if split_audio_by_chapters(str(downloaded_file), output_dir, chapters, bitrate):
-                    # Remove original file after successful chapter splitting
-                    downloaded_file.unlink()
-                    if progress_hook:
-                        progress_hook({'status': 'info', 'message': 'Chapter splitting completed for video'})
-                else:
-                    if progress_hook:
-                        progress_hook({'status': 'warning', 'message': 'Chapter splitting failed for video'})
-                    else:
-                        click.echo("⚠️  Chapter splitting failed for video")
-            else:
+            chapters, _ = get_video_chapters(url, info)
+            if not chapters:
                 if progress_hook:
                     progress_hook({'status': 'info', 'message': 'No chapters found, keeping original file'})
                 else:
                     click.echo("ℹ️  No chapters found, keeping original file")
 
-        # Handle size-based splitting (if requested and not already handled by chapters)
-        elif split_large_files and file_size_mb > 16:
-            if split_audio_file(str(downloaded_file), output_dir, 16, bitrate):
-                # Remove original file after successful splitting
-                downloaded_file.unlink()
-                if progress_hook:
-                    progress_hook({'status': 'info', 'message': 'File splitting completed for video'})
-            else:
-                if progress_hook:
-                    progress_hook({'status': 'warning', 'message': 'File splitting failed for video'})
-                else:
-                    click.echo("⚠️  File splitting failed for video")
-
+        with scheduler.slot('ffmpeg', 'bulk'):
+            for output_format, downloaded_file in outputs:
+                if downloaded_file.is_dir():
+                    continue  # already encoded straight into chunks
+                file_size_mb = downloaded_file.stat().st_size / (1024 * 1024)
+                file_dir = str(downloaded_file.parent)
+
+                # Handle chapter-based splitting first (if requested)
+                if split_by_chapters:
+                    if not chapters:
+                        continue
+                    if virtual_chapters and write_chapter_index(downloaded_file, chapters, downloaded_file.stem):
+                        if progress_hook:
+                            progress_hook({'status': 'info', 'message': 'Chapter index written for video'})
+                        continue
+                    if split_audio_by_chapters(str(downloaded_file), file_dir, chapters, output_format.bitrate):
+                        # Remove original file after successful chapter splitting
+                        downloaded_file.unlink()
+                        if progress_hook:
+                            progress_hook({'status': 'info', 'message': 'Chapter splitting completed for video'})
+                    else:
+                        if progress_hook:
+                            progress_hook({'status': 'warning', 'message': 'Chapter splitting failed for video'})
+                        else:
+                            click.echo("⚠️  Chapter splitting failed for video")
+
+                # Handle size-based splitting (if requested and not already handled by chapters)
+                elif split_large_files and file_size_mb > max_size_mb:
+                    if split_audio_file(str(downloaded_file), file_dir, max_size_mb, output_format.bitrate,
+                                        split_at_silence):
+                        # Remove original file after successful splitting
+                        downloaded_file.unlink()
+                        if progress_hook:
+                            progress_hook({'status': 'info', 'message': 'File splitting completed for video'})
+                    else:
+                        if progress_hook:
+                            progress_hook({'status': 'warning', 'message': 'File splitting failed for video'})
+                        else:
+                            click.echo("⚠️  File splitting failed for video")
+
+        touch_outputs(outputs)
+        get_catalog().record([file for _, path in outputs for file in output_files(path)],
+                             video_id=(info or {}).get('id') or video_id)
         return True
 
     except Exception as e:
@@ -417,6 +494,11 @@ def download_playlist_video_with_progress(url, output_dir, quality, bitrate, spl
         else:
             click.echo(f"❌ Error downloading video: {e}")
         return False
+    finally:
+        if reservation:
+            reservation.release()
+        if staging_job:
+            staging_job.close()
 
 
 def clean_filename(filename):
@@ -451,8 +533,12 @@ def clean_directory_name(name):
     return clean
 
 
-def list_playlist_videos(url):
-    """List all videos in a YouTube playlist, channel, or search results."""
+def list_playlist_videos(url, workers=DEFAULT_PREFETCH_WORKERS):
+    """List all videos in a YouTube playlist, channel, or search results.
+
+    Full metadata (for the chapter flag) is fetched for ``workers`` videos at a
+    time, and each row is printed as soon as its metadata arrives.
+    """
     playlist_title, entries = get_playlist_info(url)
 
     if not playlist_title or not entries:
@@ -463,9 +549,9 @@ def list_playlist_videos(url):
     click.echo("\n📺 Video List:")
     click.echo("-" * 80)
 
-    for i, entry in enumerate(entries, 1):
-        title = entry.get('title', f'Unknown Title {i}')
-        duration = entry.get('duration', 'Unknown')
+    def show_row(i, entry, info):
+        title = entry.title or f'Unknown Title {i}'
+        duration = entry.duration or (info or {}).get('duration', 'Unknown')
 
         # Handle duration formatting
         if duration != 'Unknown' and duration is not None:
@@ -481,7 +567,16 @@ def list_playlist_videos(url):
         click.echo(f"     Duration: {duration_str}")
 
         # Check if video has chapters
-        video_url = entry.get('url')
-        if video_url and has_chapters(video_url):
+        if info and info.get('chapters'):
             click.echo("     📚 Has chapters")
         click.echo()
+
+    with_url = [(i, entry) for i, entry in enumerate(entries, 1) if entry.url]
+    for i, entry in enumerate(entries, 1):
+        if not entry.url:
+            show_row(i, entry, None)
+
+    with MetadataPrefetcher(workers=workers) as prefetcher:
+        for index, _, info, _ in prefetcher.resolve([entry.url for _, entry in with_url]):
+            i, entry = with_url[index]
+            show_row(i, entry, info)
@@ -0,0 +1,160 @@
+"""
+Priority lanes for YouTube Audio Extractor.
+Download work and FFmpeg work each have a limited number of slots. Jobs in
+the interactive lane (single downloads from the UI) are granted a free slot
+before anything in the bulk lane (playlist and batch items), and one slot of
+each kind is kept for them. Bulk jobs take a slot per video, so a long
+playlist gives way to interactive jobs between entries. A bulk job that has
+waited longer than STARVATION_TIMEOUT goes first regardless.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from .bandwidth import LANES
+
+# Kinds of slots: 'worker' covers fetching a video, 'ffmpeg' encoding and splitting it
+RESOURCES = ('worker', 'ffmpeg')
+
+# Slots of each kind held back for the interactive lane
+INTERACTIVE_RESERVED = 1
+
+# Seconds a bulk job may wait before it is served ahead of interactive jobs
+STARVATION_TIMEOUT = 120.0
+
+
+class _Waiter:
+    __slots__ = ('granted', 'lane', 'since')
+
+    def __init__(self, lane):
+        self.lane = lane
+        self.since = time.monotonic()
+        self.granted = False
+
+
+class SlotPool:
+    """A fixed number of slots granted to waiting jobs by lane priority; ``capacity=None`` is unlimited."""
+
+    def __init__(self, name, capacity=None, reserved=INTERACTIVE_RESERVED, starvation_timeout=STARVATION_TIMEOUT):
+        self.name = name
+        self.capacity = capacity
+        self.reserved = reserved
+        self.starvation_timeout = starvation_timeout
+        self._cond = threading.Condition()
+        self._queues = {lane: deque() for lane in LANES}
+        self._running = {lane: 0 for lane in LANES}
+        self._stats = {lane: {'granted': 0, 'promoted': 0, 'wait_total': 0.0, 'max_wait': 0.0} for lane in LANES}
+
+    def configure(self, capacity=None, reserved=None):
+        with self._cond:
+            self.capacity = capacity
+            if reserved is not None:
+                self.reserved = reserved
+            self._dispatch()
+
+    @contextmanager
+    def slot(self, lane):
+        """Hold one slot for the duration of the block, waiting in ``lane``'s queue if none is free."""
+        if lane not in LANES:
+            raise ValueError(f"Unknown lane '{lane}' (choose from {', '.join(LANES)})")
+
+        waiter = _Waiter(lane)
+        with self._cond:
+            self._queues[lane].append(waiter)
+            self._dispatch()
+            try:
+                while not waiter.granted:
+                    # Wake up now and then so a starving bulk job is noticed without a release
+                    self._cond.wait(timeout=self.starvation_timeout / 4)
+                    self._dispatch()
+            except BaseException:
+                if waiter.granted:
+                    self._running[lane] -= 1
+                    self._dispatch()
+                else:
+                    self._queues[lane].remove(waiter)
+                raise
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._running[lane] -= 1
+                self._dispatch()
+
+    def _dispatch(self):
+        while True:
+            waiter = self._next_waiter()
+            if waiter is None:
+                return
+            self._queues[waiter.lane].popleft()
+            self._running[waiter.lane] += 1
+            waited = time.monotonic() - waiter.since
+            stats = self._stats[waiter.lane]
+            stats['granted'] += 1
+            stats['wait_total'] += waited
+            stats['max_wait'] = max(stats['max_wait'], waited)
+            waiter.granted = True
+            self._cond.notify_all()
+
+    def _next_waiter(self):
+        interactive, bulk = self._queues['interactive'], self._queues['bulk']
+        if self.capacity is None:
+            return (interactive or bulk or [None])[0]
+
+        free = self.capacity - sum(self._running.values())
+        if free <= 0:
+            return None
+        if bulk and time.monotonic() - bulk[0].since >= self.starvation_timeout:
+            self._stats['bulk']['promoted'] += 1
+            return bulk[0]
+        if interactive:
+            return interactive[0]
+        # Bulk jobs leave the reserved slots free for the next interactive job
+        reserved = min(self.reserved, self.capacity - 1)
+        if bulk and self._running['bulk'] < self.capacity - reserved:
+            return bulk[0]
+        return None
+
+    def status(self):
+        with self._cond:
+            lanes = {}
+            for lane in LANES:
+                stats = self._stats[lane]
+                lanes[lane] = {
+                    'queued': len(self._queues[lane]),
+                    'running': self._running[lane],
+                    'granted': stats['granted'],
+                    'starvation_promotions': stats['promoted'],
+                    'average_wait': stats['wait_total'] / stats['granted'] if stats['granted'] else 0.0,
+                    'max_wait': stats['max_wait'],
+                }
+            return {'capacity': self.capacity, 'reserved': self.reserved, 'lanes': lanes}
+
+
+class PriorityScheduler:
+    """The slot pools shared by all jobs in the process."""
+
+    def __init__(self):
+        self.pools = {resource: SlotPool(resource) for resource in RESOURCES}
+
+    def configure(self, worker_slots=None, ffmpeg_slots=None, reserved=None):
+        """Set how many jobs may fetch and encode at once (None for unlimited)."""
+        self.pools['worker'].configure(worker_slots, reserved)
+        self.pools['ffmpeg'].configure(ffmpeg_slots, reserved)
+
+    def slot(self, resource, lane):
+        return self.pools[resource].slot(lane)
+
+    def status(self):
+        """Capacity and per-lane queue metrics of every pool."""
+        return {resource: pool.status() for resource, pool in self.pools.items()}
+
+
+_scheduler = PriorityScheduler()
+
+
+def get_scheduler():
+    """Return the process-wide priority scheduler."""
+    return _scheduler
@@ -0,0 +1,106 @@
+"""
+Time-range selection for YouTube Audio Extractor.
+Turns --start/--end and --chapters selectors into yt-dlp download ranges,
+so that only the selected part of a video is fetched.
+"""
+
+import re
+
+from .chapters import clean_chapter_title
+
+
+def parse_timestamp(value):
+    """Parse '90', '1:30', '01:02:03.5' or a number into seconds."""
+    if isinstance(value, (int, float)):
+        seconds = float(value)
+    else:
+        parts = str(value).strip().split(':')
+        if len(parts) > 3 or not all(re.fullmatch(r'\d+(\.\d+)?', part) for part in parts):
+            raise ValueError(f"Invalid time '{value}' (use seconds, MM:SS or HH:MM:SS)")
+        seconds = 0.0
+        for part in parts:
+            seconds = seconds * 60 + float(part)
+
+    if seconds < 0:
+        raise ValueError(f"Invalid time '{value}' (must not be negative)")
+    return seconds
+
+
+def parse_chapter_selection(value):
+    """Parse a chapter selection such as '3,5-7' (or a list of numbers) into sorted chapter numbers."""
+    if isinstance(value, (list, tuple)):
+        items = [str(item) for item in value]
+    else:
+        items = str(value).split(',')
+
+    numbers = set()
+    for item in items:
+        item = item.strip()
+        match = re.fullmatch(r'(\d+)(?:-(\d+))?', item)
+        if not match:
+            raise ValueError(f"Invalid chapter selection '{item}' (use e.g. 3,5-7)")
+        first = int(match.group(1))
+        last = int(match.group(2) or first)
+        if first < 1 or last < first:
+            raise ValueError(f"Invalid chapter range '{item}'")
+        numbers.update(range(first, last + 1))
+
+    return sorted(numbers)
+
+
+def format_offset(seconds):
+    """Filename-safe rendering of a position in the video, e.g. '1h05m30s'."""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h{minutes:02d}m{secs:02d}s"
+    return f"{minutes}m{secs:02d}s"
+
+
+def select_sections(info, start_time=None, end_time=None, chapter_numbers=None):
+    """Build the yt-dlp download ranges for the selected part of a video.
+
+    Returns a list of {'start_time', 'end_time', 'title', 'index'} dicts, one per
+    output part, or an empty list when the whole video is wanted. The 'title'
+    becomes the part's filename suffix. Raises ValueError for an invalid selection.
+    """
+    duration = info.get('duration')
+
+    if chapter_numbers:
+        chapters = info.get('chapters') or []
+        if not chapters:
+            raise ValueError("This video has no chapters to select from")
+
+        missing = [number for number in chapter_numbers if number > len(chapters)]
+        if missing:
+            raise ValueError(f"Chapter {missing[0]} not found; the video has {len(chapters)} chapters")
+
+        sections = []
+        for number in chapter_numbers:
+            chapter = chapters[number - 1]
+            title = clean_chapter_title(chapter.get('title') or f'Chapter {number}')
+            sections.append({
+                'start_time': chapter.get('start_time', 0),
+                'end_time': chapter.get('end_time') or duration,
+                'title': f"chapter{number:02d}_{title}",
+                'index': number,
+            })
+        return sections
+
+    if start_time is None and end_time is None:
+        return []
+
+    start = start_time or 0
+    end = end_time if end_time is not None else duration
+    if duration is not None and start >= duration:
+        raise ValueError(f"Start time {format_offset(start)} is beyond the end of the video")
+    if end is not None and end <= start:
+        raise ValueError("End time must be after start time")
+
+    return [{
+        'start_time': start,
+        'end_time': end if end is not None else float('inf'),
+        'title': f"{format_offset(start)}-{format_offset(end) if end is not None else 'end'}",
+        'index': 1,
+    }]
@@ -0,0 +1,24 @@
+"""
+Status reporting helpers for YouTube Audio Extractor.
+Routes messages to a web progress hook when one is given, or to the console otherwise.
+"""
+
+import click
+
+
+def report(progress_hook, status, message, cli_message=None):
+    """Send a status update to the progress hook, or echo it in CLI mode."""
+    if progress_hook:
+        progress_hook({'status': status, 'message': message})
+    else:
+        click.echo(cli_message or message)
+
+
+# Console prefix of a progress hook update, by status
+STATUS_ICONS = {'error': '❌', 'warning': '⚠️ ', 'info': 'ℹ️ ', 'success': '✅', 'processing': '🔧'}
+
+
+def echo_update(d):
+    """Echo a progress hook update in CLI mode, for callers that need a hook of their own either way."""
+    if d.get('message'):
+        click.echo(f"{STATUS_ICONS.get(d.get('status'), 'ℹ️ ')} {d['message']}")
@@ -0,0 +1,39 @@
+"""
+Job scheduling for YouTube Audio Extractor.
+Orders the videos of a parallel playlist run. Processing time grows with a
+video's duration, so starting the longest videos first (LPT) avoids one
+long video at the end of the list keeping a worker busy while the rest idle.
+"""
+
+import heapq
+
+# 'fifo': playlist order; 'lpt': longest processing time first
+SCHEDULING_POLICIES = ('fifo', 'lpt')
+DEFAULT_SCHEDULE = 'fifo'
+
+
+def order_jobs(jobs, policy=DEFAULT_SCHEDULE, duration=lambda job: job[1].duration):
+    """Return ``jobs`` in the order they should be dispatched under ``policy``.
+
+    For 'lpt', jobs without a known duration are treated as average length.
+    Sorting is stable, so equally long jobs keep their playlist order.
+    """
+    if policy not in SCHEDULING_POLICIES:
+        raise ValueError(f"Unknown scheduling policy '{policy}' (choose from {', '.join(SCHEDULING_POLICIES)})")
+
+    jobs = list(jobs)
+    if policy == 'fifo':
+        return jobs
+
+    known = [duration(job) for job in jobs if duration(job)]
+    average = sum(known) / len(known) if known else 0
+    return sorted(jobs, key=lambda job: duration(job) or average, reverse=True)
+
+
+def simulate_makespan(durations, workers):
+    """Total run time when jobs of the given lengths are dispatched in order to ``workers`` workers."""
+    finish_times = [0.0] * max(1, workers)
+    for length in durations:
+        # Each job goes to the worker that becomes free first
+        heapq.heapreplace(finish_times, finish_times[0] + length)
+    return max(finish_times)
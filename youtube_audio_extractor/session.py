@@ -0,0 +1,133 @@
+"""
+Shared yt-dlp sessions for YouTube Audio Extractor.
+Keeps warm YoutubeDL instances (connection pools, cookies, TLS sessions and
+extractor caches) alive across videos instead of building a new one per call.
+"""
+
+import threading
+from contextlib import contextmanager
+
+import yt_dlp
+
+# Options every pooled instance starts from; callers override per use
+BASE_OPTIONS = {
+    'quiet': True,
+    'no_warnings': True,
+}
+
+# Idle instances kept around for reuse; extra ones are closed when released
+MAX_IDLE = 8
+
+
+class YoutubeDLPool:
+    """A thread-safe pool of reusable YoutubeDL instances.
+
+    Each instance is used by one thread at a time. All instances share a
+    single cookie jar, and per-use options are applied to the instance's
+    params for the duration of ``acquire`` and then restored.
+    """
+
+    def __init__(self, base_options=None, max_idle=MAX_IDLE):
+        self.base_options = dict(BASE_OPTIONS if base_options is None else base_options)
+        self.max_idle = max_idle
+        self._idle = []
+        self._lock = threading.Lock()
+        self._cookiejar = None
+        self.created = 0
+        self.reused = 0
+
+    def _checkout(self):
+        with self._lock:
+            if self._idle:
+                self.reused += 1
+                # Most recently used first: its connections are the warmest
+                return self._idle.pop()
+            self.created += 1
+
+        ydl = yt_dlp.YoutubeDL(dict(self.base_options))
+        with self._lock:
+            if self._cookiejar is None:
+                self._cookiejar = ydl.cookiejar
+            else:
+                ydl.cookiejar = self._cookiejar
+        return ydl
+
+    def _checkin(self, ydl):
+        with self._lock:
+            if len(self._idle) < self.max_idle:
+                self._idle.append(ydl)
+                return
+        ydl.close()
+
+    @contextmanager
+    def acquire(self, **overrides):
+        """Borrow an instance with ``overrides`` applied to its options.
+
+        Supports any YoutubeDL option that is read at use time, plus
+        'format', 'outtmpl' and 'progress_hooks', which are rebuilt here.
+        """
+        ydl = self._checkout()
+        saved_params = dict(ydl.params)
+        saved_selector = ydl.format_selector
+        saved_hooks = list(ydl._progress_hooks)
+
+        try:
+            apply_options(ydl, overrides)
+            yield ydl
+        finally:
+            # Restore in place: downloaders hold a reference to this params dict
+            ydl.params.clear()
+            ydl.params.update(saved_params)
+            ydl.format_selector = saved_selector
+            ydl._progress_hooks[:] = saved_hooks
+            self._checkin(ydl)
+
+    def close(self):
+        """Close all idle instances."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for ydl in idle:
+            ydl.close()
+
+
+def apply_options(ydl, options):
+    """Apply YoutubeDL options to an already-built instance."""
+    for key, value in options.items():
+        if key == 'progress_hooks':
+            ydl._progress_hooks[:] = []
+            for hook in value or []:
+                ydl.add_progress_hook(hook)
+        elif key == 'format':
+            ydl.params['format'] = value
+            ydl.format_selector = (value if value in (None, '-') or callable(value)
+                                   else ydl.build_format_selector(value))
+        elif key == 'outtmpl':
+            templates = dict(ydl.params.get('outtmpl') or {})
+            templates.update(value if isinstance(value, dict) else {'default': value})
+            ydl.params['outtmpl'] = templates
+        else:
+            ydl.params[key] = value
+
+
+def merge_options(options, extra=None):
+    """Combine two sets of YoutubeDL options, keeping the progress hooks of both."""
+    merged = dict(options)
+    if extra:
+        hooks = list(options.get('progress_hooks') or []) + list(extra.get('progress_hooks') or [])
+        merged.update(extra)
+        if hooks:
+            merged['progress_hooks'] = hooks
+    return merged
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return the process-wide YoutubeDL pool."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = YoutubeDLPool()
+        return _default_pool
@@ -0,0 +1,144 @@
+"""
+Silence detection for YouTube Audio Extractor.
+Moves size-based split points into nearby pauses, so chunks don't end
+mid-word. The track is streamed from FFmpeg as low-rate mono PCM and its
+loudness measured in short windows, one fixed-size buffer at a time, so
+memory use does not grow with the length of the input.
+Needs NumPy (pip install numpy, or the 'silence' extra).
+"""
+
+import subprocess
+
+# Analysis format: 8 kHz mono 16-bit PCM is plenty to find pauses
+ANALYSIS_SAMPLE_RATE = 8000
+WINDOW_SECONDS = 0.05
+WINDOW_SAMPLES = int(ANALYSIS_SAMPLE_RATE * WINDOW_SECONDS)
+
+# Windows read from FFmpeg at once (about 3.5 minutes of audio, 1.6 MB)
+BUFFER_WINDOWS = 4096
+
+# A window is quiet below this level, or within QUIET_MARGIN_DB of the
+# quietest window near the cut (for tracks that never go fully silent)
+SILENCE_THRESHOLD_DB = -40.0
+QUIET_MARGIN_DB = 6.0
+
+# Seconds a cut may move either way by default
+DEFAULT_TOLERANCE = 15.0
+
+
+def load_numpy():
+    """Import NumPy, or raise RuntimeError explaining how to install it."""
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError("Splitting at silence needs NumPy: pip install numpy")
+    return numpy
+
+
+def numpy_available():
+    try:
+        load_numpy()
+    except RuntimeError:
+        return False
+    return True
+
+
+def stream_levels(input_file):
+    """Yield (window times in seconds, window levels in dBFS) for consecutive blocks of a track."""
+    np = load_numpy()
+    cmd = [
+        'ffmpeg', '-v', 'error', '-i', str(input_file), '-vn', '-ac', '1',
+        '-ar', str(ANALYSIS_SAMPLE_RATE), '-f', 's16le', '-'
+    ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL)
+    block_bytes = BUFFER_WINDOWS * WINDOW_SAMPLES * 2
+    first_window = 0
+    leftover = b''
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            data = leftover + data
+            usable = len(data) - len(data) % (WINDOW_SAMPLES * 2)
+            leftover = data[usable:]
+            if not usable:
+                continue
+
+            samples = np.frombuffer(data[:usable], dtype='<i2').astype(np.float32).reshape(-1, WINDOW_SAMPLES)
+            rms = np.sqrt(np.mean(samples * samples, axis=1)) / 32768.0
+            levels = 20 * np.log10(rms + 1e-10)
+            times = (first_window + np.arange(len(levels)) + 0.5) * WINDOW_SECONDS
+            first_window += len(levels)
+            yield times, levels
+    finally:
+        # The caller may stop early once every cut is placed
+        process.stdout.close()
+        if process.poll() is None:
+            process.kill()
+        process.wait()
+
+
+def quietest_point(times, levels, target):
+    """Middle of the quiet stretch nearest to target, or target if there is no audio to go by."""
+    np = load_numpy()
+    if not len(times):
+        return target
+
+    threshold = max(SILENCE_THRESHOLD_DB, float(levels.min()) + QUIET_MARGIN_DB)
+    quiet = np.concatenate(([0], (levels <= threshold).astype(np.int8), [0]))
+    edges = np.diff(quiet)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1) - 1
+    centers = (times[starts] + times[ends]) / 2
+    return float(centers[np.argmin(np.abs(centers - target))])
+
+
+def find_split_points(input_file, targets, tolerance=DEFAULT_TOLERANCE, max_chunk_seconds=None):
+    """Move each planned cut time in ``targets`` to the nearest quiet stretch within ``tolerance`` seconds.
+
+    With ``max_chunk_seconds``, no cut is placed further than that after the
+    previous one, so chunks stay within their size budget. Only the audio
+    around the cut being placed is kept, and the analysis stops as soon as
+    the last cut is placed.
+    """
+    np = load_numpy()
+    targets = sorted(targets)
+    cuts = []
+    previous = 0.0
+    pending_times, pending_levels = [], []
+
+    def search_range(target):
+        high = target + tolerance
+        if max_chunk_seconds:
+            high = min(high, previous + max_chunk_seconds)
+        return max(target - tolerance, previous), high
+
+    for times, levels in stream_levels(input_file):
+        while len(cuts) < len(targets):
+            target = targets[len(cuts)]
+            low, high = search_range(target)
+            inside = (times >= low) & (times < high)
+            pending_times.append(times[inside])
+            pending_levels.append(levels[inside])
+            if times[-1] < high:
+                break  # the search range continues in the next block
+
+            previous = quietest_point(np.concatenate(pending_times), np.concatenate(pending_levels),
+                                      min(max(target, low), high))
+            cuts.append(previous)
+            pending_times, pending_levels = [], []
+        if len(cuts) == len(targets):
+            break
+
+    # The track ended inside (or before) the remaining search ranges
+    for target in targets[len(cuts):]:
+        if pending_times:
+            low, high = search_range(target)
+            previous = quietest_point(np.concatenate(pending_times), np.concatenate(pending_levels),
+                                      min(max(target, low), high))
+            pending_times, pending_levels = [], []
+        else:
+            previous = target
+        cuts.append(previous)
+    return cuts
@@ -0,0 +1,87 @@
+"""
+Split manifests for YouTube Audio Extractor.
+Every chapter or size-based split records what it produced in a manifest
+next to the outputs: the source file's fingerprint, the split settings, and
+the time range and fingerprint of every output. Splitting the same source
+again only runs FFmpeg for segments that are missing or changed; outputs
+whose range is unchanged are kept, and renamed if their name changed.
+"""
+
+from pathlib import Path
+
+from .hashing import HASH_ALGORITHM, file_fingerprint
+from .manifests import read_json, write_json_atomic
+
+MANIFEST_VERSION = 1
+
+
+def manifest_path(output_dir, source_file):
+    return Path(output_dir) / f".{Path(source_file).name}.split.json"
+
+
+def segment_key(start_time, length):
+    """Identifies a segment by its time range (in milliseconds, so float noise does not matter)."""
+    return f"{round(start_time * 1000)}+{round(length * 1000)}"
+
+
+class SplitManifest:
+    """The outputs of one split of ``source_file`` into ``output_dir``.
+
+    Segments recorded by an earlier split can be taken over if the source
+    content, ``kind`` and ``settings`` are unchanged and the output file is
+    still as it was written. The new manifest is written by save(), which
+    also removes outputs of the earlier split that were not taken over.
+    """
+
+    def __init__(self, output_dir, source_file, kind, settings):
+        self.output_dir = Path(output_dir)
+        self.path = manifest_path(output_dir, source_file)
+        self.kind = kind
+        self.settings = settings
+        self.segments = []
+
+        previous = read_json(self.path) or {}
+        self.source = dict(file_fingerprint(source_file, previous.get('source')), name=Path(source_file).name)
+        self.previous_files = {segment['file'] for segment in previous.get('segments', [])}
+
+        unchanged = (previous.get('version') == MANIFEST_VERSION and previous.get('kind') == kind
+                     and previous.get('settings') == settings
+                     and previous['source'].get(HASH_ALGORITHM) == self.source[HASH_ALGORITHM])
+        self.previous = {segment['key']: segment for segment in previous['segments']} if unchanged else {}
+
+    def _valid(self, segment):
+        try:
+            return file_fingerprint(self.output_dir / segment['file'], segment)[HASH_ALGORITHM] == segment[HASH_ALGORITHM]
+        except OSError:
+            return False
+
+    def up_to_date(self):
+        """Whether the earlier split of the same source and settings is complete and intact."""
+        return bool(self.previous) and all(self._valid(segment) for segment in self.previous.values())
+
+    def take(self, key):
+        """(path, recorded segment) of the earlier output for ``key`` if it can be kept, else None."""
+        segment = self.previous.pop(key, None)
+        if segment is None or not self._valid(segment):
+            return None
+        return self.output_dir / segment['file'], segment
+
+    def record(self, key, path, known=None, **details):
+        """Add an output to the new manifest; ``known`` is its earlier record, if it was taken over."""
+        self.segments.append(dict(details, key=key, file=Path(path).name, **file_fingerprint(path, known)))
+
+    def save(self):
+        current = {segment['file'] for segment in self.segments}
+        for name in self.previous_files - current:
+            try:
+                (self.output_dir / name).unlink()
+            except FileNotFoundError:
+                pass
+
+        write_json_atomic(self.path, {
+            'version': MANIFEST_VERSION,
+            'kind': self.kind,
+            'source': self.source,
+            'settings': self.settings,
+            'segments': self.segments,
+        })
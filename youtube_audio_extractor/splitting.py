@@ -6,69 +6,296 @@ Contains functions for splitting large audio files into smaller chunks.
 import click
 import subprocess
 import math
+import os
+import re
 from pathlib import Path
+from .silence import DEFAULT_TOLERANCE, find_split_points
+from .split_manifest import SplitManifest, segment_key
+from .staging import get_staging_area, publish
 
+# Files larger than this (in MB) are split into chunks
+DEFAULT_MAX_SIZE_MB = 16
 
-def split_audio_file(input_file, output_dir, max_size_mb=16, bitrate="192"):
-    """Split audio file into chunks under specified size using FFmpeg."""
+# Named size limits (in MB), e.g. for messaging-app and e-mail attachment limits
+SIZE_PRESETS = {
+    'small': 8,
+    'standard': 16,
+    'email': 25,
+    'large': 100,
+}
+
+# Chunks are planned for 90% of the size limit, leaving room for headers and bitrate variation
+SIZE_SAFETY_MARGIN = 0.9
+
+# Times one chunk is cut shorter before giving up on it
+MAX_RECUTS = 5
+
+# Leftover audio shorter than this (in seconds) does not get a chunk of its own
+MIN_CHUNK_SECONDS = 0.1
+
+SPLIT_DIR_NAME = "split_chunks"
+
+CHUNK_NAME_PATTERN = re.compile(r'^(?P<base>.*)_part(?P<number>\d+)(?P<extension>\.[^.]+)$')
+
+
+def parse_max_size(value):
+    """Parse a size limit given in MB or as a preset name (see SIZE_PRESETS)."""
+    if value is None or value == '':
+        return DEFAULT_MAX_SIZE_MB
+    if isinstance(value, str) and value.strip().lower() in SIZE_PRESETS:
+        return SIZE_PRESETS[value.strip().lower()]
     try:
-        # Get file info using FFprobe
-        cmd = [
-            'ffprobe', '-v', 'quiet', '-show_entries',
-            'format=duration', '-of', 'csv=p=0', input_file
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-
-        if result.returncode != 0:
-            click.echo(f"❌ Error getting audio duration: {result.stderr}")
-            return False
+        size = float(value)
+    except (TypeError, ValueError):
+        size = 0
+    if size <= 0:
+        raise ValueError(f"Invalid size '{value}' (use a number of MB or one of: {', '.join(SIZE_PRESETS)})")
+    return size
 
-        duration = float(result.stdout.strip())
 
-        # Calculate chunk duration based on bitrate and max size
-        # Formula: duration = (size_in_bits) / (bitrate * 1000)
-        # For MP3: size_in_bits = max_size_mb * 8 * 1024 * 1024
-        max_size_bits = max_size_mb * 8 * 1024 * 1024
-        bitrate_bps = int(bitrate) * 1000
+def predicted_size_mb(duration, bitrate):
+    """Size in MB of ``duration`` seconds of audio at ``bitrate`` kbps."""
+    return duration * int(bitrate) * 1000 / 8 / (1024 * 1024)
+
+
+def budget_seconds(bitrate, max_size_mb=DEFAULT_MAX_SIZE_MB):
+    """Seconds of audio at ``bitrate`` kbps that add up to exactly max_size_mb."""
+    # Formula: duration = (size_in_bits) / (bitrate * 1000)
+    # For MP3: size_in_bits = max_size_mb * 8 * 1024 * 1024
+    max_size_bits = max_size_mb * 8 * 1024 * 1024
+    bitrate_bps = int(bitrate) * 1000
+    return max_size_bits / bitrate_bps
+
+
+def plan_chunks(duration, bitrate, max_size_mb=DEFAULT_MAX_SIZE_MB):
+    """Return (number of chunks, seconds per chunk) that keep every chunk under max_size_mb."""
+    safe_duration = budget_seconds(bitrate, max_size_mb) * SIZE_SAFETY_MARGIN
+
+    num_chunks = max(1, math.ceil(duration / safe_duration))
+    return num_chunks, duration / num_chunks
+
+
+def plan_cuts(input_file, duration, bitrate, max_size_mb=DEFAULT_MAX_SIZE_MB, at_silence=False):
+    """Times (in seconds) at which to cut input_file into chunks under max_size_mb.
+
+    With ``at_silence`` every cut is moved to the nearest pause within a few
+    seconds (see silence.py); raises RuntimeError if NumPy is not installed.
+    """
+    num_chunks, chunk_duration = plan_chunks(duration, bitrate, max_size_mb)
+    cuts = [chunk_duration * number for number in range(1, num_chunks)]
+    if at_silence and cuts:
+        tolerance = min(DEFAULT_TOLERANCE, chunk_duration / 4)
+        # A chunk may grow up to halfway into the safety margin to reach a pause
+        max_chunk_seconds = budget_seconds(bitrate, max_size_mb) * (1 + SIZE_SAFETY_MARGIN) / 2
+        cuts = find_split_points(input_file, cuts, tolerance, max_chunk_seconds)
+    return cuts
+
+
+def fitted_length(length, size, max_bytes):
+    """Seconds of audio expected to fit max_bytes, given that ``length`` seconds took ``size`` bytes."""
+    return length * max_bytes / size * SIZE_SAFETY_MARGIN
+
+
+def chunk_name(base_name, number, extension):
+    """File name of chunk ``number`` (counting from 1)."""
+    return f"{base_name}_part{number:02d}{extension}"
+
+
+def chunk_pattern(base_name, extension):
+    """FFmpeg segment muxer file pattern producing the same names as chunk_name."""
+    # '%' in a title would be read as part of the pattern
+    return f"{base_name.replace('%', '%%')}_part%02d{extension}"
+
+
+def list_chunks(split_dir, base_name, extension):
+    """The chunk files of one source in split_dir, in order."""
+    chunks = []
+    for path in Path(split_dir).iterdir():
+        match = CHUNK_NAME_PATTERN.match(path.name)
+        if match and match['base'] == base_name and match['extension'] == extension:
+            chunks.append((int(match['number']), path))
+    return [path for _, path in sorted(chunks)]
+
+
+def probe_duration(input_file):
+    """Duration of an audio file in seconds, or None if FFprobe cannot read it."""
+    cmd = [
+        'ffprobe', '-v', 'quiet', '-show_entries',
+        'format=duration', '-of', 'csv=p=0', str(input_file)
+    ]
+    result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    try:
+        return float(result.stdout.strip())
+    except ValueError:
+        return None
 
-        # Add some safety margin (90% of calculated size)
-        safe_duration = (max_size_bits * 0.9) / bitrate_bps
 
-        # Calculate number of chunks needed
-        num_chunks = math.ceil(duration / safe_duration)
-        chunk_duration = duration / num_chunks
+def cut_audio(input_file, output_file, start_time, length=None):
+    """Copy ``length`` seconds (or the rest) of input_file from start_time on, without re-encoding."""
+    cmd = ['ffmpeg', '-i', str(input_file), '-ss', str(start_time)]
+    if length is not None:
+        cmd += ['-t', str(length)]
+    cmd += ['-c', 'copy', '-y', str(output_file)]
+    return subprocess.run(cmd, capture_output=True, text=True, check=False)
+
+
+def join_audio(input_files, output_file):
+    """Join audio files of the same format end to end, without re-encoding."""
+    concat_list = Path(output_file).with_name(f".{Path(output_file).name}.txt")
+    # The concat demuxer reads quoted paths; a quote inside one is written as '\''
+    concat_list.write_text(''.join("file '{}'\n".format(str(Path(path).resolve()).replace("'", "'\\''"))
+                                   for path in input_files))
+    try:
+        cmd = ['ffmpeg', '-f', 'concat', '-safe', '0', '-i', str(concat_list), '-c', 'copy', '-y', str(output_file)]
+        return subprocess.run(cmd, capture_output=True, text=True, check=False)
+    finally:
+        concat_list.unlink()
+
+
+def fit_chunks(chunks, max_size_mb=DEFAULT_MAX_SIZE_MB):
+    """Make every file of an ordered chunk sequence fit within max_size_mb.
+
+    Chunks are checked in order. A chunk over the limit is cut shorter and the
+    cut-off tail is moved to the front of the next chunk (or becomes a new last
+    chunk), which is then checked in turn. Chunks under the limit are left
+    untouched. Returns the resulting chunk paths, or None if a chunk could not be fitted.
+    """
+    chunks = [Path(chunk) for chunk in chunks]
+    max_bytes = max_size_mb * 1024 * 1024
+
+    index = recuts = 0
+    while index < len(chunks):
+        chunk = chunks[index]
+        size = chunk.stat().st_size
+        if size <= max_bytes:
+            index += 1
+            recuts = 0
+            continue
+
+        duration = probe_duration(chunk)
+        if not duration or recuts >= MAX_RECUTS:
+            click.echo(f"❌ Could not fit chunk {chunk.name} within {max_size_mb:g}MB")
+            return None
+        recuts += 1
+
+        keep = fitted_length(duration, size, max_bytes)
+        click.echo(f"↩️  {chunk.name} is {size / (1024 * 1024):.1f} MB, moving its last "
+                   f"{duration - keep:.1f} seconds to the next chunk")
+        head = chunk.with_name(f".head_{chunk.name}")
+        tail = chunk.with_name(f".tail_{chunk.name}")
+        for result in (cut_audio(chunk, head, 0, keep), cut_audio(chunk, tail, keep)):
+            if result.returncode != 0:
+                click.echo(f"❌ Error re-cutting {chunk.name}: {result.stderr}")
+                return None
+        os.replace(head, chunk)
+
+        if index + 1 < len(chunks):
+            following = chunks[index + 1]
+            joined = following.with_name(f".joined_{following.name}")
+            result = join_audio([tail, following], joined)
+            tail.unlink()
+            if result.returncode != 0:
+                click.echo(f"❌ Error joining {chunk.name} into {following.name}: {result.stderr}")
+                return None
+            os.replace(joined, following)
+        else:
+            match = CHUNK_NAME_PATTERN.match(chunk.name)
+            new_chunk = chunk.with_name(chunk_name(match['base'], int(match['number']) + 1, match['extension']))
+            os.replace(tail, new_chunk)
+            chunks.append(new_chunk)
+
+    return chunks
+
+
+def split_audio_file(input_file, output_dir, max_size_mb=DEFAULT_MAX_SIZE_MB, bitrate="192", at_silence=False):
+    """Split audio file into chunks under specified size using FFmpeg.
+
+    Each chunk's real size is checked as soon as it is written; a chunk over
+    the limit is cut again, shorter, and the next chunk starts where it ends.
+    With ``at_silence`` the cuts are placed in pauses near the size-based times.
+    Chunks from an earlier split of the same file with the same settings are
+    kept instead of being cut again (see split_manifest.py).
+    """
+    try:
+        # Get file info using FFprobe
+        duration = probe_duration(input_file)
+
+        if duration is None:
+            click.echo(f"❌ Error getting audio duration of {input_file}")
+            return False
+
+        # Calculate chunk duration based on bitrate and max size
+        num_chunks, chunk_duration = plan_chunks(duration, bitrate, max_size_mb)
+        max_bytes = max_size_mb * 1024 * 1024
 
         click.echo(f"📏 Audio duration: {duration:.1f} seconds")
-        click.echo(f"✂️  Splitting into {num_chunks} chunks of ~{chunk_duration:.1f} seconds each")
 
         # Create output directory for split files
-        split_dir = Path(output_dir) / "split_chunks"
+        split_dir = Path(output_dir) / SPLIT_DIR_NAME
         split_dir.mkdir(parents=True, exist_ok=True)
 
+        manifest = SplitManifest(split_dir, input_file, 'chunks',
+                                 {'max_size_mb': max_size_mb, 'bitrate': str(bitrate), 'at_silence': bool(at_silence)})
+        if manifest.up_to_date():
+            click.echo(f"⏭️  Chunks in {split_dir} are up to date")
+            return True
+
+        click.echo(f"✂️  Splitting into {num_chunks} chunks of ~{chunk_duration:.1f} seconds each")
+
+        cuts = None
+        if at_silence:
+            try:
+                cuts = plan_cuts(input_file, duration, bitrate, max_size_mb, at_silence=True)
+                click.echo("🤫 Split points moved into the nearest pauses")
+            except RuntimeError as e:
+                click.echo(f"⚠️  {e}; splitting at fixed times")
+
         # Split the audio file
         base_name = Path(input_file).stem
-        for i in range(num_chunks):
-            start_time = i * chunk_duration
-            end_time = min((i + 1) * chunk_duration, duration)
+        extension = Path(input_file).suffix
+        number, start_time = 1, 0.0
+        while duration - start_time > MIN_CHUNK_SECONDS:
+            if cuts and number <= len(cuts):
+                length = cuts[number - 1] - start_time
+            else:
+                length = min(chunk_duration, duration - start_time)
+            output_file = split_dir / chunk_name(base_name, number, extension)
+            key = segment_key(start_time, length)
 
-            output_file = split_dir / f"{base_name}_part{i+1:02d}.mp3"
+            found = manifest.take(key)
+            if found and found[0] == output_file:
+                click.echo(f"⏭️  Chunk {number}: {output_file.name} is up to date")
+                manifest.record(key, output_file, found[1], length=found[1]['length'])
+                start_time += found[1]['length']
+                number += 1
+                continue
 
-            cmd = [
-                'ffmpeg', '-i', input_file, '-ss', str(start_time),
-                '-t', str(end_time - start_time), '-c', 'copy',
-                '-y', str(output_file)
-            ]
+            # Cut into the staging area and publish once the chunk fits (see staging.py)
+            staged = get_staging_area().path_for(output_file)
+            for _ in range(MAX_RECUTS + 1):
+                result = cut_audio(input_file, staged, start_time, length)
 
-            result = subprocess.run(cmd, capture_output=True, text=True)
+                if result.returncode != 0:
+                    click.echo(f"❌ Error splitting chunk {number}: {result.stderr}")
+                    return False
 
-            if result.returncode != 0:
-                click.echo(f"❌ Error splitting chunk {i+1}: {result.stderr}")
+                # Get the actual file size
+                size = staged.stat().st_size
+                if size <= max_bytes:
+                    break
+                click.echo(f"↩️  Chunk {number} came out at {size / (1024 * 1024):.1f} MB, cutting it shorter")
+                length = fitted_length(length, size, max_bytes)
+            else:
+                click.echo(f"❌ Could not fit chunk {number} within {max_size_mb:g}MB")
                 return False
+            publish(staged, output_file)
 
-            # Get the actual file size
-            chunk_size = output_file.stat().st_size / (1024 * 1024)
-            click.echo(f"✅ Chunk {i+1}: {output_file.name} ({chunk_size:.1f} MB)")
+            click.echo(f"✅ Chunk {number}: {output_file.name} ({size / (1024 * 1024):.1f} MB)")
+            manifest.record(key, output_file, length=length)
+            start_time += length
+            number += 1
 
+        manifest.save()
         click.echo(f"🎯 All chunks saved to: {split_dir}")
         return True
 
@@ -0,0 +1,163 @@
+"""
+Staging area for YouTube Audio Extractor.
+Encoded files, chunks and chapter files are written into a per-job staging
+directory first and only moved into the library (published) once the step
+that made them has succeeded, with an atomic rename. An interrupted job
+therefore never leaves a half-written file where a finished one belongs.
+The staging area can live on faster scratch storage such as a tmpfs; files
+are then copied next to their destination and renamed into place. Staging
+directories of processes that are no longer running are removed by sweep(),
+which runs at startup.
+"""
+
+import errno
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+STAGING_DIR = Path('downloads') / '.staging'
+OWNER_FILENAME = 'owner.json'
+
+# When this process started; a staging directory with our process ID but older than this is an orphan
+PROCESS_STARTED = time.time()
+
+
+def process_alive(pid):
+    """Whether a process with this ID is running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # running, as another user
+    return True
+
+
+def publish(staged, destination):
+    """Move a finished file from the staging area to its destination, replacing it atomically."""
+    staged, destination = Path(staged), Path(destination)
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        os.replace(staged, destination)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Staged on another file system (e.g. a tmpfs): copy next to the destination, then rename
+        publishing = destination.with_name(f".{destination.name}.publishing")
+        try:
+            shutil.copyfile(staged, publishing)
+            with open(publishing, 'rb+') as f:
+                os.fsync(f.fileno())
+            os.replace(publishing, destination)
+        except BaseException:
+            try:
+                publishing.unlink()
+            except FileNotFoundError:
+                pass
+            raise
+        staged.unlink()
+    return destination
+
+
+class StagingJob:
+    """A job's staging directory; it is the calling thread's current one until close()."""
+
+    def __init__(self, area, directory, name):
+        self.area = area
+        self.directory = directory
+        self.name = name
+        self._previous = None
+
+    def close(self):
+        self.area._deactivate(self)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class StagingArea:
+    """Per-job staging directories (<pid>-<n>) under one directory, default downloads/.staging/."""
+
+    def __init__(self, directory=STAGING_DIR):
+        self.directory = Path(directory)
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+
+    def configure(self, directory):
+        """Stage files in ``directory`` (for example on a tmpfs) from now on."""
+        self.directory = Path(directory)
+
+    def begin(self, name=None):
+        """Create a staging directory for a job run on the calling thread; close() the job when it ends."""
+        directory = self.directory / f"{os.getpid()}-{next(self._ids)}"
+        directory.mkdir(parents=True, exist_ok=True)
+        (directory / OWNER_FILENAME).write_text(json.dumps({'pid': os.getpid(), 'name': name, 'started': time.time()}))
+        job = StagingJob(self, directory, name)
+        job._previous = getattr(self._local, 'job', None)
+        self._local.job = job
+        return job
+
+    def _deactivate(self, job):
+        if getattr(self._local, 'job', None) is job:
+            self._local.job = job._previous
+
+    def current(self):
+        """The calling thread's job directory; outside a job, one shared by the process."""
+        job = getattr(self._local, 'job', None)
+        if job is not None:
+            return job.directory
+        directory = self.directory / f"{os.getpid()}-0"
+        directory.mkdir(parents=True, exist_ok=True)
+        return directory
+
+    def path_for(self, destination):
+        """A fresh staging path for a file to be published at destination (same name, so the same format)."""
+        staged = self.current() / str(next(self._ids)) / Path(destination).name
+        staged.parent.mkdir()
+        return staged
+
+    def dir_for(self, destination):
+        """A fresh, empty staging directory for files to be published into the directory destination."""
+        staged = self.current() / str(next(self._ids)) / Path(destination).name
+        staged.mkdir(parents=True)
+        return staged
+
+    def sweep(self):
+        """Remove the staging directories of processes that are no longer running; returns how many."""
+        removed = 0
+        try:
+            directories = list(self.directory.iterdir())
+        except OSError:
+            return 0
+        for directory in directories:
+            pid = directory.name.split('-')[0]
+            if not pid.isdigit():
+                continue
+            if int(pid) == os.getpid():
+                # Ours, unless a process before us had the same ID (common in containers)
+                try:
+                    if directory.stat().st_ctime >= PROCESS_STARTED - 1:
+                        continue
+                except OSError:
+                    continue
+            elif process_alive(int(pid)):
+                continue
+            shutil.rmtree(directory, ignore_errors=True)
+            removed += 1
+        return removed
+
+
+_staging_area = StagingArea()
+
+
+def get_staging_area():
+    """Return the process-wide staging area."""
+    return _staging_area
@@ -0,0 +1,353 @@
+"""
+Storage quota for YouTube Audio Extractor.
+Keeps the downloads directory within a configurable size. Every job
+reserves its predicted output size (duration × bitrate of each output
+format, plus the source stream) before it downloads anything; if that does
+not fit, the least recently used library items are evicted to make room,
+and if it still does not fit the job is refused up front instead of failing
+halfway with a full disk. An item is a top-level folder of downloads/, a
+top-level file together with its sidecars (CUE sheet, chapter index,
+.info.json), or a video folder of a sharded layout (see catalog.py).
+Encoded outputs in the transcode cache count toward the quota and are
+evicted in the same least-recently-used order; evicting an output also drops
+its cache entry, which would otherwise keep its data on disk.
+Pinned items are never evicted. Access times are recorded when outputs are
+written, linked from the library store or served by the API.
+"""
+
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from yt_dlp.utils import format_bytes, parse_bytes
+
+from .catalog import SHARD_ROOTS, get_catalog, shard_item
+from .library_store import get_blob_store
+from .manifests import read_json, write_json_atomic
+from .splitting import predicted_size_mb
+from .transcode_cache import get_transcode_cache
+
+DOWNLOADS_DIR = Path('downloads')
+STATE_FILENAME = '.storage.json'
+
+# Allowance for the source stream, which sits next to the outputs until they are encoded
+SOURCE_KBPS = 160
+
+# Playlist entries wait this long (seconds) for running jobs to finish and free room before they are refused
+BULK_WAIT = 600
+
+# Access times are written out at most this often (seconds); the API touches files on every request
+ACCESS_SAVE_INTERVAL = 10
+
+# Sidecar files that belong to the audio file of the same name
+SIDECAR_SUFFIXES = ('.chapters.json', '.info.json', '.cue')
+
+
+class InsufficientStorage(RuntimeError):
+    """A job's predicted output does not fit within the storage quota."""
+
+
+def parse_size(value):
+    """Parse a size such as '50G', '500M' or a number of bytes; None, '' and 0 mean no quota."""
+    if value in (None, '', 0, '0'):
+        return None
+    size = value if isinstance(value, (int, float)) else parse_bytes(str(value).strip())
+    if not size or size < 0:
+        raise ValueError(f"Invalid size '{value}' (use e.g. 500M or 50G)")
+    return int(size)
+
+
+def format_size(size):
+    return format_bytes(size) if size else 'unlimited'
+
+
+def predicted_job_bytes(duration, formats):
+    """Bytes a job writes for ``duration`` seconds of audio in every output format; 0 if unknown."""
+    if not duration:
+        return 0
+    kbps = sum(int(output_format.bitrate) for output_format in formats) + SOURCE_KBPS
+    return int(predicted_size_mb(duration, kbps) * 1024 * 1024)
+
+
+def item_name(name):
+    """Library item a top-level entry of downloads/ belongs to (sidecars belong to their audio file)."""
+    for suffix in SIDECAR_SUFFIXES:
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return Path(name).stem
+
+
+class Reservation:
+    """Space set aside for one job until release()."""
+
+    def __init__(self, manager, size, name):
+        self.manager = manager
+        self.size = size
+        self.name = name
+        self.started = time.time()
+
+    def release(self):
+        self.manager._release(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+
+class StorageManager:
+    """Quota, pinned items and access times of the downloads directory, kept in downloads/.storage.json.
+
+    What the library takes up is read from its catalog, which keeps a running
+    total as outputs are written and evicted; the disk is only scanned again
+    by rescan().
+    """
+
+    def __init__(self, root=DOWNLOADS_DIR, catalog=None, store=None, cache=None):
+        self.root = Path(root)
+        self.catalog = catalog or get_catalog()
+        self.store = store or get_blob_store()
+        self.cache = cache or get_transcode_cache()
+        self._lock = threading.Condition()
+        self._state = None
+        self._saved = 0
+        self._reservations = []
+        self._stats = {'admitted': 0, 'refused': 0, 'evicted': 0, 'evicted_bytes': 0}
+
+    def _load(self):
+        if self._state is None:
+            state = read_json(self.root / STATE_FILENAME, {})
+            self._state = {'quota': state.get('quota'), 'pinned': set(state.get('pinned', [])),
+                           'access': state.get('access', {})}
+        return self._state
+
+    def _save(self):
+        state = self._load()
+        try:
+            write_json_atomic(self.root / STATE_FILENAME, {
+                'quota': state['quota'],
+                'pinned': sorted(state['pinned']),
+                'access': state['access'],
+            })
+            self._saved = time.monotonic()
+        except OSError:
+            pass  # access times are best effort; the quota is set again on the next change
+
+    @property
+    def quota(self):
+        with self._lock:
+            return self._load()['quota']
+
+    def configure(self, quota=None, pin=(), unpin=()):
+        """Set the quota in bytes (None for no quota) and pin or unpin items by name."""
+        with self._lock:
+            state = self._load()
+            state['quota'] = quota
+            state['pinned'].update(pin)
+            state['pinned'].difference_update(unpin)
+            self._save()
+            self._lock.notify_all()
+
+    def _item(self, parts, is_dir=False):
+        """(name, path) of the library item a path relative to the root belongs to, or None outside
+        the library (hidden state); in a sharded layout every video folder is an item."""
+        if not parts or parts[0].startswith('.'):
+            return None
+        if parts[0] in SHARD_ROOTS.values():
+            shard = shard_item(parts)
+            return ('/'.join(shard), self.root.joinpath(*shard)) if shard else None
+        if len(parts) > 1 or is_dir:
+            return parts[0], self.root / parts[0]
+        return item_name(parts[0]), self.root / parts[0]
+
+    def _item_of(self, path):
+        try:
+            parts = Path(path).resolve().relative_to(self.root.resolve()).parts
+        except ValueError:
+            return None
+        item = self._item(parts, Path(path).is_dir())
+        return item[0] if item else None
+
+    def touch(self, path):
+        """Record that a library file (or folder) was just written or read."""
+        name = self._item_of(path)
+        if name is None:
+            return
+        with self._lock:
+            self._load()['access'][name] = time.time()
+            if time.monotonic() - self._saved >= ACCESS_SAVE_INTERVAL:
+                self._save()
+
+    def _cache_usage(self, objects):
+        """Bytes taken up by transcode cache objects no library file links to."""
+        linked = self.catalog.linked({obj['inode'] for obj in objects})
+        return sum(obj['size'] for obj in objects if obj['inode'] not in linked)
+
+    def _items(self):
+        """({item: {'paths', 'reclaimable', 'modified', 'cache_keys'}} for the library, from the catalog
+        (see catalog.py), and the same for transcode cache objects no library file links to.
+
+        Hardlinked data is counted once. An item's reclaimable bytes are the
+        data only it (and the library store and transcode cache) links to,
+        i.e. what evicting it, its cache entries and pruning the store frees.
+        """
+        cached = {}
+        for obj in self.cache.objects():
+            cached.setdefault(obj['inode'], []).append(obj)
+
+        inodes = {}
+        items = {}
+        for path, size, modified, inode, links in self.catalog.entries():
+            item = self._item(path.relative_to(self.root).parts)
+            owner = item[0] if item else None
+            if item:
+                entry = items.setdefault(owner, {'paths': set(), 'reclaimable': 0, 'modified': 0, 'cache_keys': []})
+                entry['paths'].add(item[1])
+                entry['modified'] = max(entry['modified'], modified)
+            inodes.setdefault(inode, {'size': size, 'links': links, 'owners': []})['owners'].append(owner)
+
+        for inode, entry in inodes.items():
+            owners = set(entry['owners'])
+            objects = cached.get(inode, [])
+            # Besides the cache, the library store holds at most one more link, which prune() removes;
+            # any other link (outside the library) keeps the data alive
+            if len(owners) == 1 and entry['links'] - len(entry['owners']) - len(objects) <= 1:
+                owner = owners.pop()
+                if owner in items:
+                    items[owner]['reclaimable'] += entry['size']
+                    items[owner]['cache_keys'] += [obj['key'] for obj in objects]
+
+        cache_items = {}
+        for inode, objects in cached.items():
+            if inode in inodes:
+                continue
+            for obj in objects:
+                try:
+                    reclaimable = obj['size'] if obj['path'].stat().st_nlink == 1 else 0
+                except OSError:
+                    reclaimable = 0
+                cache_items[f"{self.cache.directory.name}/{obj['key']}"] = {
+                    'paths': set(), 'reclaimable': reclaimable, 'modified': obj['stored'],
+                    'last_used': obj['last_used'], 'cache_keys': [obj['key']]}
+        return items, cache_items
+
+    def _candidates(self, items, protect_after):
+        """Evictable items, least recently used first."""
+        state = self._load()
+        candidates = []
+        for name, item in items.items():
+            # Items written since the oldest running job started may be that job's output
+            if name in state['pinned'] or item['modified'] >= protect_after:
+                continue
+            accessed = item.get('last_used') or state['access'].get(name, item['modified'])
+            candidates.append((accessed, name, item))
+        return [(name, item) for _, name, item in sorted(candidates, key=lambda candidate: candidate[0])]
+
+    def _evict(self, name, item):
+        for path in item['paths']:
+            if path.is_dir() and not path.is_symlink():
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+            self.catalog.forget(path)
+        self.cache.discard(item['cache_keys'])
+        self._load()['access'].pop(name, None)
+        self._stats['evicted'] += 1
+        self._stats['evicted_bytes'] += item['reclaimable']
+
+    def _make_room(self, size):
+        """Evict least recently used items until size more bytes fit; returns the bytes still missing."""
+        quota = self._load()['quota']
+        used = self.catalog.usage() + self._cache_usage(self.cache.objects())
+        missing = used + sum(r.size for r in self._reservations) + size - quota
+        if missing <= 0:
+            return 0
+
+        # Transcode cache objects compete with library items, least recently used first
+        protect_after = min((r.started for r in self._reservations), default=time.time())
+        items, cache_items = self._items()
+        victims = []
+        for name, item in self._candidates({**items, **cache_items}, protect_after):
+            if missing - sum(victim['reclaimable'] for _, victim in victims) <= 0:
+                break
+            if item['reclaimable']:
+                victims.append((name, item))
+        freed = sum(item['reclaimable'] for _, item in victims)
+        if freed < missing:
+            return missing - freed  # evicting would not be enough, so keep everything
+
+        for name, item in victims:
+            self._evict(name, item)
+        self.store.prune()
+        self._save()
+        return 0
+
+    def reserve(self, size, name=None, wait=0):
+        """Set aside ``size`` bytes for a job, evicting old items if needed.
+
+        Waits up to ``wait`` seconds for running jobs to finish if there is
+        still no room, then raises InsufficientStorage. Without a quota the
+        reservation always succeeds.
+        """
+        deadline = time.monotonic() + wait
+        with self._lock:
+            while True:
+                if self._load()['quota'] is None or not size:
+                    missing = 0
+                else:
+                    missing = self._make_room(size)
+                if not missing:
+                    reservation = Reservation(self, size, name)
+                    self._reservations.append(reservation)
+                    self._stats['admitted'] += 1
+                    return reservation
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._reservations:
+                    self._stats['refused'] += 1
+                    raise InsufficientStorage(
+                        f"Not enough storage: the output needs about {format_bytes(size)}, "
+                        f"{format_bytes(missing)} more than fits within the {format_size(self.quota)} quota "
+                        f"after evicting unpinned downloads")
+                self._lock.wait(remaining)
+
+    def _release(self, reservation):
+        with self._lock:
+            if reservation in self._reservations:
+                self._reservations.remove(reservation)
+                self._lock.notify_all()
+
+    def rescan(self):
+        """Measure the downloads directory again, for files added or deleted outside the app.
+
+        Returns (files added to the catalog, files dropped from it).
+        """
+        return self.catalog.rescan()
+
+    def status(self):
+        items, _ = self._items()
+        cache_bytes = self._cache_usage(self.cache.objects())
+        with self._lock:
+            state = self._load()
+            return dict(self._stats, quota=state['quota'], used=self.catalog.usage() + cache_bytes,
+                        transcode_cache=cache_bytes, pinned=sorted(state['pinned']),
+                        reserved=sum(r.size for r in self._reservations),
+                        jobs=[{'name': r.name, 'size': r.size} for r in self._reservations],
+                        items=[{'name': name, 'size': item['reclaimable'], 'pinned': name in state['pinned'],
+                                'last_access': state['access'].get(name, item['modified'])}
+                               for name, item in sorted(items.items())])
+
+    def describe(self):
+        return f'{format_size(self.quota)} quota'
+
+
+_storage_manager = StorageManager()
+
+
+def get_storage_manager():
+    """Return the process-wide storage manager."""
+    return _storage_manager
@@ -0,0 +1,174 @@
+"""
+Incremental collection sync for YouTube Audio Extractor.
+Remembers which videos of a channel or playlist were already downloaded and
+fetches only the new ones, stopping the listing as soon as it reaches known videos.
+"""
+
+from datetime import datetime
+
+from yt_dlp.utils import YoutubeDLError
+
+from .checkpoints import PlaylistCheckpoint, entry_id
+from .encoding import output_formats
+from .entries import PlaylistEntry, open_collection
+from .manifests import read_json, write_json_atomic
+from .playlists import (
+    clean_filename,
+    download_playlist_video_with_progress,
+    playlist_output_dir,
+    validate_playlist_url,
+)
+from .reporting import report
+from .session import get_pool
+from .splitting import DEFAULT_MAX_SIZE_MB
+
+SYNC_STATE_FILENAME = '.sync_state.json'
+
+# Consecutive already-known videos after which the listing stops
+DEFAULT_STOP_AFTER = 10
+
+
+def find_new_entries(entries, known_ids, stop_after=DEFAULT_STOP_AFTER, full_scan=False):
+    """Collect the yt-dlp entries whose IDs are not in ``known_ids``, in listing order.
+
+    Returns PlaylistEntry records. Iteration stops after ``stop_after``
+    consecutive known entries, so only the first pages of a newest-first
+    listing (channel uploads) are fetched. ``full_scan`` reads everything,
+    for playlists where new videos are appended.
+    """
+    new_entries = []
+    known_run = 0
+    for info in entries:
+        if info is None:
+            continue
+        entry = PlaylistEntry.from_info(len(new_entries) + 1, info)
+        video_id = entry_id(entry)
+        if not video_id:
+            continue
+        if video_id in known_ids:
+            known_run += 1
+            if not full_scan and known_run >= stop_after:
+                break
+            continue
+        known_run = 0
+        new_entries.append(entry)
+    return new_entries
+
+
+def load_sync_state(playlist_dir, url):
+    """Sync state of a collection directory, seeded from a playlist checkpoint if there is one."""
+    state = read_json(playlist_dir / SYNC_STATE_FILENAME)
+    if state and state.get('url') == url:
+        return state
+
+    state = {'url': url, 'known_ids': [], 'next_number': 1}
+    checkpoint = PlaylistCheckpoint(playlist_dir, url, None, resume=True)
+    for video_id, record in checkpoint.entries.items():
+        if record.get('state') == 'completed':
+            state['known_ids'].append(video_id)
+        state['next_number'] = max(state['next_number'], record.get('index', 0) + 1)
+    return state
+
+
+def sync_collection(url, output_dir="downloads", quality="best", bitrate="192", codec="mp3",
+                    split_large_files=False, split_by_chapters=False,
+                    stop_after=DEFAULT_STOP_AFTER, full_scan=False, progress_hook=None,
+                    max_size_mb=DEFAULT_MAX_SIZE_MB, split_at_silence=False, virtual_chapters=False):
+    """Download the videos of a channel or playlist that were published since the last sync.
+
+    New videos are numbered after the ones already in the collection directory,
+    oldest first, so existing folders never change name. Returns a summary dict,
+    or None if the collection could not be listed.
+    """
+    if not validate_playlist_url(url):
+        report(progress_hook, 'error', 'Invalid YouTube URL provided!', "❌ Invalid YouTube URL provided!")
+        return None
+
+    try:
+        formats = output_formats(bitrate, codec)
+    except ValueError as e:
+        report(progress_hook, 'error', str(e), f"❌ {e}")
+        return None
+
+    try:
+        with get_pool().acquire(quiet=True, no_warnings=True, extract_flat='in_playlist') as ydl:
+            info = open_collection(ydl, url)
+            if not info or info.get('entries') is None:
+                report(progress_hook, 'error', 'No videos found', "❌ No videos found")
+                return None
+
+            title = info.get('title', 'Unknown Collection')
+            playlist_dir = playlist_output_dir(output_dir, title)
+            playlist_dir.mkdir(parents=True, exist_ok=True)
+            state = load_sync_state(playlist_dir, url)
+            known_ids = set(state['known_ids'])
+
+            report(progress_hook, 'info', f'Syncing {title} ({len(known_ids)} videos already downloaded)',
+                   f"🔄 Syncing {title} ({len(known_ids)} videos already downloaded)")
+            new_entries = find_new_entries(info['entries'], known_ids, stop_after, full_scan)
+    except (YoutubeDLError, OSError) as e:
+        report(progress_hook, 'error', f'Error listing collection: {e}', f"❌ Error listing collection: {e}")
+        return None
+
+    checkpoint = PlaylistCheckpoint(playlist_dir, url, title, resume=True)
+    successful = []
+    failed = []
+
+    if not new_entries:
+        report(progress_hook, 'info', 'No new videos since the last sync', "✅ No new videos since the last sync")
+    else:
+        report(progress_hook, 'info', f'New videos: {len(new_entries)}', f"🆕 New videos: {len(new_entries)}")
+
+    # Oldest new video first, so numbering follows publication order
+    for position, entry in enumerate(reversed(new_entries), start=1):
+        video_id = entry_id(entry)
+        video_title = entry.title or video_id
+        previous = checkpoint.entries.get(video_id)
+        if previous and previous.get('dir'):
+            # Retry of a video that failed in an earlier sync: keep its number and folder
+            number = previous['index']
+            video_dir = playlist_dir / previous['dir']
+        else:
+            number = state['next_number']
+            state['next_number'] += 1
+            video_dir = playlist_dir / f"{number:02d}_{clean_filename(video_title)}"
+        video_dir.mkdir(exist_ok=True)
+
+        report(progress_hook, 'downloading_video', f'[{position}/{len(new_entries)}] Downloading: {video_title}',
+               f"\n🎵 [{position}/{len(new_entries)}] Downloading: {video_title}")
+        checkpoint.start(video_id, number, video_title, entry.url, video_dir)
+
+        success = download_playlist_video_with_progress(entry.url, str(video_dir), quality, formats,
+                                                        split_large_files, split_by_chapters, progress_hook,
+                                                        max_size_mb=max_size_mb, split_at_silence=split_at_silence,
+                                                        virtual_chapters=virtual_chapters)
+        checkpoint.finish(video_id, success)
+        if success:
+            successful.append(video_id)
+            state['known_ids'].append(video_id)
+            report(progress_hook, 'video_completed', f'Successfully downloaded: {video_title}',
+                   f"✅ Successfully downloaded: {video_title}")
+        else:
+            failed.append(video_id)
+            report(progress_hook, 'video_failed', f'Failed to download: {video_title}',
+                   f"❌ Failed to download: {video_title}")
+
+        # Saved after every video, so an interrupted sync never downloads a video twice
+        state['last_sync'] = datetime.now().isoformat(timespec='seconds')
+        write_json_atomic(playlist_dir / SYNC_STATE_FILENAME, state)
+
+    state['last_sync'] = datetime.now().isoformat(timespec='seconds')
+    write_json_atomic(playlist_dir / SYNC_STATE_FILENAME, state)
+
+    summary = {
+        'title': title,
+        'output_dir': str(playlist_dir),
+        'new_videos': len(new_entries),
+        'successful_downloads': len(successful),
+        'failed_downloads': len(failed),
+    }
+    report(progress_hook, 'sync_completed',
+           f"Sync completed! New: {len(new_entries)}, Successful: {len(successful)}, Failed: {len(failed)}",
+           f"\n🎯 Sync completed! New: {len(new_entries)}, Successful: {len(successful)}, "
+           f"Failed: {len(failed)}\n📁 Files saved to: {playlist_dir}")
+    return summary
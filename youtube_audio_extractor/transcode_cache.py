@@ -0,0 +1,239 @@
+"""
+Transcode cache for YouTube Audio Extractor.
+Encoded outputs are stored once, keyed by a hash of the source stream's
+content and the encoder settings, so the same source encoded the same way
+again (a duplicate playlist entry, a re-run after deleting the outputs,
+another request for the same video) is not encoded again. Cached files are
+placed into output directories as reflinks or hardlinks where the file
+system allows, and copied otherwise. The least recently used entries are
+evicted once the cache grows beyond its size limit.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+
+from .encoding import CODECS, output_args
+from .hashing import file_digest
+from .manifests import read_json, write_json_atomic
+
+TRANSCODE_CACHE_DIR = Path('downloads') / '.transcode_cache'
+INDEX_FILENAME = 'index.json'
+
+# Total size of cached outputs (in MB) before the least recently used are evicted
+DEFAULT_CACHE_MAX_MB = 2048
+
+# ioctl request that makes a file share another file's blocks (Linux FICLONE)
+FICLONE = 0x40049409
+
+
+# How an output was encoded: in one pass, or as parallel segments joined together
+# (MP3 only, without bit reservoir and with trimmed priming; see encoding.encode_parallel)
+ENCODE_MODES = ('single', 'parallel')
+
+
+def cache_key(source_digest, output_format, mode='single'):
+    """Key of one encoded output: the source content, codec, bitrate, encoder arguments and encode mode."""
+    settings = [source_digest, output_format.codec, str(output_format.bitrate), output_args(output_format), mode]
+    return hashlib.sha256(json.dumps(settings).encode()).hexdigest()
+
+
+def reflink(source, destination):
+    """Make destination a copy-on-write clone of source; raises OSError where unsupported."""
+    import fcntl
+    with open(source, 'rb') as src, open(destination, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.unlink(destination)
+            raise
+
+
+def place_file(source, destination):
+    """Put a file's content at destination as a reflink, hardlink or copy (first that works).
+
+    Returns how it was placed. The destination is replaced atomically.
+    """
+    destination = Path(destination)
+    staging = destination.with_name(f".{destination.name}.placing")
+    try:
+        staging.unlink()
+    except FileNotFoundError:
+        pass
+    method = 'reflink'
+    try:
+        reflink(source, staging)
+    except (OSError, ImportError):
+        method = 'hardlink'
+        try:
+            os.link(source, staging)
+        except OSError:
+            method = 'copy'
+            shutil.copyfile(source, staging)
+    os.replace(staging, destination)
+    return method
+
+
+class TranscodeCache:
+    """Encoded outputs stored by cache_key, with a size-bounded least-recently-used index."""
+
+    def __init__(self, directory=TRANSCODE_CACHE_DIR, max_mb=DEFAULT_CACHE_MAX_MB, enabled=True):
+        self.directory = Path(directory)
+        self.max_bytes = max_mb * 1024 * 1024
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._index = None
+        self._stats = {'hits': 0, 'misses': 0, 'stored': 0, 'evicted': 0}
+
+    def configure(self, max_mb=None, enabled=None):
+        with self._lock:
+            if max_mb is not None:
+                self.max_bytes = max_mb * 1024 * 1024
+            if enabled is not None:
+                self.enabled = enabled
+            if self.enabled and self._load():
+                self._evict()
+                self._save()
+
+    def _load(self):
+        if self._index is None:
+            self._index = read_json(self.directory / INDEX_FILENAME, {})
+        return self._index
+
+    def _save(self):
+        write_json_atomic(self.directory / INDEX_FILENAME, self._index)
+
+    def _object_path(self, key, output_format):
+        return self.directory / key[:2] / (key + CODECS[output_format.codec][1])
+
+    def source_digest(self, source):
+        """Content hash of a source stream, or None if the cache is disabled."""
+        return file_digest(source) if self.enabled else None
+
+    def fetch(self, source_digest, output_format, destination, mode='single'):
+        """Place the cached output for this source, format and encode mode at destination; False on a miss."""
+        if not self.enabled or source_digest is None:
+            return False
+        key = cache_key(source_digest, output_format, mode)
+        with self._lock:
+            entry = self._load().get(key)
+            path = self._object_path(key, output_format)
+            try:
+                if entry is None or path.stat().st_size != entry['size']:
+                    raise FileNotFoundError(path)
+                place_file(path, destination)
+            except OSError:
+                if entry is not None:
+                    # Lost or damaged object: forget it
+                    del self._index[key]
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        pass
+                    self._save()
+                self._stats['misses'] += 1
+                return False
+            entry['last_used'] = time.time()
+            entry['hits'] = entry.get('hits', 0) + 1
+            self._stats['hits'] += 1
+            self._save()
+        return True
+
+    def store(self, source_digest, output_format, encoded_file, mode='single'):
+        """Add a freshly encoded output to the cache (linked, not copied, where possible)."""
+        if not self.enabled or source_digest is None:
+            return
+        key = cache_key(source_digest, output_format, mode)
+        path = self._object_path(key, output_format)
+        try:
+            size = Path(encoded_file).stat().st_size
+            if size > self.max_bytes:
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            place_file(encoded_file, path)
+            stat = path.stat()
+        except OSError:
+            return  # the cache is only an optimisation
+
+        with self._lock:
+            self._load()[key] = {
+                'file': path.relative_to(self.directory).as_posix(),
+                'size': size,
+                'inode': [stat.st_dev, stat.st_ino],  # shared with the output when hardlinked
+                'codec': output_format.codec,
+                'bitrate': str(output_format.bitrate),
+                'mode': mode,
+                'stored': time.time(),
+                'last_used': time.time(),
+                'hits': 0,
+            }
+            self._stats['stored'] += 1
+            self._evict()
+            self._save()
+
+    def _evict(self):
+        entries = self._load()
+        total = sum(entry['size'] for entry in entries.values())
+        for key, entry in sorted(entries.items(), key=lambda item: item[1]['last_used']):
+            if total <= self.max_bytes:
+                break
+            try:
+                (self.directory / entry['file']).unlink()
+            except FileNotFoundError:
+                pass
+            del entries[key]
+            total -= entry['size']
+            self._stats['evicted'] += 1
+
+    def objects(self):
+        """Every cached output as a dict with its key, path, size, inode, and when it was stored and last used."""
+        with self._lock:
+            objects = []
+            for key, entry in self._load().items():
+                path = self.directory / entry['file']
+                inode = entry.get('inode')
+                if inode is None:
+                    try:
+                        stat = path.stat()
+                    except OSError:
+                        continue
+                    inode = entry['inode'] = [stat.st_dev, stat.st_ino]
+                objects.append({'key': key, 'path': path, 'size': entry['size'], 'inode': tuple(inode),
+                                'stored': entry['stored'], 'last_used': entry['last_used']})
+            return objects
+
+    def discard(self, keys):
+        """Remove cached outputs, e.g. to free room within the storage quota (see storage.py)."""
+        keys = list(keys)
+        if not keys:
+            return
+        with self._lock:
+            entries = self._load()
+            for key in keys:
+                entry = entries.pop(key, None)
+                if entry is not None:
+                    try:
+                        (self.directory / entry['file']).unlink()
+                    except FileNotFoundError:
+                        pass
+                    self._stats['evicted'] += 1
+            self._save()
+
+    def status(self):
+        with self._lock:
+            entries = self._load()
+            return dict(self._stats, enabled=self.enabled, entries=len(entries),
+                        size=sum(entry['size'] for entry in entries.values()), max_size=self.max_bytes)
+
+
+_transcode_cache = TranscodeCache()
+
+
+def get_transcode_cache():
+    """Return the process-wide transcode cache."""
+    return _transcode_cache
@@ -0,0 +1,181 @@
+"""
+Virtual chapters for YouTube Audio Extractor.
+Instead of writing a copy of every chapter, the downloaded MP3 is kept as
+one file and indexed: a CUE sheet for players, and a JSON table with the
+byte range of each chapter on MP3 frame boundaries, so a chapter can be
+served as a slice of the original file.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from .manifests import write_json_atomic
+from .mp3 import iter_frames
+from .staging import get_staging_area, publish
+
+INDEX_SUFFIX = '.chapters.json'
+CUE_SUFFIX = '.cue'
+INDEX_VERSION = 1
+
+# Bytes at the start of the first frame where a Xing/Info (VBR header) tag sits
+XING_SEARCH_BYTES = 64
+
+
+def index_path(audio_file):
+    audio_file = Path(audio_file)
+    return audio_file.with_name(audio_file.stem + INDEX_SUFFIX)
+
+
+def cue_path(audio_file):
+    audio_file = Path(audio_file)
+    return audio_file.with_name(audio_file.stem + CUE_SUFFIX)
+
+
+def is_info_frame(f, offset, length):
+    """Whether the frame at offset is a Xing/Info header frame rather than audio."""
+    f.seek(offset)
+    head = f.read(min(length, XING_SEARCH_BYTES))
+    return b'Xing' in head or b'Info' in head
+
+
+def build_chapter_index(audio_file, chapters):
+    """Map chapters (as returned by get_video_chapters) to frame-aligned byte ranges of an MP3 file.
+
+    Each chapter starts at the frame nearest its start time and runs up to
+    the next chapter's first frame. Returns the index dict, or None if the
+    file has no MP3 frames.
+    """
+    audio_file = Path(audio_file)
+    chapters = sorted(chapters, key=lambda chapter: chapter['start_time'])
+    boundaries = []
+    audio_start = audio_end = None
+    samples_seen = 0
+    sample_rate = None
+    frame_number = 0
+
+    with open(audio_file, 'rb') as f:
+        for offset, length, samples, rate in iter_frames(f):
+            if audio_start is None:
+                if is_info_frame(f, offset, length):
+                    continue
+                audio_start = offset
+                sample_rate = rate
+
+            # A chapter starts at the first frame whose middle lies past its start time
+            frame_middle = (samples_seen + samples / 2) / sample_rate
+            while len(boundaries) < len(chapters) and frame_middle >= chapters[len(boundaries)]['start_time']:
+                boundaries.append((offset, frame_number, samples_seen / sample_rate))
+
+            samples_seen += samples
+            frame_number += 1
+            audio_end = offset + length
+
+    if audio_start is None:
+        return None
+
+    duration = samples_seen / sample_rate
+    # Chapters starting after the last frame are empty
+    while len(boundaries) < len(chapters):
+        boundaries.append((audio_end, frame_number, duration))
+    boundaries[0] = (audio_start, 0, 0.0)
+
+    entries = []
+    for position, chapter in enumerate(chapters):
+        offset, first_frame, start_time = boundaries[position]
+        end_offset, end_frame, end_time = (boundaries[position + 1] if position + 1 < len(boundaries)
+                                           else (audio_end, frame_number, duration))
+        entries.append({
+            'index': chapter['index'],
+            'title': chapter['title'],
+            'start_time': round(start_time, 3),
+            'end_time': round(end_time, 3),
+            'offset': offset,
+            'length': end_offset - offset,
+            'first_frame': first_frame,
+            'frames': end_frame - first_frame,
+        })
+
+    stat = audio_file.stat()
+    return {
+        'version': INDEX_VERSION,
+        'file': audio_file.name,
+        'size': stat.st_size,
+        'mtime': stat.st_mtime,
+        'sample_rate': sample_rate,
+        'duration': round(duration, 3),
+        'chapters': entries,
+    }
+
+
+def format_cue_time(seconds):
+    """CUE sheet time: minutes, seconds and frames of 1/75 second."""
+    frames = round(seconds * 75)
+    return f"{frames // (75 * 60):02d}:{frames // 75 % 60:02d}:{frames % 75:02d}"
+
+
+def cue_quote(text):
+    return '"' + str(text).replace('"', "'") + '"'
+
+
+def write_cue_sheet(path, index, title=None):
+    lines = []
+    if title:
+        lines.append(f"TITLE {cue_quote(title)}")
+    lines.append(f"FILE {cue_quote(index['file'])} MP3")
+    for number, chapter in enumerate(index['chapters'], 1):
+        lines += [
+            f"  TRACK {number:02d} AUDIO",
+            f"    TITLE {cue_quote(chapter['title'])}",
+            f"    INDEX 01 {format_cue_time(chapter['start_time'])}",
+        ]
+    staged = get_staging_area().path_for(path)
+    staged.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    publish(staged, path)
+
+
+def write_chapter_index(audio_file, chapters, title=None):
+    """Write the CUE sheet and JSON chapter index next to an MP3 file; returns the index or None."""
+    if Path(audio_file).suffix.lower() != '.mp3' or not chapters:
+        return None
+    index = build_chapter_index(audio_file, chapters)
+    if index is None:
+        return None
+    write_cue_sheet(cue_path(audio_file), index, title)
+    write_json_atomic(index_path(audio_file), index)
+    return index
+
+
+def read_chapter_index(audio_file):
+    """The chapter index of an audio file, or None if there is none or the file changed since."""
+    try:
+        with open(index_path(audio_file), encoding='utf-8') as f:
+            index = json.load(f)
+        stat = os.stat(audio_file)
+    except (OSError, ValueError):
+        return None
+    if index.get('version') != INDEX_VERSION or index.get('size') != stat.st_size or index.get('mtime') != stat.st_mtime:
+        return None
+    return index
+
+
+def find_chapter(index, number):
+    """The chapter entry with the given 1-based index, or None."""
+    for chapter in index['chapters']:
+        if chapter['index'] == number:
+            return chapter
+    return None
+
+
+def iter_chapter_bytes(audio_file, chapter, start=0, end=None, chunk_size=64 * 1024):
+    """Yield the bytes of a chapter, optionally only bytes start..end (inclusive) of it."""
+    end = chapter['length'] - 1 if end is None else min(end, chapter['length'] - 1)
+    remaining = end - start + 1
+    with open(audio_file, 'rb') as f:
+        f.seek(chapter['offset'] + start)
+        while remaining > 0:
+            data = f.read(min(chunk_size, remaining))
+            if not data:
+                break
+            remaining -= len(data)
+            yield data